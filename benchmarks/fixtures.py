@@ -0,0 +1,182 @@
+import os
+import sys
+import datetime as dt
+import numpy as np
+from netCDF4 import Dataset
+
+PROJECTDIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(PROJECTDIR, 'pyHimawari8'))
+
+from hsd import write_segment, NOMINAL_GRID
+from helper import getH8ProdFile
+
+# (name, dtype, units, long_name) of the synthetic L2 variables
+L2_VARIABLES = {
+    'CLP': [('CLOT', 'f4', 'none', 'Cloud Optical Thickness'),
+            ('CLTH', 'f4', 'km', 'Cloud Top Height'),
+            ('CLTT', 'f4', 'Kelvin', 'Cloud Top Temperature'),
+            ('CLTYPE', 'i1', 'none', 'Cloud Type'),
+            ('QA', 'i2', 'none', 'QA')],
+    'ARP': [('AOT', 'f4', 'none', 'Aerosol Optical Thickness'),
+            ('AE', 'f4', 'none', 'Angstrom Exponent'),
+            ('QA_flag', 'i2', 'none', 'QA flag')]}
+
+
+def make_L2(file, product, *, size=2401, seed=0):
+    """
+    create a synthetic L2 NetCDF file on the full-disk lat/lon grid.
+
+    The variables are smooth random fields, chunked and compressed like the
+    JAXA products, so that the read cost is realistic.
+
+    Parameters
+    ----------
+    file: str
+        output filename.
+    product: str
+        'CLP' or 'ARP'.
+    Keywords
+    --------
+    size: int
+        number of latitude/longitude grid points (default: 2401).
+    seed: int
+        random seed (default: 0).
+
+    History
+    -------
+    2026-10-18 First version.
+    """
+
+    rng = np.random.RandomState(seed)
+    x = np.linspace(0, 4 * np.pi, size)
+    field = 0.5 + 0.25 * np.outer(np.sin(x), np.cos(x * 0.7)) + \
+        0.25 * rng.rand(size, size)
+
+    with Dataset(file, 'w') as fd:
+        fd.createDimension('latitude', size)
+        fd.createDimension('longitude', size)
+        lat = fd.createVariable('latitude', 'f4', ('latitude',))
+        lat[:] = np.linspace(60, -60, size)
+        lat.units = 'degrees_north'
+        lon = fd.createVariable('longitude', 'f4', ('longitude',))
+        lon[:] = np.linspace(80, 200, size)
+        lon.units = 'degrees_east'
+
+        for name, dtype, units, long_name in L2_VARIABLES[product]:
+            var = fd.createVariable(
+                name, dtype, ('latitude', 'longitude'), zlib=True,
+                chunksizes=(min(size, 300), min(size, 300)))
+            var.units = units
+            var.long_name = long_name
+
+            if name == 'CLTYPE':
+                var[:] = (field * 10).astype('i1')
+            elif name.startswith('QA'):
+                var[:] = rng.randint(0, 2 ** 15, (size, size)).astype('i2')
+            elif name == 'CLTH':
+                var[:] = field * 15
+            else:
+                var[:] = field
+
+
+def make_HSD(HSD_Dir, mTime, band, segments, *, compress=False, seed=0):
+    """
+    create synthetic full-disk HSD segments with valid headers.
+
+    Parameters
+    ----------
+    HSD_Dir: str
+        output directory.
+    mTime: datetime
+        observation time.
+    band: int
+        band number [1-16].
+    segments: list
+        segment sequence numbers.
+    Keywords
+    --------
+    compress: bool
+        write '.DAT.bz2' files (default: False).
+    seed: int
+        random seed (default: 0).
+    Returns
+    -------
+    files: list
+        created segment files.
+
+    History
+    -------
+    2026-10-18 First version.
+    """
+
+    resolution = {3: 0.5, 1: 1.0, 2: 1.0, 4: 1.0}.get(band, 2.0)
+    nCols = NOMINAL_GRID[resolution][2]
+    nLines = nCols // 10
+    rng = np.random.RandomState(seed)
+
+    files = []
+    for segment in segments:
+        file = os.path.join(
+            HSD_Dir, 'HS_H08_{0}_B{1:02d}_FLDK_R{2:02d}_S{3:02d}10.DAT'.format(
+                mTime.strftime('%Y%m%d_%H%M'), band, int(resolution * 10),
+                segment))
+        if compress:
+            file = file + '.bz2'
+
+        if band < 7:
+            counts = rng.randint(20, 1500, (nLines, nCols))
+        else:
+            counts = rng.randint(1000, 4000, (nLines, nCols))
+        write_segment(file, counts.astype('u2'), band=band, segment=segment,
+                      obsTime=mTime)
+        files.append(file)
+
+    return files
+
+
+def make_fixtures(fixDir, *, sizes=[601, 1201, 2401],
+                  mTime=dt.datetime(2020, 2, 19, 4, 0)):
+    """
+    create all the fixtures of the benchmark (only the missing ones).
+
+    Returns
+    -------
+    fixtures: dict
+        'L2': {(product, size): file}, 'HSD_Dir', 'HSD': {name: file} and
+        'mTime'.
+
+    History
+    -------
+    2026-10-18 First version.
+    """
+
+    fixtures = {'L2': {}, 'HSD': {}, 'mTime': mTime}
+
+    for size in sizes:
+        for product, version in [('CLP', '010'), ('ARP', '021')]:
+            file = os.path.join(fixDir, '{0:05d}'.format(size), getH8ProdFile(
+                mTime, product, version=version,
+                pixelNum='{0:05d}'.format(size),
+                lineNum='{0:05d}'.format(size)))
+            if not os.path.exists(file):
+                os.makedirs(os.path.dirname(file), exist_ok=True)
+                make_L2(file, product, size=size)
+            fixtures['L2'][(product, size)] = file
+
+    HSD_Dir = os.path.join(fixDir, 'hsd')
+    fixtures['HSD_Dir'] = HSD_Dir
+    if not os.path.exists(HSD_Dir):
+        os.makedirs(HSD_Dir)
+        make_HSD(HSD_Dir, mTime, 1, [1, 2, 3, 4])
+        make_HSD(HSD_Dir, mTime, 13, [3])
+        make_HSD(HSD_Dir, mTime, 13, [4], compress=True)
+
+    for file in sorted(os.listdir(HSD_Dir)):
+        # e.g., 'B01_S01' or 'B13_S04_bz2'
+        parts = file.split('_')
+        name = '{0}_{1}'.format(parts[4], parts[7][:3])
+        if file.endswith('.bz2'):
+            name = name + '_bz2'
+        fixtures['HSD'][name] = os.path.join(HSD_Dir, file)
+
+    return fixtures
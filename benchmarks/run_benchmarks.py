@@ -0,0 +1,458 @@
+"""
+Offline benchmarks of the load/render/resample hot paths.
+
+Synthetic fixtures (L2 NetCDF files and HSD segments with valid headers) are
+generated locally, so no access to the JAXA server is needed. Each case runs
+in a fresh process, so that the peak RSS and the module level caches are not
+shared between cases.
+
+Usage
+-----
+python benchmarks/run_benchmarks.py   # run all the cases
+python benchmarks/run_benchmarks.py --cases load_data --sizes 2401
+python benchmarks/run_benchmarks.py --save-baseline   # store the baseline
+"""
+
+import os
+import sys
+import json
+import time
+import fnmatch
+import argparse
+import platform
+import resource
+import tempfile
+import subprocess
+import traceback
+import datetime as dt
+import multiprocessing as mp
+import numpy as np
+
+BENCHDIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(BENCHDIR)
+
+from fixtures import PROJECTDIR, make_fixtures
+
+BASELINE_FILE = os.path.join(BENCHDIR, 'baseline.json')
+RESULT_FILE = os.path.join(BENCHDIR, 'results.json')
+FIXTURE_DIR = os.path.join(tempfile.gettempdir(), 'himawari8_bench')
+
+# regions of interest (latRange, lonRange)
+ROIS = {
+    'small': ([30, 40], [110, 120]),
+    'east_asia': ([15, 58], [70, 140]),
+    'full_disk': ([-60, 60], [80, 200])}
+
+STAGES = {}   # benchmark stages by name
+
+
+def stage(name):
+    """
+    register a benchmark stage.
+
+    The stage function prepares everything outside of the measurement and
+    returns the callable to be measured.
+    """
+
+    def decorator(func):
+        STAGES[name] = func
+        return func
+
+    return decorator
+
+
+@stage('read_Himawari8.header')
+def bench_hsd_header(fixtures, workDir, *, segment):
+    from helper import read_Himawari8
+
+    file = fixtures['HSD'][segment]
+
+    def run():
+        read_Himawari8(file).close()
+
+    return run
+
+
+@stage('read_Himawari8.counts')
+def bench_hsd_counts(fixtures, workDir, *, segment):
+    from helper import read_Himawari8
+
+    file = fixtures['HSD'][segment]
+
+    def run():
+        seg = read_Himawari8(file, tmpDir=workDir)
+        seg.counts.sum(dtype=np.int64)
+        seg.close()
+
+    return run
+
+
+@stage('calibrate')
+def bench_calibrate(fixtures, workDir, *, segment, calibration):
+    from hsd import HSDSegment
+    from calibration import calibrate
+
+    file = fixtures['HSD'][segment]
+
+    def run():
+        with HSDSegment(file) as seg:
+            calibrate(seg, calibration)
+
+    return run
+
+
+@stage('calibrate.satpy')
+def bench_calibrate_satpy(fixtures, workDir, *, segment, calibration):
+    from satpy.readers.ahi_hsd import AHIHSDFileHandler
+
+    file = fixtures['HSD'][segment]
+    band = int(segment[1:3])
+    resolution = 1000 if band < 7 else 2000
+    key = {'name': 'B{0:02d}'.format(band), 'calibration': calibration,
+           'resolution': resolution}
+    info = {'units': '', 'standard_name': '', 'wavelength': None,
+            'resolution': resolution}
+
+    def run():
+        handler = AHIHSDFileHandler(
+            file, {'segment': int(segment[5:7]), 'total_segments': 10,
+                   'start_time': fixtures['mTime']},
+            {'file_type': 'hsd_b{0:02d}'.format(band)}, mask_space=False)
+        np.asarray(handler.read_band(key, info))
+
+    return run
+
+
+@stage('load_data')
+def bench_load_data(fixtures, workDir, *, product, size, roi, variables):
+    from visualizer import Visualizer
+
+    file = fixtures['L2'][(product, size)]
+    latRange, lonRange = ROIS[roi]
+
+    def run():
+        vis = Visualizer(file, latRange=latRange, lonRange=lonRange)
+        vis.load_variables(variables, fixtures['mTime'])
+
+    return run
+
+
+@stage('colorplot')
+def bench_colorplot(fixtures, workDir, *, size, roi, batch=False):
+    from visualizer import Visualizer
+
+    latRange, lonRange = ROIS[roi]
+    vis = Visualizer(fixtures['L2'][('CLP', size)],
+                     latRange=latRange, lonRange=lonRange)
+    vis.load_data('CLTH', fixtures['mTime'])
+    kwargs = dict(axLatRange=latRange, axLonRange=lonRange,
+                  vmin=0, vmax=15, batch=batch)
+
+    if batch:
+        # the template is created by the first frame
+        vis.colorplot(os.path.join(workDir, 'first.png'), **kwargs)
+
+    def run():
+        vis.colorplot(os.path.join(workDir, 'colorplot.png'), **kwargs)
+
+    return run
+
+
+@stage('colorplot_with_band')
+def bench_colorplot_with_band(fixtures, workDir, *, roi, pixels, warm=False):
+    from visualizer import Visualizer
+
+    latRange, lonRange = ROIS[roi]
+    vis = Visualizer(fixtures['L2'][('ARP', 2401)],
+                     latRange=latRange, lonRange=lonRange)
+    vis.load_data('AOT', fixtures['mTime'])
+    kwargs = dict(axLatRange=latRange, axLonRange=lonRange,
+                  vmin=0, vmax=1, pixels=pixels)
+
+    if warm:
+        # the resampling lookup table is computed by the first frame
+        vis.colorplot_with_band(1, fixtures['HSD_Dir'],
+                                os.path.join(workDir, 'first.png'), **kwargs)
+
+    def run():
+        vis.colorplot_with_band(1, fixtures['HSD_Dir'],
+                                os.path.join(workDir, 'band.png'), **kwargs)
+
+    return run
+
+
+def list_cases(sizes):
+    """
+    list all the benchmark cases.
+
+    Returns
+    -------
+    cases: list
+        each case is a dict with 'name', 'stage' and 'params'.
+    """
+
+    cases = []
+
+    def add(stageName, **params):
+        label = ','.join(
+            '{0}={1}'.format(key, '+'.join(value) if isinstance(value, list)
+                             else value)
+            for key, value in sorted(params.items()))
+        cases.append({'name': '{0}[{1}]'.format(stageName, label),
+                      'stage': stageName, 'params': params})
+
+    for segment in ['B01_S01', 'B13_S03', 'B13_S04_bz2']:
+        add('read_Himawari8.header', segment=segment)
+        add('read_Himawari8.counts', segment=segment)
+
+    for segment, calibration in [('B01_S01', 'reflectance'),
+                                 ('B13_S03', 'brightness_temperature')]:
+        add('calibrate', segment=segment, calibration=calibration)
+        add('calibrate.satpy', segment=segment, calibration=calibration)
+
+    for size in sizes:
+        for roi in ROIS:
+            add('load_data', product='CLP', size=size, roi=roi,
+                variables=['CLTYPE'])
+            add('load_data', product='CLP', size=size, roi=roi,
+                variables=['CLTYPE', 'CLTH', 'CLOT'])
+            add('load_data', product='ARP', size=size, roi=roi,
+                variables=['AOT'])
+
+    for size in sizes:
+        for roi in ['small', 'east_asia']:
+            add('colorplot', size=size, roi=roi)
+        add('colorplot', size=size, roi='east_asia', batch=True)
+
+    for pixels in [100, 300]:
+        add('colorplot_with_band', roi='east_asia', pixels=pixels)
+        add('colorplot_with_band', roi='east_asia', pixels=pixels, warm=True)
+
+    return cases
+
+
+def _peak_rss():
+    """
+    peak resident set size of the current process. [MB]
+    """
+
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _measure(conn, case, fixtures):
+    """
+    measure a single case (runs in the child process).
+    """
+
+    result = {}
+    try:
+        with tempfile.TemporaryDirectory() as workDir:
+            run = STAGES[case['stage']](fixtures, workDir, **case['params'])
+            rssBefore = _peak_rss()
+
+            t0 = time.perf_counter()
+            c0 = time.process_time()
+            run()
+            result['wall'] = time.perf_counter() - t0
+            result['cpu'] = time.process_time() - c0
+
+            result['peak_rss_mb'] = _peak_rss()
+            result['rss_increase_mb'] = result['peak_rss_mb'] - rssBefore
+            result['status'] = 'ok'
+    except Exception as e:
+        result = {'status': 'error',
+                  'error': '{0}: {1}'.format(type(e).__name__, e),
+                  'traceback': traceback.format_exc()}
+
+    conn.send(result)
+    conn.close()
+
+
+def run_case(case, fixtures, *, repeat=3, timeout=1800):
+    """
+    run the case `repeat` times, each in a fresh process.
+
+    Returns
+    -------
+    result: dict
+        minimum/median wall time, CPU time of the fastest run and the maximum
+        peak RSS.
+    """
+
+    ctx = mp.get_context('fork' if 'fork' in mp.get_all_start_methods()
+                         else 'spawn')
+
+    runs = []
+    for iRun in range(repeat):
+        parentConn, childConn = ctx.Pipe(duplex=False)
+        proc = ctx.Process(target=_measure, args=(childConn, case, fixtures))
+        proc.start()
+        childConn.close()
+
+        if parentConn.poll(timeout):
+            res = parentConn.recv()
+        else:
+            proc.terminate()
+            res = {'status': 'error', 'error': 'timeout'}
+        proc.join()
+
+        if res['status'] != 'ok':
+            return dict(name=case['name'], stage=case['stage'],
+                        params=case['params'], **res)
+        runs.append(res)
+
+    walls = [res['wall'] for res in runs]
+    fastest = runs[int(np.argmin(walls))]
+
+    return {
+        'name': case['name'],
+        'stage': case['stage'],
+        'params': case['params'],
+        'status': 'ok',
+        'repeat': repeat,
+        'wall': min(walls),
+        'wall_median': float(np.median(walls)),
+        'cpu': fastest['cpu'],
+        'peak_rss_mb': max(res['peak_rss_mb'] for res in runs),
+        'rss_increase_mb': max(res['rss_increase_mb'] for res in runs)}
+
+
+def environment():
+    """
+    description of the running environment.
+    """
+
+    try:
+        commit = subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=PROJECTDIR,
+            stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        'time': dt.datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count()}
+
+
+def compare(results, baseline, *, tolerance=0.2, rssTolerance=0.2):
+    """
+    compare the results against the baseline.
+
+    A case regresses if its wall time or peak RSS exceeds the baseline by more
+    than the tolerance.
+
+    Returns
+    -------
+    regressions: list
+        (case name, metric, baseline, current) of each regression.
+    """
+
+    reference = {res['name']: res for res in baseline['results']
+                 if res['status'] == 'ok'}
+
+    regressions = []
+    for res in results['results']:
+        if (res['status'] != 'ok') or (res['name'] not in reference):
+            continue
+        ref = reference[res['name']]
+        if res['wall'] > ref['wall'] * (1 + tolerance):
+            regressions.append((res['name'], 'wall', ref['wall'], res['wall']))
+        if res['peak_rss_mb'] > ref['peak_rss_mb'] * (1 + rssTolerance):
+            regressions.append((res['name'], 'peak_rss_mb',
+                                ref['peak_rss_mb'], res['peak_rss_mb']))
+
+    return regressions
+
+
+def print_table(results, baseline=None):
+    """
+    print the results, with the ratio to the baseline.
+    """
+
+    reference = {}
+    if baseline is not None:
+        reference = {res['name']: res for res in baseline['results']
+                     if res['status'] == 'ok'}
+
+    print('{0:70s} {1:>9s} {2:>9s} {3:>10s} {4:>8s}'.format(
+        'case', 'wall[s]', 'cpu[s]', 'rss[MB]', 'ratio'))
+    for res in results['results']:
+        if res['status'] != 'ok':
+            print('{0:70s} {1}'.format(res['name'], res['error']))
+            continue
+        ratio = ''
+        if res['name'] in reference:
+            ratio = '{0:.2f}'.format(
+                res['wall'] / max(reference[res['name']]['wall'], 1e-9))
+        print('{0:70s} {1:9.3f} {2:9.3f} {3:10.1f} {4:>8s}'.format(
+            res['name'], res['wall'], res['cpu'], res['peak_rss_mb'], ratio))
+
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(
+        description='Benchmarks of the load/render/resample hot paths.')
+    parser.add_argument('--cases', nargs='*', default=['*'],
+                        help='glob patterns of the case names.')
+    parser.add_argument('--sizes', nargs='*', type=int,
+                        default=[601, 1201, 2401],
+                        help='grid sizes of the L2 fixtures.')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--fixture-dir', default=FIXTURE_DIR,
+                        help='directory of the (reused) synthetic fixtures.')
+    parser.add_argument('--output', default=RESULT_FILE)
+    parser.add_argument('--baseline', default=BASELINE_FILE)
+    parser.add_argument('--save-baseline', action='store_true',
+                        help='store the results as the new baseline.')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='allowed slowdown against the baseline.')
+    args = parser.parse_args(argv)
+
+    sizes = sorted(set(args.sizes) | {2401})
+    print('Prepare fixtures in {0}'.format(args.fixture_dir))
+    fixtures = make_fixtures(args.fixture_dir, sizes=sizes)
+
+    cases = [case for case in list_cases(args.sizes)
+             if any(fnmatch.fnmatch(case['name'], pattern) or
+                    fnmatch.fnmatch(case['stage'], pattern)
+                    for pattern in args.cases)]
+
+    results = {'environment': environment(), 'results': []}
+    for case in cases:
+        print('Run {0}'.format(case['name']))
+        results['results'].append(
+            run_case(case, fixtures, repeat=args.repeat))
+
+    with open(args.output, 'w') as fh:
+        json.dump(results, fh, indent=2)
+
+    baseline = None
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline, 'r') as fh:
+            baseline = json.load(fh)
+
+    print_table(results, baseline)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as fh:
+            json.dump(results, fh, indent=2)
+        print('Baseline saved to {0}'.format(args.baseline))
+        return 0
+
+    if baseline is not None:
+        regressions = compare(results, baseline, tolerance=args.tolerance)
+        for name, metric, ref, value in regressions:
+            print('REGRESSION {0}: {1} {2:.3f} -> {3:.3f}'.format(
+                name, metric, ref, value))
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
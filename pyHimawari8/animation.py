@@ -0,0 +1,358 @@
+import os
+import json
+import shutil
+import struct
+import subprocess
+import datetime as dt
+from PIL import Image
+from logger import logger
+
+GIF_TRAILER = b'\x3b'
+
+
+def _skip_subblocks(data, pos):
+    """
+    position after the data sub-blocks starting at `pos`.
+    """
+
+    while True:
+        size = data[pos]
+        pos += 1
+        if size == 0:
+            return pos
+        pos += size
+
+
+def parse_gif_frame(data):
+    """
+    split a single frame GIF into its color table and encoded image data.
+
+    Parameters
+    ----------
+    data: bytes
+        content of the GIF file.
+    Returns
+    -------
+    frame: dict
+        'width', 'height' (logical screen), 'left', 'top', 'w', 'h',
+        'interlace' (image descriptor), 'colorTable', 'bits' (color table
+        size 2 ** (bits + 1)) and 'imageData' (LZW minimum code size and
+        the data sub-blocks).
+
+    History
+    -------
+    2026-10-18 First version.
+    """
+
+    if data[:6] not in (b'GIF87a', b'GIF89a'):
+        raise ValueError('Not a GIF file.')
+
+    width, height, flags = struct.unpack('<HHB', data[6:11])
+    pos = 13
+    colorTable, bits = None, 0
+    if flags & 0x80:
+        bits = flags & 0x07
+        size = 3 * 2 ** (bits + 1)
+        colorTable = data[pos:pos + size]
+        pos += size
+
+    while pos < len(data):
+        if data[pos] == 0x21:
+            # extension: introducer, label and sub-blocks
+            pos = _skip_subblocks(data, pos + 2)
+        elif data[pos] == 0x2c:
+            left, top, w, h, iFlags = struct.unpack(
+                '<HHHHB', data[pos + 1:pos + 10])
+            pos += 10
+            if iFlags & 0x80:
+                bits = iFlags & 0x07
+                size = 3 * 2 ** (bits + 1)
+                colorTable = data[pos:pos + size]
+                pos += size
+            start = pos
+            pos = _skip_subblocks(data, pos + 1)
+
+            return {'width': width, 'height': height, 'left': left,
+                    'top': top, 'w': w, 'h': h,
+                    'interlace': bool(iFlags & 0x40),
+                    'colorTable': colorTable, 'bits': bits,
+                    'imageData': data[start:pos]}
+        else:
+            break
+
+    raise ValueError('No image in the GIF file.')
+
+
+def splice_gif(frames, delays, *, loop=0):
+    """
+    splice the encoded frames into an animated GIF, without re-encoding.
+
+    Each frame keeps its own palette as a local color table.
+
+    Parameters
+    ----------
+    frames: list
+        frames from `parse_gif_frame`.
+    delays: list
+        display time of each frame. [ms]
+    Keywords
+    --------
+    loop: int
+        number of loops, 0 for infinite (default: 0).
+    Returns
+    -------
+    data: bytes
+
+    History
+    -------
+    2026-10-18 First version.
+    """
+
+    width = max(frame['width'] for frame in frames)
+    height = max(frame['height'] for frame in frames)
+
+    chunks = [b'GIF89a', struct.pack('<HHBBB', width, height, 0, 0, 0),
+              b'\x21\xff\x0bNETSCAPE2.0\x03\x01' + struct.pack('<H', loop) +
+              b'\x00']
+
+    for frame, delay in zip(frames, delays):
+        # graphic control extension: keep the frame, delay in 1/100 s
+        chunks.append(b'\x21\xf9\x04' + struct.pack(
+            '<BHB', 0x04, int(round(delay / 10)), 0) + b'\x00')
+        flags = 0x80 | frame['bits'] | (0x40 if frame['interlace'] else 0)
+        chunks.append(b'\x2c' + struct.pack(
+            '<HHHHB', frame['left'], frame['top'], frame['w'], frame['h'],
+            flags))
+        chunks.append(frame['colorTable'])
+        chunks.append(frame['imageData'])
+
+    chunks.append(GIF_TRAILER)
+
+    return b''.join(chunks)
+
+
+class Animation(object):
+    """
+    Incremental animation of a product time series.
+
+    Each frame is encoded once when it's added (a palette GIF, and an MP4
+    segment if 'mp4' is in `formats`) and kept in `frameDir` with a manifest.
+    The animation covers a rolling window ending at the latest frame, and is
+    assembled by splicing the encoded frames, so adding a time step costs
+    one new frame instead of re-encoding the whole window.
+
+    Parameters
+    ----------
+    frameDir: str
+        directory of the encoded frames and the manifest.
+    Keywords
+    --------
+    window: timedelta
+        time window of the animation (default: 24 h).
+    delay: int
+        display time of each frame (default: 500). [ms]
+    formats: tuple
+        encoded formats of the frames, 'gif' and/or 'mp4' (default: 'gif').
+    ffmpeg: str
+        ffmpeg executable for the MP4 output (default: 'ffmpeg').
+    Examples
+    --------
+    >>> anim = Animation('/root/data/himawari8/animation/CLTYPE')
+    >>> anim.add_frame(mTime, 'H8_CLP_CLTYPE_0400_010.png')
+    >>> anim.write_gif('H8_CLTYPE_24h.gif')
+
+    History
+    -------
+    2026-10-18 First version.
+    2026-10-18 Encode the missing frames of the written format.
+    """
+
+    def __init__(self, frameDir, *, window=dt.timedelta(hours=24),
+                 delay=500, formats=('gif',), ffmpeg='ffmpeg'):
+        self.frameDir = frameDir
+        self.window = window
+        self.delay = delay
+        self.formats = tuple(formats)
+        self.ffmpeg = ffmpeg
+        self.manifestFile = os.path.join(frameDir, 'manifest.json')
+
+        if not os.path.exists(frameDir):
+            os.makedirs(frameDir, exist_ok=True)
+
+        self.frames = []   # frames sorted by time
+        if os.path.exists(self.manifestFile):
+            with open(self.manifestFile, 'r', encoding='utf-8') as fh:
+                self.frames = json.load(fh)['frames']
+
+    def _save(self):
+        tmpFile = '{0}.{1}.tmp'.format(self.manifestFile, os.getpid())
+        with open(tmpFile, 'w', encoding='utf-8') as fh:
+            json.dump({'frames': self.frames}, fh, indent=1)
+        os.replace(tmpFile, self.manifestFile)
+
+    def _remove(self, frame):
+        for key in ('gif', 'mp4'):
+            if frame.get(key):
+                file = os.path.join(self.frameDir, frame[key])
+                if os.path.exists(file):
+                    os.remove(file)
+
+    def _encode_gif(self, imgFile, name):
+        image = Image.open(imgFile).convert('RGB')
+        image.quantize(colors=256, method=Image.MEDIANCUT).save(
+            os.path.join(self.frameDir, name), format='GIF')
+
+    def _encode_mp4(self, imgFile, name):
+        # single frame segment, concatenated later without re-encoding
+        cmd = [self.ffmpeg, '-y', '-loglevel', 'error', '-loop', '1',
+               '-i', imgFile, '-t', '{0:.3f}'.format(self.delay / 1000),
+               '-r', '25', '-c:v', 'libx264', '-pix_fmt', 'yuv420p',
+               '-vf', 'scale=trunc(iw/2)*2:trunc(ih/2)*2',
+               '-f', 'mpegts', os.path.join(self.frameDir, name)]
+        subprocess.run(cmd, check=True)
+
+    def _complete(self, key):
+        """
+        encode the frames missing in the format from their source images,
+        e.g., the frames added before the format was in `formats`.
+        """
+
+        encode = {'gif': self._encode_gif, 'mp4': self._encode_mp4}[key]
+        suffix = {'gif': '.gif', 'mp4': '.ts'}[key]
+
+        missing = [frame for frame in self.frames if not frame.get(key)]
+        for frame in missing:
+            imgFile, size, mtime = frame['source']
+            try:
+                stat = os.stat(imgFile)
+            except OSError:
+                stat = None
+            if (stat is None) or ([stat.st_size, stat.st_mtime] !=
+                                  [size, mtime]):
+                raise ValueError('{0} frame of {1} is not kept and its '
+                                 'image has changed: {2}'.format(
+                                     key, frame['time'], imgFile))
+
+            name = 'frame_{0}{1}'.format(dt.datetime.strptime(
+                frame['time'], '%Y-%m-%dT%H:%M:%S').strftime(
+                    '%Y%m%d_%H%M%S'), suffix)
+            encode(imgFile, name)
+            frame[key] = name
+
+        if missing:
+            self._save()
+
+    def add_frame(self, mTime, imgFile):
+        """
+        add the rendered image as the frame of the time step.
+
+        The frame is encoded only if it's new or the image has changed.
+        Frames out of the window are dropped.
+
+        Parameters
+        ----------
+        mTime: datetime
+            measurement time.
+        imgFile: str
+            rendered image.
+        Returns
+        -------
+        flag: bool
+            whether the frame was (re-)encoded.
+        """
+
+        stat = os.stat(imgFile)
+        source = [os.path.abspath(imgFile), stat.st_size, stat.st_mtime]
+        timeStr = mTime.strftime('%Y-%m-%dT%H:%M:%S')
+
+        frame = next((frame for frame in self.frames
+                      if frame['time'] == timeStr), None)
+        if (frame is not None) and (frame['source'] == source) and \
+           all(frame.get(key) for key in self.formats):
+            return False
+
+        if frame is not None:
+            self._remove(frame)
+            self.frames.remove(frame)
+
+        name = 'frame_{0}'.format(mTime.strftime('%Y%m%d_%H%M%S'))
+        frame = {'time': timeStr, 'source': source, 'gif': None, 'mp4': None}
+        if 'gif' in self.formats:
+            self._encode_gif(imgFile, name + '.gif')
+            frame['gif'] = name + '.gif'
+        if 'mp4' in self.formats:
+            self._encode_mp4(imgFile, name + '.ts')
+            frame['mp4'] = name + '.ts'
+
+        self.frames.append(frame)
+        self.frames.sort(key=lambda frame: frame['time'])
+
+        # rolling window ending at the latest frame
+        tStart = (dt.datetime.strptime(self.frames[-1]['time'],
+                                       '%Y-%m-%dT%H:%M:%S') -
+                  self.window).strftime('%Y-%m-%dT%H:%M:%S')
+        for frame in [frame for frame in self.frames
+                      if frame['time'] < tStart]:
+            self._remove(frame)
+            self.frames.remove(frame)
+
+        self._save()
+
+        return True
+
+    def write_gif(self, outFile, *, loop=0):
+        """
+        write the animated GIF of the window.
+
+        The frames without GIF, i.e., 'gif' not in `formats` when they were
+        added, are encoded from their images. ValueError is raised if the
+        image has changed since.
+        """
+
+        self._complete('gif')
+
+        frames = []
+        for frame in self.frames:
+            with open(os.path.join(self.frameDir, frame['gif']), 'rb') as fh:
+                frames.append(parse_gif_frame(fh.read()))
+
+        if not frames:
+            raise ValueError('No frames in {0}'.format(self.frameDir))
+
+        tmpFile = '{0}.{1}.tmp'.format(outFile, os.getpid())
+        with open(tmpFile, 'wb') as fh:
+            fh.write(splice_gif(frames, [self.delay] * len(frames),
+                                loop=loop))
+        os.replace(tmpFile, outFile)
+
+        return outFile
+
+    def write_mp4(self, outFile):
+        """
+        write the MP4 of the window by concatenating the encoded segments
+        with ffmpeg, without re-encoding. The missing segments are encoded
+        as in `write_gif`.
+        """
+
+        if shutil.which(self.ffmpeg) is None:
+            raise RuntimeError('{0} is not found.'.format(self.ffmpeg))
+        if not self.frames:
+            raise ValueError('No frames in {0}'.format(self.frameDir))
+        self._complete('mp4')
+
+        listFile = os.path.join(self.frameDir, 'concat.txt')
+        with open(listFile, 'w', encoding='utf-8') as fh:
+            for frame in self.frames:
+                fh.write("file '{0}'\n".format(
+                    os.path.join(os.path.abspath(self.frameDir),
+                                 frame['mp4'])))
+
+        tmpFile = '{0}.{1}.mp4'.format(os.path.splitext(outFile)[0],
+                                       os.getpid())
+        cmd = [self.ffmpeg, '-y', '-loglevel', 'error', '-f', 'concat',
+               '-safe', '0', '-i', listFile, '-c', 'copy', tmpFile]
+        subprocess.run(cmd, check=True)
+        os.replace(tmpFile, outFile)
+        logger.info('Export animation to {0}'.format(outFile))
+
+        return outFile
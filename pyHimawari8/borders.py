@@ -0,0 +1,260 @@
+import os
+import numpy as np
+from matplotlib.collections import LineCollection
+from logger import logger
+
+PROJECTDIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BORDER_FILE = os.path.join(PROJECTDIR, 'include', 'CN-border-La.dat')
+
+_BORDERS = {}   # parsed borders of each file
+_SEGMENTS = {}   # clipped and simplified borders of each extent
+
+
+def parse_borders(file):
+    """
+    parse the border file.
+
+    The polylines are separated by '>' and each line contains the longitude
+    and latitude of a vertex.
+
+    Parameters
+    ----------
+    file: str
+        border file.
+    Returns
+    -------
+    coords: ndarray
+        (lon, lat) of all the vertices. (N, 2)
+    offsets: ndarray
+        start index of each polyline in `coords`, with the total number of
+        vertices appended. (M + 1, )
+
+    History
+    -------
+    2026-10-18 First version.
+    """
+
+    with open(file, 'r') as fd:
+        context = fd.read()
+
+    # mark the start of each polyline with a NaN vertex
+    values = np.array(context.replace('>', ' nan nan ').split(), dtype=float)
+    values = values.reshape(-1, 2)
+
+    isSep = np.isnan(values[:, 0])
+    nVertices = np.diff(np.append(np.nonzero(isSep)[0], len(values))) - 1
+    nVertices = nVertices[nVertices > 0]
+
+    coords = values[~isSep].astype(np.float32)
+    offsets = np.concatenate([[0], np.cumsum(nVertices)]).astype(np.int64)
+
+    return coords, offsets
+
+
+def load_borders(file=BORDER_FILE, *, cacheFile=None):
+    """
+    load the border polylines, once per process.
+
+    The parsed borders are cached in binary form next to the border file,
+    and are parsed again only if the border file is newer.
+
+    Parameters
+    ----------
+    file: str
+        border file (default: include/CN-border-La.dat).
+    Keywords
+    --------
+    cacheFile: str
+        binary cache file (default: border file with '.npz' suffix).
+    Returns
+    -------
+    coords: ndarray
+        (lon, lat) of all the vertices. (N, 2)
+    offsets: ndarray
+        start index of each polyline in `coords`. (M + 1, )
+
+    History
+    -------
+    2026-10-18 First version.
+    """
+
+    if file in _BORDERS:
+        return _BORDERS[file]
+
+    if cacheFile is None:
+        cacheFile = os.path.splitext(file)[0] + '.npz'
+
+    if os.path.exists(cacheFile) and \
+       os.path.getmtime(cacheFile) >= os.path.getmtime(file):
+        with np.load(cacheFile) as cache:
+            coords = cache['coords']
+            offsets = cache['offsets']
+    else:
+        coords, offsets = parse_borders(file)
+        try:
+            np.savez(cacheFile, coords=coords, offsets=offsets)
+        except OSError as e:
+            logger.debug('Failed in caching borders: {0}'.format(e))
+
+    _BORDERS[file] = (coords, offsets)
+
+    return coords, offsets
+
+
+def clip_borders(coords, offsets, lonRange, latRange, *, tolerance=0):
+    """
+    clip the border polylines to the extent and simplify them.
+
+    Vertices outside the extent are dropped, except the ones next to the
+    extent, so that the lines still reach the edges. Consecutive vertices
+    falling in the same cell of size `tolerance` are merged.
+
+    Parameters
+    ----------
+    coords: ndarray
+        (lon, lat) of all the vertices. (N, 2)
+    offsets: ndarray
+        start index of each polyline in `coords`. (M + 1, )
+    lonRange: list
+        longitude range. [degree]
+    latRange: list
+        latitude range. [degree]
+    Keywords
+    --------
+    tolerance: float
+        cell size for the simplification (default: 0). [degree]
+    Returns
+    -------
+    coords: ndarray
+    offsets: ndarray
+
+    History
+    -------
+    2026-10-18 First version.
+    """
+
+    nVertices = len(coords)
+    if nVertices == 0:
+        return coords, offsets
+
+    lineID = np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))
+    sameLine = np.zeros(nVertices, dtype=bool)
+    sameLine[1:] = lineID[1:] == lineID[:-1]
+
+    inside = (coords[:, 0] >= lonRange[0]) & (coords[:, 0] <= lonRange[1]) & \
+             (coords[:, 1] >= latRange[0]) & (coords[:, 1] <= latRange[1])
+
+    # keep the neighbouring vertices of the inside ones
+    keep = inside.copy()
+    keep[1:] |= inside[:-1] & sameLine[1:]
+    keep[:-1] |= inside[1:] & sameLine[1:]
+
+    # a new polyline starts wherever the previous vertex was clipped
+    start = ~sameLine
+    start[1:] |= ~keep[:-1]
+
+    if tolerance > 0:
+        cellX = np.floor((coords[:, 0] - lonRange[0]) / tolerance)
+        cellY = np.floor((coords[:, 1] - latRange[0]) / tolerance)
+        dup = np.zeros(nVertices, dtype=bool)
+        dup[1:] = (cellX[1:] == cellX[:-1]) & (cellY[1:] == cellY[:-1])
+        end = np.ones(nVertices, dtype=bool)
+        end[:-1] = start[1:] | ~keep[1:]
+        keep &= ~(dup & ~start & ~end)
+
+    runID = np.cumsum(start)[keep]
+    newCoords = coords[keep]
+    newStart = np.ones(len(runID), dtype=bool)
+    newStart[1:] = runID[1:] != runID[:-1]
+    newOffsets = np.append(np.nonzero(newStart)[0], len(runID))
+
+    # drop single vertices
+    lengths = np.diff(newOffsets)
+    isValid = np.repeat(lengths > 1, lengths)
+    newCoords = newCoords[isValid]
+    lengths = lengths[lengths > 1]
+    newOffsets = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+
+    return newCoords, newOffsets
+
+
+def border_segments(lonRange, latRange, *, pixels=800, file=BORDER_FILE):
+    """
+    border polylines clipped to the extent and simplified to the resolution.
+
+    Parameters
+    ----------
+    lonRange: list
+        longitude range. [degree]
+    latRange: list
+        latitude range. [degree]
+    Keywords
+    --------
+    pixels: int
+        output pixels across the extent (default: 800).
+    file: str
+        border file.
+    Returns
+    -------
+    segments: list
+        (lon, lat) of each polyline.
+
+    History
+    -------
+    2026-10-18 First version.
+    """
+
+    key = (file, tuple(lonRange), tuple(latRange), int(pixels))
+    if key not in _SEGMENTS:
+        coords, offsets = load_borders(file)
+        tolerance = max(lonRange[1] - lonRange[0],
+                        latRange[1] - latRange[0]) / max(pixels, 1)
+        coords, offsets = clip_borders(coords, offsets, lonRange, latRange,
+                                       tolerance=tolerance)
+        _SEGMENTS[key] = np.split(coords, offsets[1:-1])
+
+    return _SEGMENTS[key]
+
+
+def draw_borders(ax, lonRange, latRange, *, pixels=None, transform=None,
+                 lw=1, color='k', **kwargs):
+    """
+    draw the borders as a single line collection.
+
+    Parameters
+    ----------
+    ax: Axes
+        matplotlib (or cartopy GeoAxes) axes.
+    lonRange: list
+        longitude range of the axes. [degree]
+    latRange: list
+        latitude range of the axes. [degree]
+    Keywords
+    --------
+    pixels: int
+        output pixels across the axes (default: width of the axes).
+    transform: Transform
+        transform of the lon/lat coordinates, e.g., `ccrs.PlateCarree()`.
+    Returns
+    -------
+    collection: LineCollection
+
+    History
+    -------
+    2026-10-18 First version.
+    """
+
+    if pixels is None:
+        bbox = ax.get_window_extent()
+        pixels = max(bbox.width, bbox.height)
+
+    segments = border_segments(lonRange, latRange, pixels=pixels)
+
+    if transform is not None:
+        kwargs['transform'] = transform
+    kwargs.setdefault('zorder', 2)   # same as lines, above the data
+    collection = LineCollection(segments, linewidths=lw, colors=color,
+                                **kwargs)
+    ax.add_collection(collection)
+
+    return collection
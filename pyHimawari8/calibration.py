@@ -0,0 +1,208 @@
+import numpy as np
+from hsd import HSDSegment
+from instrument import span
+
+CHUNKLINES = 64   # lines of each calibration chunk, fits in the cache
+CALIBRATIONS = ('counts', 'radiance', 'reflectance', 'brightness_temperature')
+INVALID_VALUE = -1e10   # invalid value of the header fields
+
+
+def _radiance_coeffs(block5, mode):
+    """
+    gain and offset of the count to radiance conversion.
+    """
+
+    gain = block5['gain_count2rad_conversion']
+    offset = block5['offset_count2rad_conversion']
+
+    if (mode == 'update') and (block5['band_number'] < 7):
+        caliGain = block5['cali_gain_count2rad_conversion']
+        caliOffset = block5['cali_offset_count2rad_conversion']
+        # no valid updated coefficients, fall back to the nominal ones
+        if not (caliGain == 0 and caliOffset == 0):
+            gain, offset = caliGain, caliOffset
+
+    return gain, offset
+
+
+def _gsics_coeffs(block6):
+    """
+    GSICS correction (intercept, slope, quadratic term), None if invalid.
+    """
+
+    if block6 is None:
+        return None
+
+    coeffs = (block6['gsics_calibration_intercept'],
+              block6['gsics_calibration_slope'],
+              block6['gsics_calibration_coeff_quadratic_term'])
+    if (coeffs[1] == 0) or any(coeff <= INVALID_VALUE for coeff in coeffs):
+        return None
+
+    return coeffs
+
+
+def calibration_lut(header, calibration, *, mode='update', gsics=False):
+    """
+    lookup table of the calibrated value of each 16-bit count.
+
+    The formulas are the ones of the satpy `ahi_hsd` reader:
+
+    1. radiance = gain * count + offset, where the updated coefficients of
+       the visible bands are used in 'update' mode.
+    2. reflectance = radiance * coeff_rad2albedo_conversion * 100, clipped
+       at 0. (band 1-6) [%]
+    3. brightness temperature: the effective temperature from the inverse
+       Planck function at the central wavelength, corrected by the
+       c0/c1/c2 polynomial, clipped at 0. (band 7-16) [K]
+
+    Error pixels, outside scan pixels and counts beyond the valid bits are
+    NaN, as well as the zero radiances of the brightness temperature.
+
+    Parameters
+    ----------
+    header: dict
+        header blocks of the segment.
+    calibration: str
+        'counts', 'radiance', 'reflectance' or 'brightness_temperature'.
+    Keywords
+    --------
+    mode: str
+        'update' or 'nominal' calibration coefficients of the visible bands
+        (default: 'update').
+    gsics: bool
+        apply the GSICS radiance correction of block 6, if valid
+        (default: False).
+    Returns
+    -------
+    lut: ndarray
+        float32 calibrated values. (65536, )
+
+    History
+    -------
+    2026-10-18 First version.
+    """
+
+    if calibration not in CALIBRATIONS:
+        raise ValueError('Unknown calibration {0}'.format(calibration))
+    if mode not in ('update', 'nominal'):
+        raise ValueError('Unknown calibration mode {0}'.format(mode))
+
+    block5 = header['block5']
+    band = block5['band_number']
+    if (calibration == 'reflectance' and band >= 7) or \
+       (calibration == 'brightness_temperature' and band < 7):
+        raise ValueError('No {0} for band {1}'.format(calibration, band))
+
+    # the table is small, so it's computed in double precision
+    lut = np.arange(65536, dtype=np.float64)
+
+    if calibration != 'counts':
+        gain, offset = _radiance_coeffs(block5, mode)
+        lut *= gain
+        lut += offset
+
+        coeffs = _gsics_coeffs(header.get('block6')) if gsics else None
+        if coeffs is not None:
+            lut[:] = coeffs[0] + lut * (coeffs[1] + lut * coeffs[2])
+
+    if calibration == 'reflectance':
+        lut *= block5['coeff_rad2albedo_conversion'] * 100
+        np.clip(lut, 0, None, out=lut)
+    elif calibration == 'brightness_temperature':
+        cwl = block5['central_wave_length'] * 1e-6
+        c = block5['speed_of_light']
+        h = block5['planck_constant']
+        k = block5['boltzmann_constant']
+
+        # no radiance, no temperature
+        lut[lut == 0] = np.nan
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # radiance in W/(m2 sr um) to W/(m2 sr m)
+            np.divide(2 * h * c ** 2 / (cwl ** 5 * 1e6), lut, out=lut)
+            np.log1p(lut, out=lut)
+            np.divide(h * c / (k * cwl), lut, out=lut)
+        lut[:] = block5['c0_rad2tb_conversion'] + lut * (
+            block5['c1_rad2tb_conversion'] +
+            lut * block5['c2_rad2tb_conversion'])
+        np.clip(lut, 0, None, out=lut)
+
+    lut[2 ** block5['valid_number_of_bits_per_pixel']:] = np.nan
+    lut[block5['count_value_error_pixels']] = np.nan
+    lut[block5['count_value_outside_scan_pixels']] = np.nan
+
+    return lut.astype(np.float32)
+
+
+def calibrate(segment, calibration=None, *, lines=None, mode='update',
+              gsics=False, out=None, chunkLines=CHUNKLINES):
+    """
+    calibrate the counts of the HSD segment.
+
+    The counts are mapped through the calibration lookup table chunk by
+    chunk, directly from the memory-mapped counts into the float32 output,
+    so the only temporary array is the chunk of indices.
+
+    Parameters
+    ----------
+    segment: HSDSegment or str
+        segment or segment file.
+    calibration: str
+        'counts', 'radiance', 'reflectance' or 'brightness_temperature'
+        (default: 'reflectance' for band 1-6, 'brightness_temperature' for
+        band 7-16).
+    Keywords
+    --------
+    lines: slice
+        lines of the segment (default: all).
+    mode: str
+        'update' or 'nominal' calibration coefficients (default: 'update').
+    gsics: bool
+        apply the GSICS radiance correction (default: False).
+    out: ndarray
+        float32 output array with the shape of the lines (default: None).
+    chunkLines: int
+        lines of each chunk (default: 64).
+    Returns
+    -------
+    data: ndarray
+        float32 calibrated data, NaN for the invalid pixels. (lines, columns)
+    Examples
+    --------
+    >>> with HSDSegment('HS_H08_20200219_0400_B13_FLDK_R20_S0310.DAT') as seg:
+    ...     tb = calibrate(seg)
+    >>> rad = calibrate(file, 'radiance', lines=slice(100, 200))
+
+    History
+    -------
+    2026-10-18 First version.
+    """
+
+    if isinstance(segment, str):
+        with HSDSegment(segment) as seg:
+            return calibrate(seg, calibration, lines=lines, mode=mode,
+                             gsics=gsics, out=out, chunkLines=chunkLines)
+
+    if calibration is None:
+        calibration = 'reflectance' if segment.band < 7 \
+            else 'brightness_temperature'
+
+    with span('calibrate', file=segment.file, calibration=calibration):
+        lut = calibration_lut(segment.header, calibration, mode=mode,
+                              gsics=gsics)
+
+        counts = segment.counts
+        if lines is not None:
+            counts = counts[lines]
+        if out is None:
+            out = np.empty(counts.shape, dtype=np.float32)
+        elif out.shape != counts.shape:
+            raise ValueError('Shape of out {0} != {1}'.format(
+                out.shape, counts.shape))
+
+        for iStart in range(0, counts.shape[0], chunkLines):
+            chunk = slice(iStart, iStart + chunkLines)
+            # counts are 16-bit, always in the table
+            np.take(lut, counts[chunk], out=out[chunk], mode='clip')
+
+    return out
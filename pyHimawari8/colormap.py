@@ -142,6 +142,86 @@ def signal_status_colormap():
     return SS_CMAP
 
 
+def colormap_lut(cmap, *, N=None):
+    """
+    RGBA lookup table of the colormap, to colorize arrays without matplotlib
+    artists.
+
+    Parameters
+    ----------
+    cmap: str or Colormap
+        colormap name or instance.
+    Keywords
+    --------
+    N: int
+        number of colors (default: `cmap.N`).
+    Returns
+    -------
+    lut: ndarray
+        uint8 RGBA colors. (N, 4)
+    Examples
+    --------
+    >>> lut = colormap_lut(chiljet_colormap())
+    >>> rgba = apply_colormap(data, lut, vmin=0, vmax=15)
+
+    History
+    -------
+    2026-10-18 First version.
+    """
+
+    if isinstance(cmap, str):
+        import matplotlib.pyplot as plt
+        cmap = plt.get_cmap(cmap)
+
+    if N is None:
+        lut = cmap(np.arange(cmap.N))
+    else:
+        lut = cmap(np.linspace(0, 1, N))
+
+    return np.round(lut * 255).astype(np.uint8)
+
+
+def apply_colormap(data, lut, vmin, vmax):
+    """
+    colorize the array with the lookup table.
+
+    The values are mapped linearly from [vmin, vmax] onto the table like
+    `matplotlib.colors.Normalize`, values out of the range take the end
+    colors and invalid (masked or NaN) values are transparent.
+
+    Parameters
+    ----------
+    data: ndarray
+        values, masked or with NaN for invalid values.
+    lut: ndarray
+        uint8 RGBA colors from `colormap_lut`. (N, 4)
+    vmin: float
+    vmax: float
+    Returns
+    -------
+    rgba: ndarray
+        uint8 RGBA image. (..., 4)
+
+    History
+    -------
+    2026-10-18 First version.
+    """
+
+    data = np.ma.filled(np.ma.asarray(data, dtype=np.float32), np.nan)
+
+    N = lut.shape[0]
+    index = (data - np.float32(vmin)) * np.float32(N / (vmax - vmin))
+    invalid = ~np.isfinite(index)
+    index[invalid] = 0
+    # truncation is the floor after clipping to [0, N - 1]
+    index = np.clip(index, 0, N - 1, out=index).astype(np.intp)
+
+    rgba = lut[index]
+    rgba[invalid] = 0
+
+    return rgba
+
+
 def Test():
     print("-------------------Test---------------------")
 
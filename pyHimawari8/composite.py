@@ -0,0 +1,412 @@
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from netCDF4 import Dataset
+from logger import logger
+from helper import getROISlice
+from discovery import parseName
+from instrument import span
+
+CLASSES = {'CLTYPE': 11}   # number of classes of the classification products
+BATCH = 36   # files between the checkpoints
+PERIODS = {'day': '%Y%m%d', 'month': '%Y%m'}
+
+
+def read_frame(file, variables, latRange, lonRange):
+    """
+    region-of-interest subset of the L2 file, read as in `load_data`.
+
+    Returns
+    -------
+    frame: dict
+        masked array of each variable. (lat, lon)
+    lat: ndarray
+    lon: ndarray
+    """
+
+    with Dataset(file, 'r') as fd:
+        latSlice, lonSlice, lat, lon = getROISlice(fd, latRange, lonRange)
+        frame = {variable: fd.variables[variable][latSlice, lonSlice]
+                 for variable in variables}
+
+    return frame, np.asarray(lat), np.asarray(lon)
+
+
+class Composite(object):
+    """
+    Running accumulators of the temporal composite of L2 variables.
+
+    A continuous variable keeps the sum, count, minimum and maximum of the
+    valid values of each grid cell, and a classification variable keeps the
+    count of each class, so the memory is a few grids however many frames
+    are added. Partial composites of disjoint files are combined with
+    `merge`, and the state is saved to and restored from a checkpoint.
+
+    Parameters
+    ----------
+    variables: list
+        variable names, e.g., ['AOT'] or ['CLTYPE', 'CLTH'].
+    lat: ndarray
+        latitude of the grid. [degree]
+    lon: ndarray
+        longitude of the grid. [degree]
+    Keywords
+    --------
+    classes: dict
+        number of classes of each classification variable, valued 0 to
+        n - 1 (default: `CLASSES`).
+    Examples
+    --------
+    >>> comp = Composite(['CLTYPE', 'CLTH'], lat, lon)
+    >>> for file in files:
+    ...     comp.update(read_frame(file, ['CLTYPE', 'CLTH'],
+    ...                            [15, 58], [70, 140])[0], file=file)
+    >>> comp.mean('CLTH')
+    >>> comp.frequency('CLTYPE')
+
+    History
+    -------
+    2026-10-18 First version.
+    """
+
+    def __init__(self, variables, lat, lon, *, classes=None):
+        classes = CLASSES if classes is None else classes
+        self.variables = list(variables)
+        self.lat = np.asarray(lat, dtype=np.float32)
+        self.lon = np.asarray(lon, dtype=np.float32)
+        self.classes = {variable: int(classes[variable])
+                        for variable in self.variables if variable in classes}
+        self.files = []   # files added, in order
+
+        shape = (len(self.lat), len(self.lon))
+        self.stats = {}
+        for variable in self.variables:
+            if variable in self.classes:
+                self.stats[variable] = {'classes': np.zeros(
+                    (self.classes[variable], ) + shape, dtype=np.int32)}
+            else:
+                self.stats[variable] = {
+                    'total': np.zeros(shape, dtype=np.float64),
+                    'count': np.zeros(shape, dtype=np.int32),
+                    'min': np.full(shape, np.inf, dtype=np.float32),
+                    'max': np.full(shape, -np.inf, dtype=np.float32)}
+
+    def __repr__(self):
+        return '<Composite {0} ({1} files)>'.format(self.variables,
+                                                    len(self.files))
+
+    def __len__(self):
+        return len(self.files)
+
+    @property
+    def shape(self):
+        return (len(self.lat), len(self.lon))
+
+    def update(self, frame, *, file=None):
+        """
+        add a frame to the accumulators.
+
+        Parameters
+        ----------
+        frame: dict
+            masked (or NaN) array of each variable on the grid.
+        Keywords
+        --------
+        file: str
+            file of the frame, recorded for resuming.
+        """
+
+        for variable in self.variables:
+            data = np.ma.asarray(frame[variable])
+            if data.shape != self.shape:
+                raise ValueError('Grid {0} of {1} != {2}'.format(
+                    data.shape, variable, self.shape))
+            stats = self.stats[variable]
+
+            if variable in self.classes:
+                values = np.ma.filled(data.astype(np.int32), -1)
+                for iClass, counts in enumerate(stats['classes']):
+                    counts += values == iClass
+                continue
+
+            values = np.ma.filled(data.astype(np.float32), np.nan)
+            valid = np.isfinite(values)
+            values[~valid] = 0
+            stats['total'] += values
+            stats['count'] += valid
+            np.fmin(stats['min'], np.where(valid, values, np.inf),
+                    out=stats['min'])
+            np.fmax(stats['max'], np.where(valid, values, -np.inf),
+                    out=stats['max'])
+
+        if file is not None:
+            self.files.append(file)
+
+    def merge(self, other):
+        """
+        add the accumulators of the composite of other files.
+        """
+
+        if (other.variables != self.variables) or \
+                (other.shape != self.shape):
+            raise ValueError('Cannot merge {0} into {1}'.format(other, self))
+
+        for variable in self.variables:
+            stats = self.stats[variable]
+            if variable in self.classes:
+                stats['classes'] += other.stats[variable]['classes']
+                continue
+
+            stats['total'] += other.stats[variable]['total']
+            stats['count'] += other.stats[variable]['count']
+            np.fmin(stats['min'], other.stats[variable]['min'],
+                    out=stats['min'])
+            np.fmax(stats['max'], other.stats[variable]['max'],
+                    out=stats['max'])
+
+        self.files.extend(other.files)
+
+    def count(self, variable):
+        """
+        number of the valid values of each grid cell.
+        """
+
+        stats = self.stats[variable]
+        if variable in self.classes:
+            return stats['classes'].sum(axis=0, dtype=np.int32)
+        return stats['count'].copy()
+
+    def mean(self, variable):
+        """
+        float32 mean of each grid cell, NaN without valid values.
+        """
+
+        stats = self.stats[variable]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return (stats['total'] / stats['count']).astype(np.float32)
+
+    def minimum(self, variable):
+        """
+        float32 minimum of each grid cell, NaN without valid values.
+        """
+
+        stats = self.stats[variable]
+        return np.where(stats['count'] > 0, stats['min'], np.nan) \
+            .astype(np.float32)
+
+    def maximum(self, variable):
+        """
+        float32 maximum of each grid cell, NaN without valid values.
+        """
+
+        stats = self.stats[variable]
+        return np.where(stats['count'] > 0, stats['max'], np.nan) \
+            .astype(np.float32)
+
+    def frequency(self, variable):
+        """
+        float32 frequency of each class in the valid values of each grid
+        cell, NaN without valid values. (class, lat, lon)
+        """
+
+        counts = self.stats[variable]['classes']
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return (counts / counts.sum(axis=0)).astype(np.float32)
+
+    def save(self, file):
+        """
+        save the state to the checkpoint file, replaced atomically.
+        """
+
+        arrays = {'lat': self.lat, 'lon': self.lon,
+                  'variables': np.array(self.variables),
+                  'files': np.array(self.files, dtype=str),
+                  'classes': np.array([self.classes.get(variable, 0)
+                                       for variable in self.variables])}
+        for variable, stats in self.stats.items():
+            for key, array in stats.items():
+                arrays['{0}/{1}'.format(variable, key)] = array
+
+        tmpFile = file + '.tmp.npz'
+        np.savez(tmpFile, **arrays)
+        os.replace(tmpFile, file)
+
+    @classmethod
+    def load(cls, file):
+        """
+        composite restored from the checkpoint file.
+        """
+
+        with np.load(file) as npz:
+            variables = [str(variable) for variable in npz['variables']]
+            classes = {variable: int(n) for variable, n in
+                       zip(variables, npz['classes']) if n > 0}
+            comp = cls(variables, npz['lat'], npz['lon'], classes=classes)
+            comp.files = [str(name) for name in npz['files']]
+            for variable, stats in comp.stats.items():
+                for key in stats:
+                    stats[key] = npz['{0}/{1}'.format(variable, key)]
+
+        return comp
+
+
+def group_files(files, period):
+    """
+    L2 files grouped by their day or month.
+
+    Parameters
+    ----------
+    files: list
+        L2 files, e.g., from `timeseries.find_files`.
+    period: str
+        'day' or 'month'.
+    Returns
+    -------
+    groups: OrderedDict
+        files of each period, keyed as '20200219' or '202002'.
+
+    History
+    -------
+    2026-10-18 First version.
+    """
+
+    groups = OrderedDict()
+    for file in files:
+        info = parseName(os.path.basename(file))
+        if info is None:
+            logger.warn('Unknown time of {0}'.format(file))
+            continue
+        groups.setdefault(info['time'].strftime(PERIODS[period]),
+                          []).append(file)
+
+    return groups
+
+
+def _grid(files, latRange, lonRange):
+    """
+    grid of the region in the first readable file.
+    """
+
+    for file in files:
+        try:
+            _, lat, lon = read_frame(file, [], latRange, lonRange)
+            return lat, lon
+        except Exception as e:
+            logger.warn('Failed in reading {0}: {1}'.format(file, e))
+
+    raise ValueError('No readable files to composite.')
+
+
+def _accumulate(args):
+    """
+    partial composite of the files in a worker, the failed files skipped.
+    """
+
+    files, variables, latRange, lonRange, lat, lon, classes = args
+    comp = Composite(variables, lat, lon, classes=classes)
+    for file in files:
+        try:
+            frame, _, _ = read_frame(file, variables, latRange, lonRange)
+            comp.update(frame, file=file)
+        except Exception as e:
+            logger.warn('Failed in reading {0}: {1}'.format(file, e))
+
+    return comp
+
+
+def composite(files, variables, *, latRange, lonRange, classes=None,
+              nWorkers=None, checkpoint=None, batch=BATCH):
+    """
+    temporal composite of the L2 variables over the files.
+
+    The files are added in batches. Each batch is split among the worker
+    processes, whose partial composites are merged, and the state is saved
+    to the checkpoint after each batch, so an interrupted run resumes with
+    the files not yet added. The memory is a few grids per worker, however
+    many files there are.
+
+    Parameters
+    ----------
+    files: list
+        L2 files of the period, e.g., from `group_files`.
+    variables: list
+        variable names, e.g., ['CLTYPE', 'CLTH'].
+    Keywords
+    --------
+    latRange: list
+        latitude range. [degree]
+    lonRange: list
+        longitude range. [degree]
+    classes: dict
+        number of classes of each classification variable
+        (default: `CLASSES`).
+    nWorkers: int
+        number of worker processes (default: number of CPUs).
+    checkpoint: str
+        checkpoint file (.npz), resumed from if it exists (default: None).
+    batch: int
+        files between the checkpoints (default: 36).
+    Returns
+    -------
+    comp: Composite
+    Examples
+    --------
+    >>> groups = group_files(find_files('/data/L2/CLP', 'CLP', tStart,
+    ...                                 tStop), 'day')
+    >>> for day, dayFiles in groups.items():
+    ...     comp = composite(dayFiles, ['CLTYPE', 'CLTH'], latRange=[15, 58],
+    ...                      lonRange=[70, 140],
+    ...                      checkpoint='CLP_{0}.npz'.format(day))
+    ...     meanCLTH = comp.mean('CLTH')
+    ...     freqCLTYPE = comp.frequency('CLTYPE')
+
+    History
+    -------
+    2026-10-18 First version.
+    """
+
+    if len(files) == 0:
+        raise ValueError('No files to composite.')
+
+    if (checkpoint is not None) and os.path.exists(checkpoint):
+        comp = Composite.load(checkpoint)
+        if comp.variables != list(variables):
+            raise ValueError('Variables {0} != {1} of {2}'.format(
+                variables, comp.variables, checkpoint))
+        logger.info('Resume {0} with {1} files.'.format(checkpoint,
+                                                        len(comp)))
+    else:
+        lat, lon = _grid(files, latRange, lonRange)
+        comp = Composite(variables, lat, lon, classes=classes)
+
+    done = set(comp.files)
+    pending = [file for file in files if file not in done]
+    nWorkers = min(nWorkers or os.cpu_count() or 1, max(len(pending), 1))
+    executor = ProcessPoolExecutor(max_workers=nWorkers) \
+        if nWorkers > 1 else None
+
+    try:
+        for iStart in range(0, len(pending), batch):
+            batchFiles = pending[iStart:iStart + batch]
+            tasks = [(batchFiles[iWorker::nWorkers], list(variables),
+                      latRange, lonRange, comp.lat, comp.lon, comp.classes)
+                     for iWorker in range(min(nWorkers, len(batchFiles)))]
+
+            with span('composite', files=len(batchFiles), workers=nWorkers):
+                if executor is None:
+                    partials = [_accumulate(task) for task in tasks]
+                else:
+                    partials = list(executor.map(_accumulate, tasks))
+                for partial in partials:
+                    comp.merge(partial)
+
+            if checkpoint is not None:
+                comp.save(checkpoint)
+            logger.info('Composite {0}/{1} files.'.format(
+                len(comp), len(files)))
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    return comp
@@ -1,175 +1,510 @@
-
 import subprocess
 import toml
 import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from logger import logger
 import datetime as dt
 from bypy import ByPy
 from visualizer import Visualizer
-from helper import tRange, getH8ProdFile, getCBSettings
+from helper import tRange, getH8ProdFile, getH8HSDFile, getCBSettings
+from render_cache import RenderCache, render_key
 from colormap import target_classification_colormap
+from instrument import span, collect_spans, add_spans, report
+from uploader import Uploader
+from segment_cache import SegmentCache
+from fetcher import Fetcher
+from discovery import ProductIndex
+from animation import Animation
+from hsd import roi_segments
+from timecube import ingest
 
 
 PROJECTDIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 CONFIGFILE = os.path.join(PROJECTDIR, 'pyHimawari8', 'config', 'settings.toml')
-tNow = dt.datetime.now()
 
 # load configurations
 with open(CONFIGFILE, 'r', encoding='utf-8') as fh:
     CONFIG = toml.loads(fh.read())
 
-# mount JAXA FTP server
-cmd = '/usr/bin/curlftpfs {0} {1} -o nonempty'.format(
-    CONFIG['JAXAFTP_LINK'], CONFIG['JAXAFTP_MP'])
-ret = subprocess.call(cmd, shell=True)
 
-# create time list
-tLapse = dt.timedelta(seconds=3600 * 6)
-tStart = tNow - tLapse
-tStartAtHour = dt.datetime(tStart.year, tStart.month, tStart.day, tStart.hour)
-timeList = tRange(tStartAtHour, tNow, timedelta=1800)
+def dataFiles(mTime):
+    """
+    input files of the given time, relative to the root of the JAXA FTP
+    server.
+
+    Parameters
+    ----------
+    mTime: datetime
+        measurement time.
+    Returns
+    -------
+    files: dict
+        'CLP', 'ARP' and 'TRC' files, 'HSD_Dir' and the 'HSD' segments
+        covering the plot region.
+
+    History
+    -------
+    2026-10-18 First version.
+    """
+
+    L2Dir = os.path.join('pub', 'himawari', 'L2', '{product}', '{version}',
+                         mTime.strftime('%Y%m'), mTime.strftime('%d'),
+                         mTime.strftime('%H'))
+    HSD_Dir = os.path.join('jma', 'hsd', mTime.strftime('%Y%m'),
+                           mTime.strftime('%d'), mTime.strftime('%H'))
+
+    files = {'HSD_Dir': HSD_Dir}
+    for product, version in [('CLP', '010'), ('ARP', '021')]:
+        files[product] = os.path.join(
+            L2Dir.format(product=product, version=version),
+            getH8ProdFile(mTime, product, version=version, pLe='L2'))
+
+    # true color image
+    files['TRC'] = os.path.join(
+        HSD_Dir, getH8ProdFile(mTime, 'TRC', area='JP01'))
+
+    # segments of band 1 for the AOD plot
+    files['HSD'] = [
+        os.path.join(HSD_Dir, getH8HSDFile(mTime, 1, segment))
+        for segment in roi_segments(CONFIG['LAT_RANGE'], CONFIG['LON_RANGE'])]
 
-updatedImgs = []   # updated images
+    return files
 
-for mTime in timeList:
 
-    # create directory
+def createJobs(mTime, *, rootDir=None, index=None):
+    """
+    create the rendering jobs of the given time.
+
+    Parameters
+    ----------
+    mTime: datetime
+        measurement time.
+    Keywords
+    --------
+    rootDir: str
+        local root of the JAXA FTP files, i.e., the mount point or the local
+        mirror (default: `JAXAFTP_MP`).
+    index: ProductIndex
+        index of the product directories under `rootDir`, shared by the
+        time steps (default: a new index).
+    Returns
+    -------
+    jobs: list
+        rendering jobs. Each job is a dict with the input file and its plots.
+        All the variables of the plots are loaded from the file in one pass.
+        Each plot is a dict with the variable, the plotting method of
+        `Visualizer` and its arguments.
+
+    History
+    -------
+    2026-10-18 First version.
+    2026-10-18 Add `rootDir` keyword.
+    2026-10-18 Check the files through the directory index.
+    """
+
+    if rootDir is None:
+        rootDir = CONFIG['JAXAFTP_MP']
+    if index is None:
+        index = ProductIndex(rootDir)
+    files = dataFiles(mTime)
+
+    jobs = []
+
     save_dir = os.path.join(CONFIG['IMG_DIR'], mTime.strftime('%Y%m%d'))
-    if not os.path.exists(save_dir):
-        os.makedirs(save_dir)
-        logger.info('Create saving directory {0}'.format(save_dir))
-
-    # copy true color image
-    product = 'TRC'   # full disk true color image
-    area = 'JP01'
-    AHI_TC_Img = os.path.join(
-        CONFIG['JAXAFTP_MP'], 'jma', 'hsd', mTime.strftime('%Y%m'),
-        mTime.strftime('%d'), mTime.strftime('%H'),
-        getH8ProdFile(mTime, product, area=area))
-    if os.path.exists(AHI_TC_Img):
-        updatedImgs.append([mTime, AHI_TC_Img])
-
-    # create Cloud phase image
+
+    # create Cloud phase and Cloud top height images
     product = 'CLP'
-    variable = 'CLTYPE'
     version = '010'
-    pLe = 'L2'
-    imgFile = os.path.join(
-        save_dir,
-        'H8_{prod}_{var}_{HHMM}_{version}.png'.format(
-            prod=product, var=variable, HHMM=mTime.strftime('%H%M'),
-            version=version))
-    CLPFile = os.path.join(
-        CONFIG['JAXAFTP_MP'], 'pub', 'himawari', pLe, product, version,
-        mTime.strftime('%Y%m'), mTime.strftime('%d'), mTime.strftime('%H'),
-        getH8ProdFile(mTime, product, version=version, pLe=pLe))
-
-    if os.path.exists(CLPFile):
-        vis = Visualizer(
-            CLPFile,
-            latRange=CONFIG['LAT_RANGE'],
-            lonRange=CONFIG['LON_RANGE'])
-        vis.load_data(variable, mTime)
+    CLPFile = os.path.join(rootDir, files[product])
 
+    if index.exists(CLPFile):
+        plots = []
+
+        variable = 'CLTYPE'
+        imgFile = os.path.join(
+            save_dir,
+            'H8_{prod}_{var}_{HHMM}_{version}.png'.format(
+                prod=product, var=variable, HHMM=mTime.strftime('%H%M'),
+                version=version))
         CLTYPE_cbRange, CLTYPE_cbTick, CLTYPE_TL = getCBSettings('CLTYPE')
-        vis.colorplot(
-            imgFile,
-            axLatRange=CONFIG['LAT_RANGE'],
-            axLonRange=CONFIG['LON_RANGE'],
-            vmin=CLTYPE_cbRange[0], vmax=CLTYPE_cbRange[1],
-            cb_ticks=CLTYPE_cbTick, cb_ticklabels=CLTYPE_TL,
-            cmap=target_classification_colormap())
-        logger.info('Export to {0}'.format(imgFile))
-
-        updatedImgs.append([mTime, imgFile])
-    else:
-        logger.warn('CLP file does not exist.\n{0}'.format(CLPFile))
+        plots.append({
+            'variable': variable,
+            'imgFile': imgFile,
+            'method': 'colorplot',
+            'args': (imgFile,),
+            'kwargs': dict(
+                axLatRange=CONFIG['LAT_RANGE'],
+                axLonRange=CONFIG['LON_RANGE'],
+                vmin=CLTYPE_cbRange[0], vmax=CLTYPE_cbRange[1],
+                cb_ticks=CLTYPE_cbTick, cb_ticklabels=CLTYPE_TL,
+                cmap=target_classification_colormap())})
 
-    # create Cloud top height image
-    product = 'CLP'
-    variable = 'CLTH'
-    version = '010'
-    pLe = 'L2'
-    imgFile = os.path.join(
-        save_dir,
-        'H8_{prod}_{var}_{HHMM}_{version}.png'.format(
-            prod=product, var=variable, HHMM=mTime.strftime('%H%M'),
-            version=version))
-    CLPFile = os.path.join(
-        CONFIG['JAXAFTP_MP'], 'pub', 'himawari', pLe, product, version,
-        mTime.strftime('%Y%m'), mTime.strftime('%d'), mTime.strftime('%H'),
-        getH8ProdFile(mTime, product, version=version, pLe=pLe))
-
-    if os.path.exists(CLPFile):
-        vis = Visualizer(
-            CLPFile,
-            latRange=CONFIG['LAT_RANGE'],
-            lonRange=CONFIG['LON_RANGE'])
-        vis.load_data(variable, mTime)
-
-        vis.colorplot(
-            imgFile,
-            axLatRange=CONFIG['LAT_RANGE'],
-            axLonRange=CONFIG['LON_RANGE'],
-            vmin=0, vmax=15)
-        logger.info('Export to {0}'.format(imgFile))
-
-        updatedImgs.append([mTime, imgFile])
+        variable = 'CLTH'
+        imgFile = os.path.join(
+            save_dir,
+            'H8_{prod}_{var}_{HHMM}_{version}.png'.format(
+                prod=product, var=variable, HHMM=mTime.strftime('%H%M'),
+                version=version))
+        plots.append({
+            'variable': variable,
+            'imgFile': imgFile,
+            'method': 'colorplot',
+            'args': (imgFile,),
+            'kwargs': dict(
+                axLatRange=CONFIG['LAT_RANGE'],
+                axLonRange=CONFIG['LON_RANGE'],
+                vmin=0, vmax=15)})
+
+        jobs.append({'mTime': mTime, 'file': CLPFile, 'plots': plots})
     else:
         logger.warn('CLP file does not exist.\n{0}'.format(CLPFile))
 
     # create AOD plot with radiance
+    segmentCache = None
+    if CONFIG.get('HSD_CACHE_DIR'):
+        segmentCache = SegmentCache(
+            CONFIG['HSD_CACHE_DIR'],
+            maxSize=int(CONFIG.get('HSD_CACHE_SIZE', 20) * 2 ** 30))
+
     product = 'ARP'
     variable = 'AOT'
     version = '021'
-    pLe = 'L2'
-    HSD_Dir = os.path.join(
-        CONFIG['JAXAFTP_MP'], 'jma', 'hsd', mTime.strftime('%Y%m'),
-        mTime.strftime('%d'), mTime.strftime('%H')
-    )
+    HSD_Dir = os.path.join(rootDir, files['HSD_Dir'])
     imgFile = os.path.join(
         save_dir, 'H8_{prod}_{var}_{HHMM}_{version}.png'.format(
             prod=product, var=variable, HHMM=mTime.strftime('%H%M'),
             version=version))
-    ARPFile = os.path.join(
-        CONFIG['JAXAFTP_MP'], 'pub', 'himawari', pLe, product, version,
-        mTime.strftime('%Y%m'), mTime.strftime('%d'), mTime.strftime('%H'),
-        getH8ProdFile(mTime, product, version=version, pLe=pLe))
-
-    if os.path.exists(ARPFile):
-        vis = Visualizer(
-            ARPFile,
-            latRange=CONFIG['LAT_RANGE'],
-            lonRange=CONFIG['LON_RANGE'])
+    ARPFile = os.path.join(rootDir, files[product])
 
-        vis.load_data(variable, mTime)
-
-        try:
-            vis.colorplot_with_band(
-                1, HSD_Dir, imgFile,
+    if index.exists(ARPFile):
+        jobs.append({'mTime': mTime, 'file': ARPFile, 'plots': [{
+            'variable': variable,
+            'imgFile': imgFile,
+            'method': 'colorplot_with_band',
+            'args': (1, HSD_Dir, imgFile),
+            'kwargs': dict(
                 axLatRange=CONFIG['LAT_RANGE'],
                 axLonRange=CONFIG['LON_RANGE'],
                 vmin=0, vmax=1,
-                pixels=1000)
-            logger.info('Export to {0}'.format(imgFile))
-
-            updatedImgs.append([mTime, imgFile])
-        except ValueError as e:
-            logger.warn(e)
+                pixels=1000,
+                lutDir=CONFIG.get('RESAMPLE_LUT_DIR'),
+                segmentCache=segmentCache,
+                index=index)}]})
     else:
         logger.warn('ARP file does not exist.\n{0}'.format(ARPFile))
 
-# push to baiduyun
-bp = ByPy()
-# You need to authorize the app manually at first time.
-logger.info('Start to sync items to Baidu Yun!')
-bp.mkdir(CONFIG['BDY_DIR'])
-for item in updatedImgs:
-    logger.info('Upload to BDY: {0}'.format(item[1]))
-    BDY_Dir = os.path.join(CONFIG['BDY_DIR'], item[0].strftime('%Y%m%d'))
-    bp.mkdir(BDY_Dir)
-    bp.upload(item[1], BDY_Dir)
-
-# umount ftp server
-cmd = 'umount {0}'.format(CONFIG['JAXAFTP_MP'])
-subprocess.call(cmd, shell=True)
+    return jobs
+
+
+def render(job):
+    """
+    render all the plots of a single job.
+
+    The variables are loaded from the data file in one pass. A failed plot is
+    logged and skipped, without aborting the other plots.
+
+    Parameters
+    ----------
+    job: dict
+        rendering job created by `createJobs`.
+    Returns
+    -------
+    items: list
+        [measurement time, exported image] of each plot, including the
+        up-to-date images, which may not be uploaded yet. None if the plot
+        failed.
+
+    History
+    -------
+    2026-10-18 First version.
+    2026-10-18 Load all the variables of the job at once.
+    2026-10-18 Return the up-to-date images as well.
+    """
+
+    cache = None
+    if CONFIG.get('RENDER_CACHE_DIR'):
+        cache = RenderCache(CONFIG['RENDER_CACHE_DIR'])
+
+    # check the manifest before opening the data file
+    items = [None] * len(job['plots'])
+    plots = []   # (index, plot) to be rendered
+    for iPlot, plot in enumerate(job['plots']):
+        if cache is not None:
+            imgFile, inputs, params = render_key(
+                getattr(Visualizer, plot['method']), job['file'],
+                plot['args'], plot['kwargs'],
+                product=plot['variable'], mTime=job['mTime'],
+                latRange=CONFIG['LAT_RANGE'], lonRange=CONFIG['LON_RANGE'])
+            if cache.is_fresh(imgFile, inputs, params):
+                logger.info('{0} is up to date.'.format(imgFile))
+                items[iPlot] = [job['mTime'], plot['imgFile']]
+                continue
+        plots.append((iPlot, plot))
+
+    if len(plots) == 0:
+        return items
+
+    vis = Visualizer(
+        job['file'],
+        latRange=CONFIG['LAT_RANGE'],
+        lonRange=CONFIG['LON_RANGE'])
+    vis.load_variables([plot['variable'] for _, plot in plots], job['mTime'])
+
+    for iPlot, plot in plots:
+        try:
+            vis.select(plot['variable'])
+            with span('render', imgFile=plot['imgFile']):
+                getattr(vis, plot['method'])(
+                    *plot['args'], cache=cache, **plot['kwargs'])
+            logger.info('Export to {0}'.format(plot['imgFile']))
+        except Exception as e:
+            logger.warn('Failed in rendering {0}: {1}'.format(
+                plot['imgFile'], e))
+            continue
+
+        items[iPlot] = [job['mTime'], plot['imgFile']]
+
+    return items
+
+
+def _renderWorker(job):
+    """
+    render the job in a worker process and return the spans alongside.
+    """
+
+    try:
+        return render(job), collect_spans()
+    except Exception:
+        collect_spans()   # don't leak into the next job of the worker
+        raise
+
+
+def runJobs(jobs, *, nWorkers=1, onDone=None):
+    """
+    run the rendering jobs, in parallel if `nWorkers` > 1.
+
+    A failed job is logged and skipped, without aborting the other jobs.
+
+    Parameters
+    ----------
+    jobs: list
+        rendering jobs.
+    Keywords
+    --------
+    nWorkers: int
+        number of worker processes (default: 1).
+    onDone: callable
+        called with the items of each job as soon as the job is finished,
+        e.g., to upload the images while the other jobs are being rendered
+        (default: None).
+    Returns
+    -------
+    items: list
+        [measurement time, exported image] of the plots of each job, in the
+        same order as `jobs`. It's None for the failed plot.
+
+    History
+    -------
+    2026-10-18 First version.
+    2026-10-18 Merge the spans of the workers.
+    2026-10-18 Add `onDone` keyword.
+    2026-10-18 Keep the up-to-date images in the items.
+    """
+
+    items = [None] * len(jobs)
+
+    def finish(iJob, jobItems):
+        items[iJob] = jobItems
+        if onDone is not None:
+            onDone(jobItems)
+
+    if nWorkers <= 1:
+        for iJob, job in enumerate(jobs):
+            try:
+                jobItems = render(job)
+            except Exception as e:
+                logger.warn('Failed in rendering {0}: {1}'.format(
+                    job['file'], e))
+                jobItems = [None] * len(job['plots'])
+            finish(iJob, jobItems)
+
+        return items
+
+    with ProcessPoolExecutor(max_workers=nWorkers) as executor:
+        futures = {executor.submit(_renderWorker, job): iJob
+                   for iJob, job in enumerate(jobs)}
+
+        for future in as_completed(futures):
+            iJob = futures[future]
+            try:
+                jobItems, spans = future.result()
+                add_spans(spans)
+            except Exception as e:
+                logger.warn('Failed in rendering {0}: {1}'.format(
+                    jobs[iJob]['file'], e))
+                jobItems = [None] * len(jobs[iJob]['plots'])
+            finish(iJob, jobItems)
+
+    return items
+
+
+def animate(jobs):
+    """
+    add the images of the jobs to the rolling animations and export them.
+
+    Only the new or changed images are encoded, the other frames are reused.
+
+    Parameters
+    ----------
+    jobs: list
+        rendering jobs.
+    Returns
+    -------
+    files: list
+        exported animations.
+
+    History
+    -------
+    2026-10-18 First version.
+    """
+
+    window = CONFIG.get('ANIMATION_WINDOW', 24)
+
+    files = []
+    for variable in CONFIG.get('ANIMATION_VARIABLES', []):
+        anim = Animation(os.path.join(CONFIG['ANIMATION_DIR'], variable),
+                         window=dt.timedelta(hours=window))
+
+        for job in jobs:
+            for plot in job['plots']:
+                if (plot['variable'] == variable) and \
+                   os.path.exists(plot['imgFile']):
+                    anim.add_frame(job['mTime'], plot['imgFile'])
+
+        if not anim.frames:
+            continue
+
+        file = os.path.join(CONFIG['IMG_DIR'], 'H8_{0}_{1}h.gif'.format(
+            variable, window))
+        with span('animate', variable=variable):
+            files.append(anim.write_gif(file))
+        logger.info('Export animation to {0}'.format(file))
+
+    return files
+
+
+def main():
+
+    tNow = dt.datetime.now()
+
+    # create time list
+    tLapse = dt.timedelta(seconds=3600 * 6)
+    tStart = tNow - tLapse
+    tStartAtHour = dt.datetime(
+        tStart.year, tStart.month, tStart.day, tStart.hour)
+    timeList = tRange(tStartAtHour, tNow, timedelta=1800)
+
+    if CONFIG.get('MIRROR_DIR'):
+        # download the files of the time window to the local mirror
+        rootDir = CONFIG['MIRROR_DIR']
+        relPaths = []
+        for mTime in timeList:
+            files = dataFiles(mTime)
+            relPaths.extend([files['CLP'], files['ARP'], files['TRC']] +
+                            files['HSD'])
+
+        fetcher = Fetcher(CONFIG['JAXAFTP_LINK'], rootDir,
+                          nConnections=CONFIG.get('FTP_CONNECTIONS', 4))
+        with span('fetch'):
+            fetcher.fetch(relPaths)
+    else:
+        # mount JAXA FTP server
+        rootDir = CONFIG['JAXAFTP_MP']
+        cmd = '/usr/bin/curlftpfs {0} {1} -o nonempty'.format(
+            CONFIG['JAXAFTP_LINK'], CONFIG['JAXAFTP_MP'])
+        with span('mount'):
+            ret = subprocess.call(cmd, shell=True)
+
+    # push to baiduyun, as soon as the images are ready
+    # You need to authorize the app manually at first time.
+    # The images uploaded since they were rendered are skipped.
+    cache = None
+    if CONFIG.get('RENDER_CACHE_DIR'):
+        cache = RenderCache(CONFIG['RENDER_CACHE_DIR'])
+    uploader = Uploader(ByPy, CONFIG['BDY_DIR'],
+                        nThreads=CONFIG.get('UPLOAD_THREADS', 4),
+                        retries=CONFIG.get('UPLOAD_RETRIES', 3),
+                        cache=cache)
+    logger.info('Start to sync items to Baidu Yun!')
+
+    jobs = []
+    pending = []   # true color images
+    index = ProductIndex(rootDir, ttl=CONFIG.get('INDEX_TTL', 60))
+
+    for mTime in timeList:
+
+        # create directory
+        save_dir = os.path.join(CONFIG['IMG_DIR'], mTime.strftime('%Y%m%d'))
+        if not os.path.exists(save_dir):
+            os.makedirs(save_dir)
+            logger.info('Create saving directory {0}'.format(save_dir))
+
+        # copy true color image
+        AHI_TC_Img = os.path.join(rootDir, dataFiles(mTime)['TRC'])
+        if index.exists(AHI_TC_Img):
+            pending.append([mTime, AHI_TC_Img])
+
+        jobs.extend(createJobs(mTime, rootDir=rootDir, index=index))
+
+    # add the ROI subsets of the L2 files to the time cubes
+    if CONFIG.get('TIMECUBE_DIR'):
+        cubeFiles = []
+        for mTime in timeList:
+            files = dataFiles(mTime)
+            for product in ['CLP', 'ARP']:
+                file = os.path.join(rootDir, files[product])
+                if index.exists(file):
+                    cubeFiles.append((product, mTime, file))
+
+        nIngested = ingest(cubeFiles, CONFIG['TIMECUBE_DIR'],
+                           CONFIG.get('TIMECUBE_VARIABLES', {}),
+                           latRange=CONFIG['LAT_RANGE'],
+                           lonRange=CONFIG['LON_RANGE'])
+        logger.info('Ingest {0} files into the time cubes.'.format(
+            nIngested))
+
+    nWorkers = CONFIG.get('WORKERS', 1)
+    logger.info('Start to render {0} files with {1} workers.'.format(
+        len(jobs), nWorkers))
+
+    # the pending images are uploaded along with the first job, as the
+    # workers shouldn't be forked with running upload threads
+    def upload(jobItems):
+        for item in pending + jobItems:
+            if item is not None:
+                uploader.submit(*item)
+        del pending[:]
+
+    runJobs(jobs, nWorkers=nWorkers, onDone=upload)
+    upload([])
+
+    if CONFIG.get('ANIMATION_DIR'):
+        for file in animate(jobs):
+            uploader.submit(tNow, file)
+
+    failed = uploader.close()
+    if failed:
+        logger.warn('{0} images failed to be uploaded.'.format(len(failed)))
+
+    # umount ftp server
+    if not CONFIG.get('MIRROR_DIR'):
+        cmd = 'umount {0}'.format(CONFIG['JAXAFTP_MP'])
+        subprocess.call(cmd, shell=True)
+
+    # stage summary and metrics
+    report(jsonlFile=CONFIG.get('METRICS_JSONL'),
+           promFile=CONFIG.get('METRICS_PROM'))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,257 @@
+import os
+import re
+import time
+import threading
+import datetime as dt
+
+# filename patterns of the JAXA products
+PATTERNS = {
+    'L2': re.compile(
+        r'^NC_H08_(?P<time>\d{8}_\d{4})_(?P<level>L[23])(?P<product>[A-Z]{3})'
+        r'(?P<version>\d{3})_(?P<area>[A-Z0-9]+)\.(?P<pixels>\d{5})_'
+        r'(?P<lines>\d{5})\.nc$'),
+    'HSD': re.compile(
+        r'^HS_H08_(?P<time>\d{8}_\d{4})_B(?P<band>\d{2})_(?P<area>[A-Z0-9]+)_'
+        r'R(?P<resolution>\d{2})_S(?P<segment>\d{2})(?P<nSegments>\d{2})'
+        r'\.DAT(?P<bz2>\.bz2)?$'),
+    'TRC': re.compile(
+        r'^PI_H08_(?P<time>\d{8}_\d{4})_TRC_(?P<area>[A-Z0-9]+)_'
+        r'R(?P<resolution>\d{2})_\w+\.png$')}
+
+
+def parseName(name):
+    """
+    parse the filename of the JAXA products.
+
+    Parameters
+    ----------
+    name: str
+        basename of the file.
+    Returns
+    -------
+    info: dict
+        'kind' ('L2', 'HSD' or 'TRC'), 'time' and the other fields of the
+        filename. None if the name is unknown.
+    Examples
+    --------
+    >>> parseName('HS_H08_20200219_0400_B01_FLDK_R10_S0310.DAT.bz2')
+    {'kind': 'HSD', 'time': datetime.datetime(2020, 2, 19, 4, 0), 'band': 1,
+    'area': 'FLDK', 'resolution': 10, 'segment': 3, 'nSegments': 10,
+    'bz2': True}
+
+    History
+    -------
+    2026-10-18 First version.
+    """
+
+    for kind, pattern in PATTERNS.items():
+        match = pattern.match(name)
+        if match is None:
+            continue
+
+        info = {'kind': kind}
+        for key, value in match.groupdict().items():
+            if key == 'time':
+                value = dt.datetime.strptime(value, '%Y%m%d_%H%M')
+            elif key == 'bz2':
+                value = value is not None
+            elif key in ('band', 'resolution', 'segment', 'nSegments'):
+                value = int(value)
+            info[key] = value
+
+        return info
+
+    return None
+
+
+class ProductIndex(object):
+    """
+    In-memory index of the product directories.
+
+    Each directory (e.g., `.../YYYYMM/DD/HH`) is listed once and its
+    filenames are parsed into the index, so that the existence checks and
+    file matching don't need a round trip to the (FUSE mounted) server.
+    A file missing from a listed directory is reported as missing until the
+    listing is older than `ttl`, then the directory is listed again, as new
+    files keep arriving on the server. Missing directories are cached the
+    same way.
+
+    Parameters
+    ----------
+    rootDir: str
+        root directory of the products, e.g., the mount point.
+    Keywords
+    --------
+    ttl: float
+        time to live of the negative lookups (default: 60). [s]
+    Examples
+    --------
+    >>> index = ProductIndex('/mnt/ftp_mount_point')
+    >>> index.exists('/mnt/ftp_mount_point/pub/himawari/L2/CLP/010/...')
+    True
+    >>> index.find_hsd(HSD_Dir, mTime, 1, segments=[1, 2, 3, 4])
+
+    History
+    -------
+    2026-10-18 First version.
+    """
+
+    def __init__(self, rootDir, *, ttl=60):
+        self.rootDir = rootDir
+        self.ttl = ttl
+        self._dirs = {}   # (listing time, {name: info}) of each directory
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def _path(self, path):
+        return os.path.normpath(os.path.join(self.rootDir, path))
+
+    def _list(self, dirPath):
+        """
+        list and parse the directory.
+        """
+
+        try:
+            names = os.listdir(dirPath)
+        except (FileNotFoundError, NotADirectoryError):
+            names = []
+
+        entries = {name: parseName(name) for name in names}
+
+        with self._lock:
+            self._dirs[dirPath] = (time.monotonic(), entries)
+
+        return entries
+
+    def listdir(self, dirPath, *, refresh=False):
+        """
+        parsed entries of the directory.
+
+        Parameters
+        ----------
+        dirPath: str
+            directory, absolute or relative to `rootDir`.
+        Keywords
+        --------
+        refresh: bool
+            list the directory again if the listing is older than `ttl`
+            (default: False).
+        Returns
+        -------
+        entries: dict
+            parsed filename (None if unknown) of each file.
+        """
+
+        dirPath = self._path(dirPath)
+
+        with self._lock:
+            cached = self._dirs.get(dirPath)
+
+        if cached is None or \
+           (refresh and time.monotonic() - cached[0] > self.ttl):
+            return self._list(dirPath)
+
+        return cached[1]
+
+    def exists(self, file):
+        """
+        whether the file exists, answered from the index.
+        """
+
+        file = self._path(file)
+        dirPath, name = os.path.split(file)
+
+        if name in self.listdir(dirPath):
+            return True
+
+        # negative lookup expires after `ttl`
+        return name in self.listdir(dirPath, refresh=True)
+
+    def find(self, dirPath, *, tolerance=300, refresh=True, **criteria):
+        """
+        find the files in the directory matching the criteria.
+
+        Parameters
+        ----------
+        dirPath: str
+            directory, absolute or relative to `rootDir`.
+        Keywords
+        --------
+        tolerance: float
+            maximum difference to the 'time' criterion (default: 300). [s]
+        refresh: bool
+            list the directory again if nothing is found and the listing is
+            older than `ttl` (default: True).
+        criteria:
+            fields of the parsed filename, e.g., kind='HSD', band=1,
+            time=mTime. A list or set matches any of its values.
+        Returns
+        -------
+        files: list
+            matched files, sorted by name.
+        """
+
+        def matched(info):
+            if info is None:
+                return False
+            for key, value in criteria.items():
+                if key not in info:
+                    return False
+                if key == 'time':
+                    if abs((info['time'] - value).total_seconds()) > \
+                       tolerance:
+                        return False
+                elif isinstance(value, (list, tuple, set)):
+                    if info[key] not in value:
+                        return False
+                elif info[key] != value:
+                    return False
+            return True
+
+        dirPath = self._path(dirPath)
+        files = [os.path.join(dirPath, name) for name, info in
+                 sorted(self.listdir(dirPath).items()) if matched(info)]
+
+        if not files and refresh:
+            files = [os.path.join(dirPath, name) for name, info in
+                     sorted(self.listdir(dirPath, refresh=True).items())
+                     if matched(info)]
+
+        return files
+
+    def find_hsd(self, HSD_Dir, mTime, band, *, segments=None, area='FLDK'):
+        """
+        find the HSD segments of the band at the measurement time.
+
+        Parameters
+        ----------
+        HSD_Dir: str
+            HSD directory.
+        mTime: datetime
+            measurement time.
+        band: int
+            band number [1-16].
+        Keywords
+        --------
+        segments: list
+            segment sequence numbers (default: all).
+        area: str
+            observation area (default: 'FLDK').
+        Returns
+        -------
+        files: list
+        """
+
+        criteria = dict(kind='HSD', time=mTime, band=band, area=area)
+        if segments is not None:
+            criteria['segment'] = list(segments)
+
+        return self.find(HSD_Dir, **criteria)
@@ -4,6 +4,9 @@ import os
 import datetime as dt
 from logger import logger
 import numpy as np
+from hsd import HSDSegment
+
+_ROI_SLICES = {}   # slices of the region of interest of each grid
 
 
 def getH8ProdFile(thisTime, product, *,
@@ -98,6 +101,55 @@ def getH8ProdFile(thisTime, product, *,
     return file
 
 
+def getH8HSDFile(thisTime, band, segment, *,
+                 area='FLDK', nSegments=10, compressed=True):
+    """
+    get the Himawari-8 HSD segment filename.
+
+    Parameters
+    ----------
+    thisTime: datetime
+        observation start time.
+    band: int
+        band number [1-16].
+    segment: int
+        segment sequence number [1-nSegments].
+    Keywords
+    --------
+    area: str
+        observation area (default: 'FLDK').
+    nSegments: int
+        total number of segments (default: 10).
+    compressed: bool
+        bzip2 compressed file (default: True).
+    Examples
+    --------
+    >>> getH8HSDFile(dt.datetime(2020, 2, 19, 4, 0), 1, 3)
+    'HS_H08_20200219_0400_B01_FLDK_R10_S0310.DAT.bz2'
+
+    History
+    -------
+    2026-10-18 First version.
+    """
+
+    # spatial resolution of each band [0.1 km]
+    if band == 3:
+        resolution = 5
+    elif band in [1, 2, 4]:
+        resolution = 10
+    else:
+        resolution = 20
+
+    file = 'HS_H08_{0}_B{1:02d}_{2}_R{3:02d}_S{4:02d}{5:02d}.DAT'.format(
+        thisTime.strftime('%Y%m%d_%H%M'), band, area, resolution, segment,
+        nSegments)
+
+    if compressed:
+        file = file + '.bz2'
+
+    return file
+
+
 def tRange(tStart, tStop, *, timedelta=300):
     """
     Generate datetime list between tStart and tStop with fixed timedelta.
@@ -226,295 +278,133 @@ def getCBSettings(product):
     return cbRange, cbTicks, cbTickLabels
 
 
-def read_Himawari8(inFile):
+def getGridSignature(fd):
+    """
+    signature of the L2 grid, i.e., size and end points of the
+    latitude/longitude vectors, without reading the vectors.
+
+    Parameters
+    ----------
+    fd: netCDF4.Dataset or zarr.Group
+        L2 dataset (or time cube) with 'latitude' and 'longitude' vectors.
+    Returns
+    -------
+    signature: tuple
+
+    History
+    -------
+    2026-10-18 First version.
+    """
+
+    variables = getattr(fd, 'variables', fd)
+    latVar = variables['latitude']
+    lonVar = variables['longitude']
+
+    return (latVar.size, float(latVar[0]), float(latVar[-1]),
+            lonVar.size, float(lonVar[0]), float(lonVar[-1]))
+
+
+def getROISlice(fd, latRange, lonRange):
+    """
+    get the slices of the region of interest in the L2 grid.
+
+    The L2 grids are regular and monotonic, so the region of interest is
+    always a contiguous block, which can be read directly as a hyperslab.
+    The slices are cached per grid signature (size and end points of the
+    latitude/longitude vectors) and region.
+
+    Parameters
+    ----------
+    fd: netCDF4.Dataset or zarr.Group
+        L2 dataset (or time cube) with 'latitude' and 'longitude' vectors.
+    latRange: list
+        latitude range. [degree]
+    lonRange: list
+        longitude range. [degree]
+    Returns
+    -------
+    latSlice: slice
+    lonSlice: slice
+    lat: ndarray
+        latitude of the region.
+    lon: ndarray
+        longitude of the region.
+    Examples
+    --------
+    >>> latSlice, lonSlice, lat, lon = getROISlice(fd, [20, 50], [110, 130])
+    >>> data = fd.variables['CLTH'][latSlice, lonSlice]
+
+    History
+    -------
+    2026-10-18 First version.
+    2026-10-18 Accept the time cube.
+    2026-10-18 Use `getGridSignature`.
+    """
+
+    variables = getattr(fd, 'variables', fd)
+    latVar = variables['latitude']
+    lonVar = variables['longitude']
+    signature = getGridSignature(fd) + (tuple(latRange), tuple(lonRange))
+
+    if signature not in _ROI_SLICES:
+        lat = latVar[:]
+        lon = lonVar[:]
+
+        slices = []
+        for coord, cRange in zip([lat, lon], [latRange, lonRange]):
+            index = np.nonzero(np.logical_and(coord >= cRange[0],
+                                              coord <= cRange[1]))[0]
+            if len(index) == 0:
+                slices.append(slice(0, 0))
+            else:
+                slices.append(slice(int(index[0]), int(index[-1]) + 1))
+
+        _ROI_SLICES[signature] = (slices[0], slices[1],
+                                  lat[slices[0]], lon[slices[1]])
+
+    return _ROI_SLICES[signature]
+
+
+def read_Himawari8(inFile, *, tmpDir=None, cache=None):
     """
     read Himawari8 binary data.
 
-    WARNING WARNING WARNING!!!
-    Discarded since satpy provides easier interface to play with HSD dataset.
+    Only the header blocks are parsed, according to their declared block
+    lengths. The pixel counts are mapped lazily, so that opening a segment
+    costs kilobytes and slicing rows only touches the corresponding pages.
 
     Parameters
     ----------
     inFile: str
-        filename.
+        filename. ('.DAT' or '.DAT.bz2')
+    Keywords
+    --------
+    tmpDir: str
+        directory for the decompressed pixel data of '.DAT.bz2' files
+        (default: system temporary directory).
+    cache: SegmentCache
+        resolve '.DAT.bz2' files to the cached decompressed segments
+        (default: None).
     Returns
     -------
+    segment: HSDSegment
+        `segment.header` contains the header blocks and `segment.counts` is
+        the memory-mapped pixel counts (lines, columns).
     Examples
     --------
+    >>> seg = read_Himawari8('HS_H08_20200219_0400_B01_FLDK_R10_S0110.DAT')
+    >>> seg.header['block2']['number_of_lines']
+    1100
+    >>> seg.counts[0:10].shape
+    (10, 11000)
     References
     ----------
-    1. https://blog.csdn.net/qq_33339770/article/details/102708243
-    """
+    1. ../doc/HS_D_users_guide_en_v13.pdf
 
-    resolution = int(os.path.basename(inFile)[-12])
+    History
+    -------
+    2026-10-18 Replace the full-file structured dtype by `HSDSegment`.
+    2026-10-18 Add `cache` keyword.
+    """
 
-    if resolution == 1:
-        res = 12100000
-        nlin = 1100
-        ncol = 11000
-    elif resolution == 2:
-        res = 3025000
-        nlin = 550
-        ncol = 5500
-    else:
-        res = 48400000
-        nlin = 2200
-        ncol = 22000
-
-    band = int(os.path.basename(inFile)[-21:-19])
-    if band < 7:
-        formation = [
-            ('Block number1', 'i1', 1),
-            ('Block length1', 'i2', 1),
-            ('Total number of header blocks ', 'i2', 1),
-            ('Byte order', 'i1', 1),
-            ('Satellite name', 'S1', 16),
-            ('Processing center name', 'S1', 16),
-            ('Observation area', 'S1', 4),
-            ('Other observation information', 'S1', 2),
-            ('Observation timeline', 'i2', 1),
-            ('Observation start time', 'float64', 1),
-            ('Observation end time', 'float64', 1),
-            ('File creation time', 'float64', 1),
-            ('Total header length', 'i4', 1),
-            ('Total data length', 'i4', 1),
-            ('Quality flag 1', 'i1', 1),
-            ('Quality flag 2 ', 'i1', 1),
-            ('Quality flag 3', 'i1', 1),
-            ('Quality flag 4', 'i1', 1),
-            ('File format version', 'S1', 32),
-            ('File name ', 'S1', 128),
-            ('Spare1', 'S1', 40),
-            ('Block number2', 'i1', 1),
-            ('Block length2', 'i2', 1),
-            ('Number of bits per pixel', 'i2', 1),
-            ('Number of columns', 'i2', 1),
-            ('Number of lines', 'i2', 1),
-            ('Compression flag for data', 'i1', 1),
-            ('Spare2', 'S1', 40),
-            ('Block number3', 'i1', 1),
-            ('Block length3', 'i2', 1),
-            ('sub_lon', 'float64', 1),
-            ('Column scaling factor', 'i4', 1),
-            ('Line scaling factor', 'i4', 1),
-            ('Column offset', 'float32', 1),
-            ('Line offset', 'float32', 1),
-            ('Distance from Earth’s center to virtual satellite',
-             'float64', 1),
-            ('Earth’s equatorial radius', 'float64', 1),
-            ('Earth’s polar radius', 'float64', 1),
-            ('var1', 'float64', 1),
-            ('var2', 'float64', 1),
-            ('var3', 'float64', 1),
-            ('Coefficient for sd', 'float64', 1),
-            ('Resampling types', 'i2', 1),
-            ('Resampling size', 'i2', 1),
-            ('Spare3', 'S1', 40),
-            ('Block number4', 'i1', 1),
-            ('Block length4', 'i2', 1),
-            ('Navigation information time', 'float64', 1),
-            ('SSP longitude', 'float64', 1),
-            ('SSP latitude', 'float64', 1),
-            ('Distance from Earth’s center to Satellite', 'float64', 1),
-            ('Nadir longitude', 'float64', 1),
-            ('Nadir latitude', 'float64', 1),
-            ('Sun’s position', 'float64', 3),
-            ('Moon’s position', 'float64', 3),
-            ('Spare4', 'S1', 40),
-            ('Block number5', 'i1', 1),
-            ('Block length5', 'i2', 1),
-            ('Band number', 'i2', 1),
-            ('Central wave length', 'float64', 1),
-            ('Valid number of bits per pixel', 'i2', 1),
-            ('Count value of error pixels', 'uint16', 1),
-            ('Count value of pixels outside scan area', 'uint16', 1),
-            ('Slope for count-radiance conversion equation ', 'float64', 1),
-            ('Intercept for count-radiance conversion equation', 'float64', 1),
-            ('Coefficient for transformation from radiance to albedo',
-             'float64', 1),
-            ('Update time of the values of the following No. 12 and No. 13',
-             'float64', 1),
-            ('Calibrated Slope for count-radiance conversion ' +
-             'equation_updated value of No. 8 of this block ', 'float64', 1),
-            ('Calibrated Intercept for count-radiance conversion ' +
-             'equation_updated value of No. 9 of this block ', 'float64', 1),
-            ('Spare5', 'S1', 80),
-            ('Block number6', 'i1', 1),
-            ('Block length6', 'i2', 1),
-            ('GSICS calibration coefficient_Intercept', 'float64', 1),
-            ('GSICS calibration coefficient_Slope', 'float64', 1),
-            ('GSICS calibration coefficient_Quadratic term', 'float64', 1),
-            ('Radiance bias for standard scene', 'float64', 1),
-            ('Uncertainty of radiance bias for standard scene', 'float64', 1),
-            ('Radiance for standard scene', 'float64', 1),
-            ('Start time of GSICS Correction validity period', 'float64', 1),
-            ('End time of GSICS Correction validity period', 'float64', 1),
-            ('Radiance validity range of GSICS calibration ' +
-             'coefficients_upper limit', 'float32', 1),
-            ('Radiance validity range of GSICS calibration ' +
-             'coefficients_lower limit', 'float32', 1),
-            ('File name of GSICS Correction', 'S1', 128),
-            ('Spare6', 'S1', 56),
-            ('Block number7', 'i1', 1),
-            ('Block length7', 'i2', 1),
-            ('Total number of segments', 'i1', 1),
-            ('Segment sequence number', 'i1', 1),
-            ('First line number of image segment', 'i2', 1),
-            ('Spare7', 'S1', 40),
-            ('Block number8', 'i1', 1),
-            ('Block length8', 'i2', 1),
-            ('Center column of rotation', 'float32', 1),
-            ('Center line of rotation', 'float32', 1),
-            ('Amount of rotational correction', 'float64', 1),
-            ('Number of correction information data for ' +
-             'column and line direction', 'i2', 1),
-            ('Line number after rotation', 'i2', 1),
-            ('Shift amount for column direction', 'float32', 1),
-            ('Shift amount for line direction8', 'float32', 1),
-            ('Spare8', 'S1', 50),
-            ('Block number9', 'i1', 1),
-            ('Block length9', 'i2', 1),
-            ('Number of observation times9', 'i2', 1),
-            ('Line number9', 'i2', 1),
-            ('Observation time9', 'float64', 1),
-            ('Spare9', 'S1', 70),
-            ('Block number10', 'i1', 1),
-            ('Block length10', 'i4', 1),
-            ('Number of error information data', 'i2', 1),
-            ('Line number10', 'i2', 1),
-            ('Number of error pixels per line10', 'i2', 1),
-            ('Spare10', 'S1', 36),
-            ('Block number11', 'i1', 1),
-            ('Block length11', 'i2', 1),
-            ('Spare11', 'S1', 256),
-            ('Count value of each pixel', 'i2', res)]
-    else:
-        formation = [
-            ('Block number1', 'i1', 1),
-            ('Block length1', 'i2', 1),
-            ('Total number of header blocks ', 'i2', 1),
-            ('Byte order', 'i1', 1),
-            ('Satellite name', 'S1', 16),
-            ('Processing center name', 'S1', 16),
-            ('Observation area', 'S1', 4),
-            ('Other observation information', 'S1', 2),
-            ('Observation timeline', 'i2', 1),
-            ('Observation start time', 'float64', 1),
-            ('Observation end time', 'float64', 1),
-            ('File creation time', 'float64', 1),
-            ('Total header length', 'i4', 1),
-            ('Total data length', 'i4', 1),
-            ('Quality flag 1', 'i1', 1),
-            ('Quality flag 2 ', 'i1', 1),
-            ('Quality flag 3', 'i1', 1),
-            ('Quality flag 4', 'i1', 1),
-            ('File format version', 'S1', 32),
-            ('File name ', 'S1', 128),
-            ('Spare1', 'S1', 40),
-            ('Block number2', 'i1', 1),
-            ('Block length2', 'i2', 1),
-            ('Number of bits per pixel', 'i2', 1),
-            ('Number of columns', 'i2', 1),
-            ('Number of lines', 'i2', 1),
-            ('Compression flag for data', 'i1', 1),
-            ('Spare2', 'S1', 40),
-            ('Block number3', 'i1', 1),
-            ('Block length3', 'i2', 1),
-            ('sub_lon', 'float64', 1),
-            ('Column scaling factor', 'i4', 1),
-            ('Line scaling factor', 'i4', 1),
-            ('Column offset', 'float32', 1),
-            ('Line offset', 'float32', 1),
-            ('Distance from Earth’s center to virtual satellite',
-             'float64', 1),
-            ('Earth’s equatorial radius', 'float64', 1),
-            ('Earth’s polar radius', 'float64', 1),
-            ('var1', 'float64', 1),
-            ('var2', 'float64', 1),
-            ('var3', 'float64', 1),
-            ('Coefficient for sd', 'float64', 1),
-            ('Resampling types', 'i2', 1),
-            ('Resampling size', 'i2', 1),
-            ('Spare3', 'S1', 40),
-            ('Block number4', 'i1', 1),
-            ('Block length4', 'i2', 1),
-            ('Navigation information time', 'float64', 1),
-            ('SSP longitude', 'float64', 1),
-            ('SSP latitude', 'float64', 1),
-            ('Distance from Earth’s center to Satellite', 'float64', 1),
-            ('Nadir longitude', 'float64', 1),
-            ('Nadir latitude', 'float64', 1),
-            ('Sun’s position', 'float64', 3),
-            ('Moon’s position', 'float64', 3),
-            ('Spare4', 'S1', 40),
-            ('Block number5', 'i1', 1),
-            ('Block length5', 'i2', 1),
-            ('Band number', 'i2', 1),
-            ('Central wave length', 'float64', 1),
-            ('Valid number of bits per pixel', 'i2', 1),
-            ('Count value of error pixels', 'i2', 1),
-            ('Count value of pixels outside scan area', 'i2', 1),
-            ('Slope for count-radiance conversion equation ', 'float64', 1),
-            ('Intercept for count-radiance conversion equation', 'float64', 1),
-            ('radiance to brightness temperature_c0', 'float64', 1),
-            ('radiance to brightness temperature_c1', 'float64', 1),
-            ('radiance to brightness temperature_c2', 'float64', 1),
-            ('brightness temperature to radiance_C0', 'float64', 1),
-            ('brightness temperature to radianceC1', 'float64', 1),
-            ('brightness temperature to radianceC2', 'float64', 1),
-            ('Speed of light', 'float64', 1),
-            ('Planck constant', 'float64', 1),
-            ('Boltzmann constant', 'float64', 1),
-            ('Spare5', 'S1', 40),
-            ('Block number6', 'i1', 1),
-            ('Block length6', 'i2', 1),
-            ('GSICS calibration coefficient_Intercept', 'float64', 1),
-            ('GSICS calibration coefficient_Slope', 'float64', 1),
-            ('GSICS calibration coefficient_Quadratic term', 'float64', 1),
-            ('Radiance bias for standard scene', 'float64', 1),
-            ('Uncertainty of radiance bias for standard scene', 'float64', 1),
-            ('Radiance for standard scene', 'float64', 1),
-            ('Start time of GSICS Correction validity period', 'float64', 1),
-            ('End time of GSICS Correction validity period', 'float64', 1),
-            ('Radiance validity range of GSICS calibration ' +
-             'coefficients_upper limit', 'float32', 1),
-            ('Radiance validity range of GSICS calibration ' +
-             'coefficients_lower limit', 'float32', 1),
-            ('File name of GSICS Correction', 'S1', 128),
-            ('Spare6', 'S1', 56),
-            ('Block number7', 'i1', 1),
-            ('Block length7', 'i2', 1),
-            ('Total number of segments', 'i1', 1),
-            ('Segment sequence number', 'i1', 1),
-            ('First line number of image segment', 'i2', 1),
-            ('Spare7', 'S1', 40),
-            ('Block number8', 'i1', 1),
-            ('Block length8', 'i2', 1),
-            ('Center column of rotation', 'float32', 1),
-            ('Center line of rotation', 'float32', 1),
-            ('Amount of rotational correction', 'float64', 1),
-            ('Number of correction information data for column ' +
-             'and line direction', 'i2', 1),
-            ('Line number after rotation', 'i2', 1),
-            ('Shift amount for column direction', 'float32', 1),
-            ('Shift amount for line direction8', 'float32', 1),
-            ('Spare8', 'S1', 50),
-            ('Block number9', 'i1', 1),
-            ('Block length9', 'i2', 1),
-            ('Number of observation times9', 'i2', 1),
-            ('Line number9', 'i2', 1),
-            ('Observation time9', 'float64', 1),
-            ('Spare9', 'S1', 70),
-            ('Block number10', 'i1', 1),
-            ('Block length10', 'i4', 1),
-            ('Number of error information data', 'i2', 1),
-            ('Line number10', 'i2', 1),
-            ('Number of error pixels per line10', 'i2', 1),
-            ('Spare10', 'S1', 36),
-            ('Block number11', 'i1', 1),
-            ('Block length11', 'i2', 1),
-            ('Spare11', 'S1', 256),
-            ('Count value of each pixel', 'i2', res)]
-
-    data = np.fromfile(inFile, dtype=formation)
-    return data
+    return HSDSegment(inFile, tmpDir=tmpDir, cache=cache)
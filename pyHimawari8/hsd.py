@@ -0,0 +1,745 @@
+import os
+import bz2
+import shutil
+import tempfile
+import datetime as dt
+import numpy as np
+
+# The header of Himawari Standard Data (HSD) consists of 11 blocks. Each block
+# starts with its block number (1 byte) and block length (2 bytes, 4 bytes for
+# block 10). Only the fixed part of each block is listed here, the repeated
+# records of block 8, 9 and 10 are parsed with the record dtypes below.
+# (see ../doc/HS_D_users_guide_en_v13.pdf)
+
+BLOCK1 = [
+    ('block_number', 'u1'),
+    ('block_length', 'u2'),
+    ('total_number_of_header_blocks', 'u2'),
+    ('byte_order', 'u1'),
+    ('satellite_name', 'S16'),
+    ('processing_center_name', 'S16'),
+    ('observation_area', 'S4'),
+    ('other_observation_information', 'S2'),
+    ('observation_timeline', 'u2'),
+    ('observation_start_time', 'f8'),
+    ('observation_end_time', 'f8'),
+    ('file_creation_time', 'f8'),
+    ('total_header_length', 'u4'),
+    ('total_data_length', 'u4'),
+    ('quality_flag1', 'u1'),
+    ('quality_flag2', 'u1'),
+    ('quality_flag3', 'u1'),
+    ('quality_flag4', 'u1'),
+    ('file_format_version', 'S32'),
+    ('file_name', 'S128'),
+    ('spare', 'S40')]
+
+BLOCK2 = [
+    ('block_number', 'u1'),
+    ('block_length', 'u2'),
+    ('number_of_bits_per_pixel', 'u2'),
+    ('number_of_columns', 'u2'),
+    ('number_of_lines', 'u2'),
+    ('compression_flag', 'u1'),
+    ('spare', 'S40')]
+
+BLOCK3 = [
+    ('block_number', 'u1'),
+    ('block_length', 'u2'),
+    ('sub_lon', 'f8'),
+    ('CFAC', 'u4'),
+    ('LFAC', 'u4'),
+    ('COFF', 'f4'),
+    ('LOFF', 'f4'),
+    ('distance_from_earth_center', 'f8'),
+    ('earth_equatorial_radius', 'f8'),
+    ('earth_polar_radius', 'f8'),
+    ('req2_rpol2_req2', 'f8'),
+    ('rpol2_req2', 'f8'),
+    ('req2_rpol2', 'f8'),
+    ('coeff_for_sd', 'f8'),
+    ('resampling_types', 'u2'),
+    ('resampling_size', 'u2'),
+    ('spare', 'S40')]
+
+BLOCK4 = [
+    ('block_number', 'u1'),
+    ('block_length', 'u2'),
+    ('navigation_information_time', 'f8'),
+    ('SSP_longitude', 'f8'),
+    ('SSP_latitude', 'f8'),
+    ('distance_from_earth_center_to_satellite', 'f8'),
+    ('nadir_longitude', 'f8'),
+    ('nadir_latitude', 'f8'),
+    ('sun_position', 'f8', (3,)),
+    ('moon_position', 'f8', (3,)),
+    ('spare', 'S40')]
+
+BLOCK5_COMMON = [
+    ('block_number', 'u1'),
+    ('block_length', 'u2'),
+    ('band_number', 'u2'),
+    ('central_wave_length', 'f8'),
+    ('valid_number_of_bits_per_pixel', 'u2'),
+    ('count_value_error_pixels', 'u2'),
+    ('count_value_outside_scan_pixels', 'u2'),
+    ('gain_count2rad_conversion', 'f8'),
+    ('offset_count2rad_conversion', 'f8')]
+
+# band 1-6
+BLOCK5_VIS = BLOCK5_COMMON + [
+    ('coeff_rad2albedo_conversion', 'f8'),
+    ('update_time', 'f8'),
+    ('cali_gain_count2rad_conversion', 'f8'),
+    ('cali_offset_count2rad_conversion', 'f8'),
+    ('spare', 'S80')]
+
+# band 7-16
+BLOCK5_IR = BLOCK5_COMMON + [
+    ('c0_rad2tb_conversion', 'f8'),
+    ('c1_rad2tb_conversion', 'f8'),
+    ('c2_rad2tb_conversion', 'f8'),
+    ('c0_tb2rad_conversion', 'f8'),
+    ('c1_tb2rad_conversion', 'f8'),
+    ('c2_tb2rad_conversion', 'f8'),
+    ('speed_of_light', 'f8'),
+    ('planck_constant', 'f8'),
+    ('boltzmann_constant', 'f8'),
+    ('spare', 'S40')]
+
+BLOCK6 = [
+    ('block_number', 'u1'),
+    ('block_length', 'u2'),
+    ('gsics_calibration_intercept', 'f8'),
+    ('gsics_calibration_slope', 'f8'),
+    ('gsics_calibration_coeff_quadratic_term', 'f8'),
+    ('gsics_std_scn_radiance_bias', 'f8'),
+    ('gsics_std_scn_radiance_bias_uncertainty', 'f8'),
+    ('gsics_std_scn_radiance', 'f8'),
+    ('gsics_correction_starttime', 'f8'),
+    ('gsics_correction_endtime', 'f8'),
+    ('gsics_radiance_validity_upper_lim', 'f4'),
+    ('gsics_radiance_validity_lower_lim', 'f4'),
+    ('gsics_filename', 'S128'),
+    ('spare', 'S56')]
+
+BLOCK7 = [
+    ('block_number', 'u1'),
+    ('block_length', 'u2'),
+    ('total_number_of_segments', 'u1'),
+    ('segment_sequence_number', 'u1'),
+    ('first_line_number_of_image_segment', 'u2'),
+    ('spare', 'S40')]
+
+BLOCK8 = [
+    ('block_number', 'u1'),
+    ('block_length', 'u2'),
+    ('center_column_of_rotation', 'f4'),
+    ('center_line_of_rotation', 'f4'),
+    ('amount_of_rotational_correction', 'f8'),
+    ('number_of_correction_info_data', 'u2')]
+
+BLOCK8_RECORD = [
+    ('line_number_after_rotation', 'u2'),
+    ('shift_amount_for_column_direction', 'f4'),
+    ('shift_amount_for_line_direction', 'f4')]
+
+BLOCK9 = [
+    ('block_number', 'u1'),
+    ('block_length', 'u2'),
+    ('number_of_observation_times', 'u2')]
+
+BLOCK9_RECORD = [
+    ('line_number', 'u2'),
+    ('observation_time', 'f8')]
+
+BLOCK10 = [
+    ('block_number', 'u1'),
+    ('block_length', 'u4'),
+    ('number_of_error_info_data', 'u2')]
+
+BLOCK10_RECORD = [
+    ('line_number', 'u2'),
+    ('number_of_error_pixels_per_line', 'u2')]
+
+BLOCK11 = [
+    ('block_number', 'u1'),
+    ('block_length', 'u2'),
+    ('spare', 'S256')]
+
+# (fixed part, repeated record, field holding the number of records)
+BLOCKS = {
+    1: (BLOCK1, None, None),
+    2: (BLOCK2, None, None),
+    3: (BLOCK3, None, None),
+    4: (BLOCK4, None, None),
+    6: (BLOCK6, None, None),
+    7: (BLOCK7, None, None),
+    8: (BLOCK8, BLOCK8_RECORD, 'number_of_correction_info_data'),
+    9: (BLOCK9, BLOCK9_RECORD, 'number_of_observation_times'),
+    10: (BLOCK10, BLOCK10_RECORD, 'number_of_error_info_data'),
+    11: (BLOCK11, None, None)}
+
+SPARE_LENGTH = {8: 40, 9: 40, 10: 40}
+
+# nominal navigation parameters for each spatial resolution. [km]
+# (CFAC/LFAC, COFF/LOFF, number of columns of the full disk)
+NOMINAL_GRID = {
+    0.5: (81865099, 11000.5, 22000),
+    1.0: (40932549, 5500.5, 11000),
+    2.0: (20466275, 2750.5, 5500)}
+
+# nominal geostationary navigation parameters of Himawari-8 [km]
+SUB_LON = 140.7
+SAT_DISTANCE = 42164.0   # from Earth's center to the satellite
+EARTH_EQUATORIAL_RADIUS = 6378.137
+EARTH_POLAR_RADIUS = 6356.7523
+
+CHUNKSIZE = 1024 * 1024   # bytes for streaming decompression
+MJD_EPOCH = dt.datetime(1858, 11, 17)
+
+
+def mjd2datetime(mjd):
+    """
+    convert modified julian date to datetime.
+
+    Parameters
+    ----------
+    mjd: float
+        modified julian date.
+    Returns
+    -------
+    datetime
+    """
+
+    return MJD_EPOCH + dt.timedelta(days=float(mjd))
+
+
+def lonlat2linecol(lon, lat, *, subLon=SUB_LON, resolution=1.0):
+    """
+    convert longitude/latitude to line/column number of the full disk.
+
+    Parameters
+    ----------
+    lon: array_like
+        longitude. [degree]
+    lat: array_like
+        latitude. [degree]
+    Keywords
+    --------
+    subLon: float
+        sub-satellite longitude (default: 140.7). [degree]
+    resolution: float
+        spatial resolution of the grid (default: 1.0). [km]
+        (0.5, 1.0 or 2.0)
+    Returns
+    -------
+    line: ndarray
+        line number (starts from 1 at north). NaN if invisible.
+    col: ndarray
+        column number (starts from 1 at west). NaN if invisible.
+    Examples
+    --------
+    >>> lonlat2linecol(140.7, 0)
+    (array(5500.5), array(5500.5))
+    References
+    ----------
+    1. ../doc/HS_D_users_guide_en_v13.pdf (Appendix 1)
+
+    History
+    -------
+    2026-10-18 First version.
+    """
+
+    CFAC, COFF, _ = NOMINAL_GRID[resolution]
+    lon = np.deg2rad(np.asarray(lon, dtype=np.float64))
+    lat = np.deg2rad(np.asarray(lat, dtype=np.float64))
+    ratio = (EARTH_POLAR_RADIUS / EARTH_EQUATORIAL_RADIUS) ** 2
+
+    latC = np.arctan(ratio * np.tan(lat))
+    rl = EARTH_POLAR_RADIUS / np.sqrt(1 - (1 - ratio) * np.cos(latC) ** 2)
+    r1 = SAT_DISTANCE - rl * np.cos(latC) * np.cos(lon - np.deg2rad(subLon))
+    r2 = -rl * np.cos(latC) * np.sin(lon - np.deg2rad(subLon))
+    r3 = rl * np.sin(latC)
+    rn = np.sqrt(r1 ** 2 + r2 ** 2 + r3 ** 2)
+
+    x = np.rad2deg(np.arctan(-r2 / r1))
+    y = np.rad2deg(np.arcsin(-r3 / rn))
+
+    col = COFF + x * CFAC / 2 ** 16
+    line = COFF + y * CFAC / 2 ** 16
+
+    # points on the far side of the Earth
+    isInvisible = SAT_DISTANCE * (SAT_DISTANCE - r1) < \
+        r2 ** 2 + r3 ** 2 / ratio
+    col = np.where(isInvisible, np.nan, col)
+    line = np.where(isInvisible, np.nan, line)
+
+    return line, col
+
+
+def roi_segments(latRange, lonRange, *, subLon=SUB_LON, nSegments=10,
+                 margin=10, nSamples=50):
+    """
+    full-disk segments covering the region of interest.
+
+    Parameters
+    ----------
+    latRange: list
+        latitude range. [degree]
+    lonRange: list
+        longitude range. [degree]
+    Keywords
+    --------
+    subLon: float
+        sub-satellite longitude (default: 140.7). [degree]
+    nSegments: int
+        total number of segments (default: 10).
+    margin: int
+        extra lines around the region (default: 10). [1 km line]
+    nSamples: int
+        number of sampling points along each side of the region
+        (default: 50).
+    Returns
+    -------
+    segments: list
+        segment sequence numbers (starts from 1). Empty if the region is
+        invisible.
+    Examples
+    --------
+    >>> roi_segments([15, 58], [70, 140])
+    [1, 2, 3, 4]
+
+    History
+    -------
+    2026-10-18 First version.
+    """
+
+    LON, LAT = np.meshgrid(
+        np.linspace(lonRange[0], lonRange[1], nSamples),
+        np.linspace(latRange[0], latRange[1], nSamples))
+    line, _ = lonlat2linecol(LON, LAT, subLon=subLon, resolution=1.0)
+    line = line[~np.isnan(line)]
+
+    if line.size == 0:
+        return []
+
+    nLines = NOMINAL_GRID[1.0][2]
+    linesPerSeg = nLines / nSegments
+    lineMin = max(np.min(line) - margin, 1)
+    lineMax = min(np.max(line) + margin, nLines)
+
+    return list(range(int((lineMin - 1) // linesPerSeg) + 1,
+                      int((lineMax - 1) // linesPerSeg) + 2))
+
+
+def _dtype(fields, endian):
+    """
+    create the dtype of the given fields with specified byte order.
+    """
+
+    return np.dtype(fields).newbyteorder(endian)
+
+
+def _record2dict(record):
+    """
+    convert numpy structured record to dict (spare fields are dropped).
+    """
+
+    res = {}
+    for name in record.dtype.names:
+        if name == 'spare':
+            continue
+        value = record[name]
+        if isinstance(value, bytes):
+            value = value.rstrip(b'\x00').decode('ascii', errors='ignore')
+        elif isinstance(value, np.ndarray):
+            value = value.copy()
+        else:
+            value = value.item()
+        res[name] = value
+
+    return res
+
+
+def _parse_block(number, raw, endian):
+    """
+    parse the raw bytes of a single header block.
+    """
+
+    if number == 5:
+        common = np.frombuffer(
+            raw, dtype=_dtype(BLOCK5_COMMON, endian), count=1)[0]
+        fields = BLOCK5_VIS if common['band_number'] < 7 else BLOCK5_IR
+        return _record2dict(
+            np.frombuffer(raw, dtype=_dtype(fields, endian), count=1)[0])
+
+    if number not in BLOCKS:
+        raise ValueError('Unknown header block: {0}'.format(number))
+
+    fixed, record, counter = BLOCKS[number]
+    fixedDtype = _dtype(fixed, endian)
+    block = _record2dict(np.frombuffer(raw, dtype=fixedDtype, count=1)[0])
+
+    if record is not None:
+        recDtype = _dtype(record, endian)
+        nRecords = block[counter]
+        # the declared block length is decisive, in case of broken counters
+        nRecords = min(
+            nRecords,
+            (len(raw) - fixedDtype.itemsize - SPARE_LENGTH[number]) //
+            recDtype.itemsize)
+        block['records'] = np.frombuffer(
+            raw, dtype=recDtype, count=max(nRecords, 0),
+            offset=fixedDtype.itemsize).copy()
+
+    return block
+
+
+def read_header(fd):
+    """
+    read the header blocks from a binary stream.
+
+    The stream is consumed block by block according to the declared block
+    lengths, and is left at the beginning of the pixel data.
+
+    Parameters
+    ----------
+    fd: file object
+        binary stream positioned at the start of the HSD file.
+    Returns
+    -------
+    header: dict
+        header blocks, with keys of 'block1' to 'block11'.
+    endian: str
+        byte order of the file. ('<' or '>')
+    """
+
+    # block number, block length, total number of header blocks, byte order
+    lead = fd.read(6)
+    if len(lead) < 6:
+        raise ValueError('Incomplete HSD header.')
+    endian = '>' if lead[5] == 1 else '<'
+    nBlocks = int(np.frombuffer(lead, dtype=endian + 'u2', count=1,
+                                offset=3)[0])
+    blockLen = int(np.frombuffer(lead, dtype=endian + 'u2', count=1,
+                                 offset=1)[0])
+    raw = lead + fd.read(blockLen - len(lead))
+
+    header = {}
+    header['block1'] = _parse_block(1, raw, endian)
+
+    for iBlock in range(1, nBlocks):
+        lead = fd.read(1)
+        if len(lead) < 1:
+            raise ValueError('Incomplete HSD header.')
+        number = lead[0]
+        lenType = endian + ('u4' if number == 10 else 'u2')
+        lenBytes = fd.read(np.dtype(lenType).itemsize)
+        blockLen = int(np.frombuffer(lenBytes, dtype=lenType)[0])
+        raw = lead + lenBytes + fd.read(blockLen - 1 - len(lenBytes))
+        if len(raw) < blockLen:
+            raise ValueError('Incomplete HSD header block {0}.'.format(number))
+
+        header['block{0}'.format(number)] = _parse_block(number, raw, endian)
+
+    return header, endian
+
+
+class HSDSegment(object):
+    """
+    Lazy reader for a single HSD segment file (`.DAT` or `.DAT.bz2`).
+
+    Only the header is read at construction. The pixel counts are exposed as
+    a read-only `np.memmap`, so slicing rows only touches the corresponding
+    pages. Compressed segments are decompressed by streaming into a temporary
+    file the first time the counts are accessed, unless a `SegmentCache` is
+    given, which resolves them to the cached decompressed segments.
+
+    Examples
+    --------
+    >>> with HSDSegment('HS_H08_20200219_0400_B01_FLDK_R10_S0110.DAT') as seg:
+    >>>     seg.header['block5']['band_number']
+    >>>     rows = seg.counts[100:200]
+    1
+
+    History
+    -------
+    2026-10-18 First version.
+    2026-10-18 Add `cache` keyword.
+    """
+
+    def __init__(self, file, *, tmpDir=None, cache=None):
+        if (cache is not None) and file.endswith('.bz2'):
+            file = cache.get(file)
+
+        self.file = file
+        self.tmpDir = tmpDir
+        self.compressed = file.endswith('.bz2')
+        self._counts = None
+        self._tmpFile = None
+
+        with self._open() as fd:
+            self.header, self.endian = read_header(fd)
+
+        self.offset = self.header['block1']['total_header_length']
+        self.shape = (self.header['block2']['number_of_lines'],
+                      self.header['block2']['number_of_columns'])
+
+    def _open(self):
+        if self.compressed:
+            return bz2.open(self.file, 'rb')
+        else:
+            return open(self.file, 'rb')
+
+    @property
+    def band(self):
+        return self.header['block5']['band_number']
+
+    @property
+    def segment(self):
+        return self.header['block7']['segment_sequence_number']
+
+    @property
+    def first_line(self):
+        return self.header['block7']['first_line_number_of_image_segment']
+
+    @property
+    def resolution(self):
+        """
+        spatial resolution. [km]
+        """
+
+        return round(NOMINAL_GRID[1.0][0] / self.header['block3']['CFAC'], 1)
+
+    @property
+    def start_time(self):
+        return mjd2datetime(self.header['block1']['observation_start_time'])
+
+    @property
+    def end_time(self):
+        return mjd2datetime(self.header['block1']['observation_end_time'])
+
+    @property
+    def counts(self):
+        """
+        pixel counts with shape of (lines, columns).
+        """
+
+        if self._counts is None:
+            if self.compressed:
+                # decompressed already by `read_lines`
+                if self._tmpFile is None:
+                    self._decompress()
+                dataFile = self._tmpFile
+                offset = 0
+            else:
+                dataFile = self.file
+                offset = self.offset
+
+            self._counts = np.memmap(dataFile, dtype=self.endian + 'u2',
+                                     mode='r', offset=offset,
+                                     shape=self.shape)
+
+        return self._counts
+
+    def read_lines(self, start, stop):
+        """
+        read the pixel counts of the lines [start, stop) into memory.
+
+        Unlike slicing `counts`, the lines are read without the memory map,
+        so the pages of the file aren't kept in the resident memory of the
+        process, e.g., for streaming the full disk chunk by chunk.
+
+        History
+        -------
+        2026-10-18 First version.
+        """
+
+        start, stop, _ = slice(start, stop).indices(self.shape[0])
+        stop = max(start, stop)
+        if self.compressed:
+            if self._tmpFile is None:
+                self._decompress()
+            dataFile, offset = self._tmpFile, 0
+        else:
+            dataFile, offset = self.file, self.offset
+
+        nColumns = self.shape[1]
+        with open(dataFile, 'rb') as fh:
+            fh.seek(offset + start * nColumns * 2)
+            counts = np.fromfile(fh, dtype=self.endian + 'u2',
+                                 count=(stop - start) * nColumns)
+
+        return counts.reshape(stop - start, nColumns)
+
+    def _decompress(self):
+        """
+        stream the pixel data of the compressed segment to a temporary file.
+        """
+
+        fh = tempfile.NamedTemporaryFile(
+            dir=self.tmpDir, suffix='.DAT', delete=False)
+        try:
+            with self._open() as fd:
+                read_header(fd)   # skip the header blocks
+                skipped = self.offset - sum(
+                    block['block_length'] for block in self.header.values())
+                if skipped > 0:
+                    fd.read(skipped)
+                shutil.copyfileobj(fd, fh, CHUNKSIZE)
+        except Exception as e:
+            fh.close()
+            os.remove(fh.name)
+            raise e
+
+        fh.close()
+        self._tmpFile = fh.name
+
+    def close(self):
+        """
+        release the memory map and remove the decompressed temporary file.
+        """
+
+        # the mapping itself is released once all the views are gone
+        self._counts = None
+
+        if self._tmpFile is not None:
+            if os.path.exists(self._tmpFile):
+                os.remove(self._tmpFile)
+            self._tmpFile = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+def write_segment(file, counts, *, band=1, segment=1, nSegments=10,
+                  obsTime=dt.datetime(2020, 2, 19, 4, 0), calibration=None):
+    """
+    write a HSD segment with valid header blocks.
+
+    It's mainly used to create synthetic segments for testing and
+    benchmarking.
+
+    Parameters
+    ----------
+    file: str
+        output filename. It will be compressed with bzip2 if it ends with
+        '.bz2'.
+    counts: ndarray
+        pixel counts of the segment (lines, columns).
+    Keywords
+    --------
+    band: int
+        band number [1-16] (default: 1).
+    segment: int
+        segment sequence number (default: 1).
+    nSegments: int
+        total number of segments (default: 10).
+    obsTime: datetime
+        observation start time.
+    calibration: dict
+        values to override the default fields of block 5.
+
+    History
+    -------
+    2026-10-18 First version.
+    """
+
+    counts = np.ascontiguousarray(counts, dtype='<u2')
+    nLines, nCols = counts.shape
+    resolution = 11000 / nCols
+    CFAC, COFF, _ = NOMINAL_GRID.get(
+        resolution, (int(NOMINAL_GRID[1.0][0] / resolution),
+                     nCols / 2 + 0.5, nCols))
+    startMJD = (obsTime - MJD_EPOCH) / dt.timedelta(days=1)
+
+    def block(fields, **values):
+        rec = np.zeros(1, dtype=_dtype(fields, '<'))
+        rec['block_length'] = rec.dtype.itemsize
+        for key, value in values.items():
+            rec[key] = value
+        return rec
+
+    blk5 = BLOCK5_VIS if band < 7 else BLOCK5_IR
+    calib = {'band_number': band,
+             'central_wave_length': 0.47 if band < 7 else 10.4,
+             'valid_number_of_bits_per_pixel': 11 if band < 7 else 12,
+             'count_value_error_pixels': 65535,
+             'count_value_outside_scan_pixels': 65534,
+             'gain_count2rad_conversion': 0.38 if band < 7 else -0.0057,
+             'offset_count2rad_conversion': -7.6 if band < 7 else 23.3}
+    if band < 7:
+        calib.update({'coeff_rad2albedo_conversion': 0.0015,
+                      'cali_gain_count2rad_conversion': 0.38,
+                      'cali_offset_count2rad_conversion': -7.6})
+    else:
+        calib.update({'c0_rad2tb_conversion': -0.1,
+                      'c1_rad2tb_conversion': 1.0,
+                      'c2_rad2tb_conversion': -1.5e-6,
+                      'c0_tb2rad_conversion': 0.1,
+                      'c1_tb2rad_conversion': 1.0,
+                      'c2_tb2rad_conversion': 1.5e-6,
+                      'speed_of_light': 2.99792458e8,
+                      'planck_constant': 6.62606957e-34,
+                      'boltzmann_constant': 1.3806488e-23})
+    calib.update(calibration or {})
+
+    blocks = [
+        None,   # block 1 is created after the others
+        block(BLOCK2, block_number=2, number_of_bits_per_pixel=16,
+              number_of_columns=nCols, number_of_lines=nLines),
+        block(BLOCK3, block_number=3, sub_lon=140.7, CFAC=CFAC, LFAC=CFAC,
+              COFF=COFF, LOFF=COFF, distance_from_earth_center=42164.0,
+              earth_equatorial_radius=6378.137,
+              earth_polar_radius=6356.7523,
+              req2_rpol2_req2=0.00669438444, rpol2_req2=0.993305616,
+              req2_rpol2=1.006739501, coeff_for_sd=1737122264.0),
+        block(BLOCK4, block_number=4, navigation_information_time=startMJD,
+              SSP_longitude=140.7, SSP_latitude=0.0,
+              distance_from_earth_center_to_satellite=42164.0,
+              nadir_longitude=140.7, nadir_latitude=0.0),
+        block(blk5, block_number=5, **calib),
+        block(BLOCK6, block_number=6),
+        block(BLOCK7, block_number=7, total_number_of_segments=nSegments,
+              segment_sequence_number=segment,
+              first_line_number_of_image_segment=(segment - 1) * nLines + 1),
+        block(BLOCK8 + [('spare', 'S40')], block_number=8),
+        block(BLOCK9 + [('record', BLOCK9_RECORD), ('spare', 'S40')],
+              block_number=9, number_of_observation_times=1),
+        block(BLOCK10 + [('spare', 'S40')], block_number=10),
+        block(BLOCK11, block_number=11)]
+    blocks[8]['record'] = ((segment - 1) * nLines + 1, startMJD)
+
+    headerLength = np.dtype(BLOCK1).itemsize + sum(
+        blk.dtype.itemsize for blk in blocks[1:])
+    blocks[0] = block(BLOCK1, block_number=1,
+                      total_number_of_header_blocks=11, byte_order=0,
+                      satellite_name=b'Himawari-8',
+                      processing_center_name=b'MSC',
+                      observation_area=b'FLDK',
+                      observation_timeline=int(obsTime.strftime('%H%M')),
+                      observation_start_time=startMJD,
+                      observation_end_time=startMJD + 600 / 86400,
+                      file_creation_time=startMJD,
+                      total_header_length=headerLength,
+                      total_data_length=counts.nbytes,
+                      file_format_version=b'1.3',
+                      file_name=os.path.basename(file).encode('ascii'))
+
+    content = b''.join(blk.tobytes() for blk in blocks) + counts.tobytes()
+    if file.endswith('.bz2'):
+        with bz2.open(file, 'wb') as fd:
+            fd.write(content)
+    else:
+        with open(file, 'wb') as fd:
+            fd.write(content)
@@ -0,0 +1,395 @@
+import os
+import json
+import time
+import resource
+import threading
+from contextlib import contextmanager
+from logger import logger
+
+_SPANS = []   # finished spans of this process
+_LOCAL = threading.local()   # names of the running spans of each thread
+_RUNNING = []   # records of the running spans of this process
+_RUNNING_LOCK = threading.Lock()
+
+
+def _bytes_read():
+    """
+    bytes read by the current process, including the reads from FUSE and
+    page cache (`rchar` in /proc/self/io). None if it's not available.
+    """
+
+    try:
+        with open('/proc/self/io', 'r') as fh:
+            for line in fh:
+                if line.startswith('rchar:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+
+    return None
+
+
+def _rss():
+    """
+    current resident set size of the current process (`resident` in
+    /proc/self/statm). [bytes] None if it's not available.
+    """
+
+    try:
+        with open('/proc/self/statm', 'r') as fh:
+            return int(fh.read().split()[1]) * resource.getpagesize()
+    except (OSError, IndexError, ValueError):
+        pass
+
+    return None
+
+
+def _hwm():
+    """
+    peak resident set size of the current process since its last reset
+    (`VmHWM` in /proc/self/status). [bytes] None if it's not available.
+    """
+
+    try:
+        with open('/proc/self/status', 'r') as fh:
+            for line in fh:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except (OSError, IndexError, ValueError):
+        pass
+
+    return None
+
+
+def _reset_hwm():
+    """
+    reset the peak resident set size of the current process to its current
+    RSS. False if it's not supported.
+    """
+
+    try:
+        with open('/proc/self/clear_refs', 'w') as fh:
+            fh.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def _lifetime_peak_rss():
+    """
+    peak resident set size over the lifetime of the current process. [bytes]
+    """
+
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _start_peak(record):
+    """
+    start measuring the peak RSS of the span.
+
+    The peak of the process is reset at the start of each span, so the peak
+    reached so far is first kept by the running spans, including those of
+    the other threads.
+    """
+
+    with _RUNNING_LOCK:
+        peak = _hwm()
+        if (peak is not None) and _reset_hwm():
+            for other in _RUNNING:
+                other['peak_rss'] = max(other['peak_rss'], peak)
+            record['peak_rss_scope'] = 'stage'
+        else:
+            record['peak_rss_scope'] = 'process'
+        record['peak_rss'] = 0
+        _RUNNING.append(record)
+
+
+def _stop_peak(record):
+    """
+    finish the peak RSS of the span.
+    """
+
+    with _RUNNING_LOCK:
+        _RUNNING[:] = [other for other in _RUNNING if other is not record]
+        peak = _hwm() if record['peak_rss_scope'] == 'stage' else None
+        if peak is None:
+            record['peak_rss_scope'] = 'process'
+            record['peak_rss'] = _lifetime_peak_rss()
+        else:
+            record['peak_rss'] = max(record['peak_rss'], peak)
+
+
+@contextmanager
+def span(name, **attrs):
+    """
+    measure a stage of the run.
+
+    The span records the wall time, CPU time, bytes read, the peak RSS of
+    the process during the stage ('peak_rss') and the RSS at the end of the
+    stage ('rss'). The peak is measured by resetting the high-water mark of
+    the process at the start of the stage ('peak_rss_scope' is 'stage'). If
+    that isn't supported, it's the peak over the lifetime of the process
+    ('peak_rss_scope' is 'process'). Spans can be nested, and a failed stage
+    is recorded with status 'error'.
+
+    Parameters
+    ----------
+    name: str
+        stage name, e.g., 'open', 'subset', 'scene_load', 'resample', 'draw',
+        'encode' or 'upload'.
+    Keywords
+    --------
+    attrs: dict
+        additional attributes of the span, e.g., file=...
+    Examples
+    --------
+    >>> with span('subset', file=file):
+    ...     data = var[latSlice, lonSlice]
+
+    History
+    -------
+    2026-10-18 First version.
+    2026-10-18 Record the peak RSS of the stage.
+    """
+
+    stack = getattr(_LOCAL, 'stack', None)
+    if stack is None:
+        stack = _LOCAL.stack = []
+
+    record = {'name': name,
+              'parent': stack[-1] if stack else None,
+              'pid': os.getpid(),
+              'start': time.time()}
+    record.update(attrs)
+
+    rchar = _bytes_read()
+    _start_peak(record)
+    t0 = time.perf_counter()
+    c0 = time.process_time()
+    stack.append(name)
+
+    record['status'] = 'ok'
+    try:
+        yield record
+    except BaseException:
+        record['status'] = 'error'
+        raise
+    finally:
+        stack.pop()
+        record['wall'] = time.perf_counter() - t0
+        record['cpu'] = time.process_time() - c0
+        if rchar is not None:
+            record['bytes_read'] = _bytes_read() - rchar
+        else:
+            record['bytes_read'] = None
+        _stop_peak(record)
+        record['rss'] = _rss()
+        _SPANS.append(record)
+
+
+def collect_spans(*, clear=True):
+    """
+    spans recorded in the current process.
+
+    Worker processes return them to the parent process, which merges them with
+    `add_spans`. Spans inherited from the parent by a forked worker are
+    skipped.
+
+    Keywords
+    --------
+    clear: bool
+        remove the returned spans from the process (default: True).
+    Returns
+    -------
+    spans: list
+
+    History
+    -------
+    2026-10-18 First version.
+    """
+
+    pid = os.getpid()
+    spans = [record for record in _SPANS if record['pid'] == pid]
+
+    if clear:
+        del _SPANS[:]
+
+    return spans
+
+
+def add_spans(spans):
+    """
+    merge the spans returned by the worker processes.
+    """
+
+    _SPANS.extend(spans)
+
+
+def write_jsonl(file, spans):
+    """
+    append the spans to the file as JSON lines.
+    """
+
+    with open(file, 'a', encoding='utf-8') as fh:
+        for record in spans:
+            fh.write(json.dumps(record, default=str) + '\n')
+
+
+def summarize(spans):
+    """
+    aggregate the spans by stage name.
+
+    Returns
+    -------
+    stats: dict
+        'count', 'errors', 'wall', 'cpu', 'bytes_read' (totals),
+        'peak_rss' (maximum) and 'peak_rss_scope' ('process' if any of the
+        peaks is over the process lifetime) of each stage, in the order of
+        first appearance.
+
+    History
+    -------
+    2026-10-18 First version.
+    2026-10-18 Add the scope of the peak RSS.
+    """
+
+    stats = {}
+    for record in spans:
+        stat = stats.setdefault(record['name'], {
+            'count': 0, 'errors': 0, 'wall': 0.0, 'cpu': 0.0,
+            'bytes_read': 0, 'peak_rss': 0, 'peak_rss_scope': 'stage'})
+        stat['count'] += 1
+        stat['errors'] += int(record['status'] != 'ok')
+        stat['wall'] += record['wall']
+        stat['cpu'] += record['cpu']
+        stat['bytes_read'] += record['bytes_read'] or 0
+        stat['peak_rss'] = max(stat['peak_rss'], record['peak_rss'])
+        if record.get('peak_rss_scope') == 'process':
+            stat['peak_rss_scope'] = 'process'
+
+    return stats
+
+
+def summary_table(spans):
+    """
+    summary table of the spans by stage name.
+
+    Returns
+    -------
+    table: str
+
+    History
+    -------
+    2026-10-18 First version.
+    2026-10-18 Mark the peak RSS over the process lifetime.
+    """
+
+    header = '{0:15s} {1:>6s} {2:>6s} {3:>10s} {4:>10s} {5:>10s} {6:>10s}'
+    row = '{0:15s} {1:6d} {2:6d} {3:10.2f} {4:10.2f} {5:10.1f} {6:10.1f}{7}'
+
+    lines = [header.format('stage', 'count', 'errors', 'wall[s]', 'cpu[s]',
+                           'read[MB]', 'peak[MB]')]
+    lifetime = False
+    for name, stat in summarize(spans).items():
+        mark = ''
+        if stat['peak_rss_scope'] == 'process':
+            mark, lifetime = ' *', True
+        lines.append(row.format(
+            name, stat['count'], stat['errors'], stat['wall'], stat['cpu'],
+            stat['bytes_read'] / 2 ** 20, stat['peak_rss'] / 2 ** 20, mark))
+    if lifetime:
+        lines.append('* peak RSS over the process lifetime')
+
+    return '\n'.join(lines)
+
+
+def write_prometheus(file, spans, *, prefix='himawari8'):
+    """
+    write the stage metrics for the Prometheus node exporter textfile
+    collector.
+
+    The file is replaced atomically, so that the collector never reads a
+    partial file.
+
+    Parameters
+    ----------
+    file: str
+        output file with '.prom' suffix.
+    spans: list
+        spans of the run.
+    Keywords
+    --------
+    prefix: str
+        prefix of the metric names (default: 'himawari8').
+
+    History
+    -------
+    2026-10-18 First version.
+    2026-10-18 Add the scope label of the peak RSS.
+    """
+
+    stats = summarize(spans)
+    metrics = [
+        ('stage_count', 'count', 'gauge', 'Number of runs of the stage.'),
+        ('stage_errors', 'errors', 'gauge', 'Number of failed runs.'),
+        ('stage_wall_seconds', 'wall', 'gauge', 'Total wall time.'),
+        ('stage_cpu_seconds', 'cpu', 'gauge', 'Total CPU time.'),
+        ('stage_read_bytes', 'bytes_read', 'gauge', 'Total bytes read.'),
+        ('stage_peak_rss_bytes', 'peak_rss', 'gauge',
+         'Maximum peak RSS of the stage, over the process lifetime if '
+         'scope="process".')]
+
+    lines = []
+    for metric, key, kind, helpStr in metrics:
+        lines.append('# HELP {0}_{1} {2}'.format(prefix, metric, helpStr))
+        lines.append('# TYPE {0}_{1} {2}'.format(prefix, metric, kind))
+        for name, stat in stats.items():
+            labels = 'stage="{0}"'.format(name)
+            if key == 'peak_rss':
+                labels += ',scope="{0}"'.format(stat['peak_rss_scope'])
+            lines.append('{0}_{1}{{{2}}} {3}'.format(
+                prefix, metric, labels, stat[key]))
+
+    lines.append('# HELP {0}_last_run_timestamp_seconds '
+                 'End time of the last run.'.format(prefix))
+    lines.append('# TYPE {0}_last_run_timestamp_seconds gauge'.format(prefix))
+    lines.append('{0}_last_run_timestamp_seconds {1:.0f}'.format(
+        prefix, time.time()))
+
+    tmpFile = '{0}.{1}.tmp'.format(file, os.getpid())
+    with open(tmpFile, 'w', encoding='utf-8') as fh:
+        fh.write('\n'.join(lines) + '\n')
+    os.replace(tmpFile, file)
+
+
+def report(*, jsonlFile=None, promFile=None, clear=True):
+    """
+    report the spans of the run: log the summary table and write the JSON
+    lines and Prometheus files if given.
+
+    History
+    -------
+    2026-10-18 First version.
+    """
+
+    spans = list(_SPANS)
+
+    logger.info('Stage summary:\n{0}'.format(summary_table(spans)))
+
+    for file, writer in [(jsonlFile, write_jsonl),
+                         (promFile, write_prometheus)]:
+        if not file:
+            continue
+        try:
+            fileDir = os.path.dirname(file)
+            if fileDir and not os.path.exists(fileDir):
+                os.makedirs(fileDir, exist_ok=True)
+            writer(file, spans)
+        except OSError as e:
+            logger.warn('Failed in writing metrics to {0}: {1}'.format(
+                file, e))
+
+    if clear:
+        del _SPANS[:]
+
+    return spans
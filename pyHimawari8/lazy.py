@@ -0,0 +1,314 @@
+import os
+import numpy as np
+import dask
+import dask.array as da
+from logger import logger
+from hsd import HSDSegment
+from calibration import calibration_lut
+from helper import getROISlice
+
+MEMORY_LIMIT = 2 * 2 ** 30   # default memory ceiling of the lazy arrays
+COPIES = 4   # arrays of a chunk alive in a task (input, output, temporaries)
+
+
+def _nWorkers(nWorkers):
+    return max(1, nWorkers or os.cpu_count() or 1)
+
+
+def chunk_lines(nColumns, *, itemsize=4, factor=1, memoryLimit=MEMORY_LIMIT,
+                nWorkers=None):
+    """
+    lines of each chunk, so that the chunks in flight fit in the memory.
+
+    Each worker thread holds about `COPIES` arrays of its chunk, and the
+    lines are a multiple of the downsampling factor, so that each chunk is
+    downsampled on its own.
+
+    Parameters
+    ----------
+    nColumns: int
+        columns of the array.
+    Keywords
+    --------
+    itemsize: int
+        bytes of each element of the computation (default: 4, float32).
+    factor: int
+        downsampling factor (default: 1).
+    memoryLimit: int
+        memory ceiling (default: 2 GB). [bytes]
+    nWorkers: int
+        number of worker threads (default: number of CPUs).
+    Returns
+    -------
+    lines: int
+
+    History
+    -------
+    2026-10-18 First version.
+    """
+
+    chunkBytes = memoryLimit / (_nWorkers(nWorkers) * COPIES)
+    lines = int(chunkBytes // (nColumns * itemsize))
+    lines = max(factor, lines // factor * factor)
+
+    return lines
+
+
+def _filled(block):
+    """
+    masked block to float32 with NaN.
+    """
+
+    return np.ma.filled(np.ma.asarray(block, dtype=np.float32), np.nan)
+
+
+def open_l2(fd, variables, *, latRange=None, lonRange=None,
+            memoryLimit=MEMORY_LIMIT, nWorkers=None):
+    """
+    lazy arrays of the L2 variables in the region of interest.
+
+    The region is read chunk by chunk as hyperslabs, the masked values are
+    NaN. The reads share a lock, as netCDF4 isn't thread-safe.
+
+    Parameters
+    ----------
+    fd: netCDF4.Dataset
+        L2 dataset.
+    variables: list
+        variable names.
+    Keywords
+    --------
+    latRange: list
+        latitude range (default: all). [degree]
+    lonRange: list
+        longitude range (default: all). [degree]
+    memoryLimit: int
+        memory ceiling (default: 2 GB). [bytes]
+    nWorkers: int
+        number of worker threads (default: number of CPUs).
+    Returns
+    -------
+    arrays: dict
+        float32 dask array of each variable. (lat, lon)
+    lat: ndarray
+    lon: ndarray
+
+    History
+    -------
+    2026-10-18 First version.
+    """
+
+    latRange = [-90, 90] if latRange is None else latRange
+    lonRange = [-180, 360] if lonRange is None else lonRange
+    latSlice, lonSlice, lat, lon = getROISlice(fd, latRange, lonRange)
+    lock = dask.utils.SerializableLock()
+
+    arrays = {}
+    for variable in variables:
+        var = fd.variables[variable]
+        nLines = chunk_lines(var.shape[1], memoryLimit=memoryLimit,
+                             nWorkers=nWorkers)
+        array = da.from_array(var, chunks=(nLines, -1), lock=lock,
+                              asarray=False, fancy=False)
+        array = array[latSlice, lonSlice]
+        arrays[variable] = array.map_blocks(_filled, dtype=np.float32)
+
+    return arrays, lat, lon
+
+
+def _calibrated_lines(segment, start, stop, lut):
+    return lut.take(segment.read_lines(start, stop))
+
+
+def open_hsd(files, *, calibration=None, nSegments=10, mode='update',
+             factor=1, memoryLimit=MEMORY_LIMIT, nWorkers=None):
+    """
+    lazy calibrated full disk of the band from its HSD segments.
+
+    The counts are read and calibrated chunk by chunk through the
+    calibration lookup table, without memory-mapping the segments, so only
+    the chunks in flight are resident. Missing segments are NaN.
+
+    Parameters
+    ----------
+    files: list
+        segment files of the band. Compressed segments are decompressed
+        to temporary files, unless resolved by `SegmentCache` beforehand.
+    Keywords
+    --------
+    calibration: str
+        'counts', 'radiance', 'reflectance' or 'brightness_temperature'
+        (default: reflectance for band 1-6, brightness temperature for band
+        7-16).
+    nSegments: int
+        total number of segments (default: 10).
+    mode: str
+        calibration mode (default: 'update').
+    factor: int
+        planned downsampling factor, to align the chunks (default: 1).
+    memoryLimit: int
+        memory ceiling (default: 2 GB). [bytes]
+    nWorkers: int
+        number of worker threads (default: number of CPUs).
+    Returns
+    -------
+    array: dask.array
+        float32 full disk, from north to south and west to east.
+        (lines, columns)
+    segments: list
+        opened segments, to be closed after the computation.
+    Examples
+    --------
+    >>> array, segments = open_hsd(files, factor=8, memoryLimit=2 ** 30)
+    >>> image = compute(downsample(array, 8), memoryLimit=2 ** 30)
+
+    History
+    -------
+    2026-10-18 First version.
+    """
+
+    segments = {}
+    for file in files:
+        seg = HSDSegment(file)
+        if seg.compressed:
+            seg.read_lines(0, 0)   # decompress once, before the threads
+        segments[seg.segment] = seg
+    if not segments:
+        raise ValueError('No HSD segments.')
+
+    shape = next(iter(segments.values())).shape
+    if calibration is None:
+        band = next(iter(segments.values())).band
+        calibration = 'reflectance' if band < 7 \
+            else 'brightness_temperature'
+
+    nLines = min(chunk_lines(shape[1], factor=factor,
+                             memoryLimit=memoryLimit, nWorkers=nWorkers),
+                 shape[0])
+
+    blocks = []
+    for iSegment in range(1, nSegments + 1):
+        if iSegment in segments:
+            seg = segments[iSegment]
+            lut = calibration_lut(seg.header, calibration, mode=mode)
+            chunks = []
+            for iStart in range(0, shape[0], nLines):
+                iStop = min(iStart + nLines, shape[0])
+                chunk = dask.delayed(_calibrated_lines)(seg, iStart, iStop,
+                                                        lut)
+                chunks.append(da.from_delayed(
+                    chunk, (iStop - iStart, shape[1]), dtype=np.float32))
+            blocks.append(da.concatenate(chunks, axis=0))
+        else:
+            blocks.append(da.full(shape, np.nan, dtype=np.float32,
+                                  chunks=(nLines, -1)))
+
+    logger.debug('Open {0} HSD segments, {1} lines per chunk.'.format(
+        len(segments), nLines))
+
+    return da.concatenate(blocks, axis=0), list(segments.values())
+
+
+def _nanmean(x, axis=None):
+    """
+    mean ignoring NaN, with fewer temporaries than `np.nanmean`.
+    """
+
+    valid = np.isfinite(x)
+    total = np.where(valid, x, 0).sum(axis=axis, dtype=np.float32)
+    count = valid.sum(axis=axis, dtype=np.float32)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        # NaN for all-NaN blocks
+        return total / count
+
+
+def downsample(array, factor, *, method='mean'):
+    """
+    downsample the lazy array by an integer factor, chunk by chunk.
+
+    Parameters
+    ----------
+    array: dask.array
+        2-D array.
+    factor: int
+        downsampling factor.
+    Keywords
+    --------
+    method: str
+        'mean' (block average ignoring NaN) or 'nearest' (the pixel at the
+        block center, e.g., for the classification) (default: 'mean').
+    Returns
+    -------
+    array: dask.array
+
+    History
+    -------
+    2026-10-18 First version.
+    """
+
+    if factor <= 1:
+        return array
+    if method not in ('mean', 'nearest'):
+        raise ValueError('Unknown method {0}'.format(method))
+
+    # incomplete blocks at the end are dropped
+    lines = array.shape[0] // factor * factor
+    columns = array.shape[1] // factor * factor
+    array = array[:lines, :columns]
+
+    if method == 'nearest':
+        return array[factor // 2::factor, factor // 2::factor]
+
+    # chunks must be multiples of the factor
+    if any(chunk % factor for dimChunks in array.chunks
+           for chunk in dimChunks):
+        array = array.rechunk(tuple(
+            max(factor, dimChunks[0] // factor * factor)
+            for dimChunks in array.chunks))
+
+    return da.coarsen(_nanmean, array, {0: factor, 1: factor})
+
+
+def downsample_coords(coord, factor):
+    """
+    coordinates of the block centers of the downsampled array.
+    """
+
+    coord = np.asarray(coord)
+    if factor <= 1:
+        return coord
+
+    n = len(coord) // factor * factor
+    return coord[:n].reshape(-1, factor).mean(axis=1)
+
+
+def compute(array, *, memoryLimit=MEMORY_LIMIT, nWorkers=None):
+    """
+    compute the lazy array with the threaded scheduler.
+
+    The number of threads is the one the chunks were sized for, so the
+    memory stays under the ceiling.
+
+    Parameters
+    ----------
+    array: dask.array
+    Keywords
+    --------
+    memoryLimit: int
+        memory ceiling, for the log (default: 2 GB). [bytes]
+    nWorkers: int
+        number of worker threads (default: number of CPUs).
+    Returns
+    -------
+    data: ndarray
+
+    History
+    -------
+    2026-10-18 First version.
+    """
+
+    logger.debug('Compute {0} under {1:.0f} MB with {2} threads.'.format(
+        array.shape, memoryLimit / 2 ** 20, _nWorkers(nWorkers)))
+
+    return array.compute(scheduler='threads',
+                         num_workers=_nWorkers(nWorkers))
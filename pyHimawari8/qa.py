@@ -0,0 +1,215 @@
+import re
+import operator
+from collections import OrderedDict
+import numpy as np
+from logger import logger
+
+# bit fields of the QA variables, (first bit, bits, values), see
+# doc/data_description.md
+YES_NO = {'yes': 0, 'no': 1}   # CLP flags, 0 for yes
+NO_YES = {'no': 0, 'yes': 1}   # ARP flags, 1 for yes
+CONFIDENCE = {'very_good': 0, 'good': 1, 'marginal': 2, 'no_confidence': 3}
+FIELDS = {
+    'QA': {
+        'retrieval': (0, 3, {'outside_scan': 0, 'no_cloud_mask': 1,
+                             'clear': 2, 'failed': 3, 'low_confidence': 4,
+                             'high_confidence': 5}),
+        'cloud_mask': (3, 2, {'clear': 0, 'probably_clear': 1,
+                              'probably_cloudy': 2, 'cloudy': 3}),
+        'phase': (5, 2, {'clear': 0, 'liquid': 1, 'mixed': 2, 'ice': 3}),
+        'sunglint': (8, 1, YES_NO),
+        'snow_ice': (9, 1, YES_NO),
+        'land_water': (10, 2, {'water': 0, 'coastal': 1, 'land': 3}),
+        'high_angle': (12, 1, YES_NO),
+        'inhomogeneous': (13, 1, YES_NO),
+        'multilayer': (14, 1, YES_NO),
+        'inversion': (15, 1, YES_NO)},
+    'QA_flag': {
+        'no_data': (0, 1, NO_YES),
+        'water': (1, 1, dict(NO_YES, land=0, water=1)),
+        'cloud': (2, 1, dict(NO_YES, clear=0, cloud=1)),
+        'failed': (3, 1, dict(NO_YES, successful=0, failed=1)),
+        'aot_confidence': (4, 2, CONFIDENCE),
+        'ae_confidence': (6, 2, CONFIDENCE),
+        'near_cloud': (8, 1, dict(NO_YES, clear=0, cloud=1)),
+        'sunglint': (9, 1, NO_YES),
+        'high_angle': (10, 1, NO_YES),
+        'surface_no_confidence': (11, 1, dict(NO_YES, good=0,
+                                              no_confidence=1)),
+        'snow_ice': (12, 1, NO_YES),
+        'turbid_water': (13, 1, NO_YES)}}
+OPERATORS = {'==': operator.eq, '=': operator.eq, '!=': operator.ne,
+             '<=': operator.le, '<': operator.lt, '>=': operator.ge,
+             '>': operator.gt}
+MASK_CACHE = 8   # masks kept in memory
+
+_MASKS = OrderedDict()   # masks of the recent files
+
+
+class QAFilter(object):
+    """
+    Declarative filter of the L2 QA flags.
+
+    The expression is conditions on the QA bit fields joined by 'and'. A
+    condition compares a field with a value name or an integer, e.g.,
+    'aot_confidence <= good', or is a yes/no field alone, e.g., 'not cloud'.
+    The fields are those of `FIELDS` of the CLP 'QA' or the ARP 'QA_flag'
+    variable, and the filter is resolved against the QA variable of the
+    file.
+
+    Parameters
+    ----------
+    expression: str
+        conditions that the kept pixels meet.
+    Examples
+    --------
+    >>> qa = QAFilter('aot_confidence <= good and not cloud')
+    >>> qa.mask(fd.variables['QA_flag'][:], 'QA_flag')
+    >>> vis.load_data('AOT', mTime,
+    ...               qa='aot_confidence <= good and not cloud')
+
+    History
+    -------
+    2026-10-18 First version.
+    """
+
+    _TERM = re.compile(r'^(?:(?P<not>not)\s+(?P<flag>\w+)|(?P<field>\w+)\s*'
+                       r'(?P<op>==|!=|<=|>=|<|>|=)\s*(?P<value>\w+)|'
+                       r'(?P<yes>\w+))$')
+
+    def __init__(self, expression):
+        self.expression = ' '.join(expression.lower().split())
+        self.terms = []   # (field, operator, value)
+
+        for term in re.split(r'\s+and\s+', self.expression):
+            match = self._TERM.match(term.strip())
+            if match is None:
+                raise ValueError('Invalid QA condition: {0}'.format(term))
+            if match.group('flag'):
+                self.terms.append((match.group('flag'), '!=', 'yes'))
+            elif match.group('yes'):
+                self.terms.append((match.group('yes'), '==', 'yes'))
+            else:
+                self.terms.append((match.group('field'), match.group('op'),
+                                   match.group('value')))
+
+    def __repr__(self):
+        return "QAFilter('{0}')".format(self.expression)
+
+    def conditions(self, qaVariable):
+        """
+        (first bit, bit mask, operator, value) of each condition on the QA
+        variable.
+        """
+
+        fields = FIELDS[qaVariable]
+        conditions = []
+        for field, op, value in self.terms:
+            if field not in fields:
+                raise ValueError('Unknown field {0} of {1}, not in {2}'.format(
+                    field, qaVariable, sorted(fields)))
+            shift, nBits, values = fields[field]
+            if value.isdigit():
+                value = int(value)
+            elif value in values:
+                value = values[value]
+            else:
+                raise ValueError('Unknown value {0} of {1}, not in {2}'
+                                 .format(value, field, sorted(values)))
+            conditions.append((shift, (1 << nBits) - 1, OPERATORS[op],
+                               value))
+
+        return conditions
+
+    def mask(self, flags, qaVariable):
+        """
+        pixels meeting the conditions.
+
+        Parameters
+        ----------
+        flags: ndarray
+            QA flags, masked (or NaN) where missing.
+        qaVariable: str
+            'QA' or 'QA_flag'.
+        Returns
+        -------
+        mask: ndarray
+            True where kept, False where the flags fail or are missing.
+        """
+
+        flags = np.ma.masked_invalid(flags)
+        keep = ~np.ma.getmaskarray(flags)
+        # the 16 bits of the signed integers
+        bits = np.ma.filled(flags, 0).astype(np.int32) & 0xFFFF
+
+        for shift, bitMask, op, value in self.conditions(qaVariable):
+            keep &= op((bits >> shift) & bitMask, value)
+
+        return keep
+
+
+def qa_variable(variables):
+    """
+    QA variable of the L2 product, None if missing.
+    """
+
+    for qaVariable in FIELDS:
+        if qaVariable in variables:
+            return qaVariable
+
+    return None
+
+
+def qa_mask(fd, qa, latSlice, lonSlice, *, key=None):
+    """
+    QA mask of the region of the L2 file, cached for the other variables.
+
+    The QA flags are read as the same hyperslab as the variables and
+    decoded with bitwise operations. The masks of the last files are kept,
+    so the variables of a file loaded one by one decode the flags once.
+
+    Parameters
+    ----------
+    fd: netCDF4.Dataset
+        L2 dataset with the 'QA' or 'QA_flag' variable.
+    qa: str or QAFilter
+        QA filter, e.g., 'retrieval >= low_confidence'.
+    latSlice: slice
+    lonSlice: slice
+    Keywords
+    --------
+    key: str
+        cache key of the file (default: path of the file).
+    Returns
+    -------
+    mask: ndarray
+        True where kept. (lat, lon)
+
+    History
+    -------
+    2026-10-18 First version.
+    """
+
+    qa = qa if isinstance(qa, QAFilter) else QAFilter(qa)
+    qaVariable = qa_variable(fd.variables)
+    if qaVariable is None:
+        raise ValueError('No QA flags in {0}'.format(key or fd.filepath()))
+
+    cacheKey = (key or fd.filepath(), qa.expression,
+                (latSlice.start, latSlice.stop, latSlice.step),
+                (lonSlice.start, lonSlice.stop, lonSlice.step))
+    if cacheKey in _MASKS:
+        _MASKS.move_to_end(cacheKey)
+        return _MASKS[cacheKey]
+
+    mask = qa.mask(fd.variables[qaVariable][latSlice, lonSlice], qaVariable)
+    logger.debug('{0}: {1} of {2} pixels kept.'.format(
+        qa, mask.sum(), mask.size))
+
+    # shared by the variables, so read-only
+    mask.flags.writeable = False
+    _MASKS[cacheKey] = mask
+    while len(_MASKS) > MASK_CACHE:
+        _MASKS.popitem(last=False)
+
+    return mask
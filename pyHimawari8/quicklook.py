@@ -0,0 +1,261 @@
+import os
+import functools
+import numpy as np
+from PIL import Image
+from colormap import calipso_colormap, chiljet_colormap, \
+    target_classification_colormap, signal_status_colormap, \
+    colormap_lut, apply_colormap
+from borders import BORDER_FILE, load_borders, clip_borders
+from instrument import span
+
+# colormaps of colormap.py by name, others are looked up in matplotlib
+COLORMAPS = {'chiljet': chiljet_colormap,
+             'calipso': calipso_colormap,
+             'target_classification': target_classification_colormap,
+             'signal_status': signal_status_colormap}
+
+_MASKS = {}   # border masks of each grid
+
+
+@functools.lru_cache(maxsize=None)
+def get_lut(cmap):
+    """
+    cached RGBA lookup table of the colormap.
+
+    Parameters
+    ----------
+    cmap: str
+        colormap name, from `COLORMAPS` or matplotlib.
+    Returns
+    -------
+    lut: ndarray
+        read-only uint8 RGBA colors. (N, 4)
+
+    History
+    -------
+    2026-10-18 First version.
+    """
+
+    if cmap in COLORMAPS:
+        lut = colormap_lut(COLORMAPS[cmap]())
+    else:
+        lut = colormap_lut(cmap)
+    lut.setflags(write=False)
+
+    return lut
+
+
+@functools.lru_cache(maxsize=None)
+def get_class_lut(cmap, nClasses, vmin, vmax):
+    """
+    cached RGBA table of the class indices.
+
+    The class colors are the ones of the colorbar range [vmin, vmax], e.g.,
+    the CLTYPE plots with `getCBSettings('CLTYPE')`, and an extra transparent
+    color is appended for the invalid classes.
+
+    Parameters
+    ----------
+    cmap: str
+        colormap name.
+    nClasses: int
+        number of classes, indexed from 0.
+    vmin: float
+    vmax: float
+    Returns
+    -------
+    table: ndarray
+        read-only uint8 RGBA colors. (nClasses + 1, 4)
+
+    History
+    -------
+    2026-10-18 First version.
+    """
+
+    table = apply_colormap(np.arange(nClasses), get_lut(cmap), vmin, vmax)
+    table = np.vstack([table, np.zeros((1, 4), dtype=np.uint8)])
+    table.setflags(write=False)
+
+    return table
+
+
+def colorize_classes(data, table):
+    """
+    colorize the class indices with a single gather.
+
+    Parameters
+    ----------
+    data: ndarray
+        class indices, masked for invalid values.
+    table: ndarray
+        RGBA table from `get_class_lut`.
+    Returns
+    -------
+    rgba: ndarray
+        uint8 RGBA image. (..., 4)
+    """
+
+    nClasses = table.shape[0] - 1
+    index = np.ma.filled(np.ma.asarray(data), -1)
+    index = np.where(np.isfinite(index), index, -1).astype(np.intp)
+    index[(index < 0) | (index >= nClasses)] = nClasses
+
+    return table[index]
+
+
+def border_mask(lat, lon, *, file=BORDER_FILE):
+    """
+    raster mask of the borders on the regular grid, cached per grid.
+
+    The border polylines are sampled at least once per grid cell, so the
+    mask is a continuous line of one pixel width.
+
+    Parameters
+    ----------
+    lat: ndarray
+        latitude of the regular grid. [degree]
+    lon: ndarray
+        longitude of the regular grid. [degree]
+    Keywords
+    --------
+    file: str
+        border file (default: include/CN-border-La.dat).
+    Returns
+    -------
+    mask: ndarray
+        read-only bool mask. (lat, lon)
+
+    History
+    -------
+    2026-10-18 First version.
+    """
+
+    key = (file, len(lat), float(lat[0]), float(lat[-1]),
+           len(lon), float(lon[0]), float(lon[-1]))
+    if key in _MASKS:
+        return _MASKS[key]
+
+    nRows, nCols = len(lat), len(lon)
+    dLat = (lat[-1] - lat[0]) / max(nRows - 1, 1)
+    dLon = (lon[-1] - lon[0]) / max(nCols - 1, 1)
+
+    coords, offsets = load_borders(file)
+    coords, offsets = clip_borders(
+        coords, offsets, sorted([lon[0], lon[-1]]), sorted([lat[0], lat[-1]]))
+
+    # vertices in pixel coordinates and the segments between them
+    cols = (coords[:, 0] - lon[0]) / dLon
+    rows = (coords[:, 1] - lat[0]) / dLat
+    isStart = np.zeros(len(coords), dtype=bool)
+    isStart[offsets[:-1]] = True
+    iEnd = np.nonzero(~isStart)[0]
+    iBegin = iEnd - 1
+
+    nSteps = np.ceil(np.maximum(np.abs(cols[iEnd] - cols[iBegin]),
+                                np.abs(rows[iEnd] - rows[iBegin]))).astype(
+        np.intp) + 1
+    iSegment = np.repeat(np.arange(len(iEnd)), nSteps)
+    step = np.arange(len(iSegment)) - np.repeat(
+        np.cumsum(nSteps) - nSteps, nSteps)
+    t = step / np.repeat(np.maximum(nSteps - 1, 1), nSteps)
+
+    sampleCols = np.rint(cols[iBegin][iSegment] + t * (
+        cols[iEnd] - cols[iBegin])[iSegment]).astype(np.intp)
+    sampleRows = np.rint(rows[iBegin][iSegment] + t * (
+        rows[iEnd] - rows[iBegin])[iSegment]).astype(np.intp)
+    inside = (sampleCols >= 0) & (sampleCols < nCols) & \
+             (sampleRows >= 0) & (sampleRows < nRows)
+
+    mask = np.zeros((nRows, nCols), dtype=bool)
+    mask[sampleRows[inside], sampleCols[inside]] = True
+    mask.setflags(write=False)
+    _MASKS[key] = mask
+
+    return mask
+
+
+def render_quicklook(data, lat, lon, imgFile, *, vmin=None, vmax=None,
+                     cmap='chiljet', nClasses=None, borders=True,
+                     borderFile=BORDER_FILE, borderColor=(0, 0, 0, 255),
+                     compressLevel=1):
+    """
+    render the gridded data to a PNG, one image pixel per grid cell, without
+    matplotlib.
+
+    The data are colorized with the cached lookup table of the colormap,
+    in [vmin, vmax] or as class indices, the cached border mask is burned in
+    and the image is written by Pillow. Invalid values are transparent.
+
+    Parameters
+    ----------
+    data: ndarray
+        gridded data, masked or with NaN for invalid values. (lat, lon)
+    lat: ndarray
+        latitude of the regular grid, None for the data in the satellite
+        projection, without borders. [degree]
+    lon: ndarray
+        longitude of the regular grid. [degree]
+    imgFile: str
+        exported PNG.
+    Keywords
+    --------
+    vmin: float
+        (default: minimum of the data, or -0.5 for the classes).
+    vmax: float
+        (default: maximum of the data, or nClasses - 0.5 for the classes).
+    cmap: str
+        colormap name, from `COLORMAPS` or matplotlib (default: 'chiljet').
+    nClasses: int
+        colorize the data as class indices [0, nClasses), e.g., 11 for
+        CLTYPE (default: None).
+    borders: bool
+        burn in the borders (default: True).
+    borderFile: str
+        border file (default: include/CN-border-La.dat).
+    borderColor: tuple
+        RGBA color of the borders (default: black).
+    compressLevel: int
+        zlib compression level of the PNG (default: 1).
+    Returns
+    -------
+    imgFile: str
+    Examples
+    --------
+    >>> render_quicklook(vis.data, vis.lat, vis.lon, 'CLTH.png', vmin=0,
+    ...                  vmax=15)
+    >>> render_quicklook(cltype, lat, lon, 'CLTYPE.png', nClasses=11,
+    ...                  cmap='target_classification')
+
+    History
+    -------
+    2026-10-18 First version.
+    2026-10-18 Data in the satellite projection.
+    """
+
+    with span('quicklook', file=imgFile):
+        if nClasses is not None:
+            vmin = -0.5 if vmin is None else vmin
+            vmax = nClasses - 0.5 if vmax is None else vmax
+            rgba = colorize_classes(
+                data, get_class_lut(cmap, nClasses, vmin, vmax))
+        else:
+            if (vmin is None) or (vmax is None):
+                values = np.ma.filled(
+                    np.ma.asarray(data, dtype=np.float32), np.nan)
+                vmin = float(np.nanmin(values)) if vmin is None else vmin
+                vmax = float(np.nanmax(values)) if vmax is None else vmax
+            rgba = apply_colormap(data, get_lut(cmap), vmin, vmax)
+
+        if borders and (lat is not None):
+            rgba[border_mask(lat, lon, file=borderFile)] = borderColor
+
+        # north up
+        if (lat is not None) and (lat[0] < lat[-1]):
+            rgba = rgba[::-1]
+
+        tmpFile = '{0}.{1}.tmp'.format(imgFile, os.getpid())
+        Image.fromarray(np.ascontiguousarray(rgba), 'RGBA').save(
+            tmpFile, format='PNG', compress_level=compressLevel)
+        os.replace(tmpFile, imgFile)
+
+    return imgFile
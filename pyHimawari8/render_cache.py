@@ -0,0 +1,314 @@
+import os
+import json
+import hashlib
+import inspect
+import datetime as dt
+import functools
+import threading
+import numpy as np
+from logger import logger
+
+
+def _normalize(value):
+    """
+    convert the rendering parameter to JSON compatible value.
+
+    Other objects have no stable identity in the manifest, and raise
+    TypeError. Exclude them from the rendering parameters if they don't
+    change the image.
+    """
+
+    if isinstance(value, dict):
+        return {str(key): _normalize(item) for key, item in value.items()}
+    elif isinstance(value, (list, tuple)):
+        return [_normalize(item) for item in value]
+    elif isinstance(value, np.ndarray):
+        return _normalize(value.tolist())
+    elif isinstance(value, np.generic):
+        return value.item()
+    elif isinstance(value, (dt.datetime, dt.date)):
+        return value.isoformat()
+    elif hasattr(value, 'name') and hasattr(value, 'N'):
+        # matplotlib colormap
+        return {'cmap': value.name, 'N': value.N}
+    elif value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    else:
+        raise TypeError('Rendering parameter of {0} is not supported in the '
+                        'cache key.'.format(type(value).__name__))
+
+
+def render_params(func, args, kwargs, *, exclude=(), **context):
+    """
+    collect the rendering parameters of a plotting method call.
+
+    The call is bound to the signature of `func` with defaults applied, so
+    the same rendering gives the same parameters however it's called.
+    Arguments which don't change the image, e.g., caches and indexes, are
+    dropped by `exclude`.
+
+    Parameters
+    ----------
+    func: function
+        plotting method of `Visualizer`.
+    args: tuple
+        positional arguments (without `self`).
+    kwargs: dict
+        keyword arguments.
+    Keywords
+    --------
+    exclude: tuple
+        names of the arguments not in the rendering parameters (default:
+        ()).
+    context:
+        other parameters, e.g., product, measurement time and ROI.
+    Returns
+    -------
+    params: dict
+        JSON compatible rendering parameters.
+
+    History
+    -------
+    2026-10-18 First version.
+    2026-10-18 Add `exclude` keyword.
+    """
+
+    func = inspect.unwrap(func)
+    bound = inspect.signature(func).bind(None, *args, **kwargs)
+    bound.apply_defaults()
+
+    params = {}
+    for name, value in list(bound.arguments.items())[1:]:
+        param = inspect.signature(func).parameters[name]
+        if param.kind == param.VAR_KEYWORD:
+            params.update(value)
+        elif param.kind == param.VAR_POSITIONAL:
+            params[name] = list(value)
+        else:
+            params[name] = value
+
+    for name in exclude:
+        params.pop(name, None)
+
+    params.update(context)
+    params['method'] = func.__name__
+
+    return _normalize(params)
+
+
+class RenderCache(object):
+    """
+    Persistent manifest of the rendered images.
+
+    Each image has an entry file with the identity of its input files
+    (path, size and mtime, or checksum) and the rendering parameters. An
+    image needs not be rendered again if it exists and its entry matches.
+    The entry also records the identity of the image when it's uploaded, so
+    that an up-to-date image is uploaded again only if the last upload
+    failed. Entries are written atomically, so that the cache can be shared
+    by several processes.
+
+    History
+    -------
+    2026-10-18 First version.
+    2026-10-18 Record the uploaded images.
+    """
+
+    def __init__(self, cacheDir, *, checksum=False):
+        self.cacheDir = cacheDir
+        self.checksum = checksum
+
+        if not os.path.exists(cacheDir):
+            os.makedirs(cacheDir, exist_ok=True)
+
+    def identity(self, file):
+        """
+        identity of the input file (or directory).
+        """
+
+        stat = os.stat(file)
+        ident = [os.path.abspath(file), stat.st_size, stat.st_mtime]
+
+        if self.checksum and os.path.isfile(file):
+            sha1 = hashlib.sha1()
+            with open(file, 'rb') as fh:
+                for chunk in iter(lambda: fh.read(1024 * 1024), b''):
+                    sha1.update(chunk)
+            ident = [os.path.abspath(file), stat.st_size, sha1.hexdigest()]
+
+        return ident
+
+    def _entryFile(self, imgFile):
+        key = hashlib.sha1(
+            os.path.abspath(imgFile).encode('utf-8')).hexdigest()
+        return os.path.join(self.cacheDir, key + '.json')
+
+    def _entry(self, imgFile, inputs, params):
+        return {'imgFile': os.path.abspath(imgFile),
+                'inputs': [self.identity(file) for file in inputs],
+                'params': _normalize(params)}
+
+    def _load(self, imgFile):
+        try:
+            with open(self._entryFile(imgFile), 'r', encoding='utf-8') as fh:
+                return json.load(fh)
+        except (OSError, ValueError):
+            return None
+
+    def _save(self, imgFile, entry):
+        entryFile = self._entryFile(imgFile)
+        tmpFile = '{0}.{1}.{2}.tmp'.format(entryFile, os.getpid(),
+                                           threading.get_ident())
+        with open(tmpFile, 'w', encoding='utf-8') as fh:
+            json.dump(entry, fh)
+        os.replace(tmpFile, entryFile)
+
+    def is_fresh(self, imgFile, inputs, params):
+        """
+        whether the image is up to date with its inputs and parameters.
+
+        Parameters
+        ----------
+        imgFile: str
+            exported image.
+        inputs: list
+            input files (or directories).
+        params: dict
+            rendering parameters.
+        Returns
+        -------
+        flag: bool
+        """
+
+        entry = self._load(imgFile)
+        if (entry is None) or (not os.path.exists(imgFile)):
+            return False
+        entry.pop('uploaded', None)
+
+        try:
+            return entry == self._entry(imgFile, inputs, params)
+        except OSError:
+            return False
+
+    def update(self, imgFile, inputs, params):
+        """
+        record the rendered image.
+        """
+
+        self._save(imgFile, self._entry(imgFile, inputs, params))
+
+    def is_uploaded(self, imgFile):
+        """
+        whether the image has been uploaded since it was rendered. False for
+        the images not in the cache.
+        """
+
+        entry = self._load(imgFile)
+        if (entry is None) or ('uploaded' not in entry):
+            return False
+
+        try:
+            return entry['uploaded'] == self.identity(imgFile)
+        except OSError:
+            return False
+
+    def mark_uploaded(self, imgFile):
+        """
+        record the upload of the image. The images not in the cache are
+        ignored.
+        """
+
+        entry = self._load(imgFile)
+        if entry is None:
+            return
+
+        entry['uploaded'] = self.identity(imgFile)
+        self._save(imgFile, entry)
+
+
+def render_key(func, file, args, kwargs, **context):
+    """
+    image filename, input files and rendering parameters of a plotting call.
+
+    Parameters
+    ----------
+    func: function
+        plotting method decorated by `cached_render`.
+    file: str
+        data file of the `Visualizer`.
+    args: tuple
+        positional arguments (without `self`).
+    kwargs: dict
+        keyword arguments.
+    Keywords
+    --------
+    context:
+        other parameters, e.g., product, measurement time and ROI.
+    Returns
+    -------
+    imgFile: str
+    inputs: list
+    params: dict
+
+    History
+    -------
+    2026-10-18 First version.
+    2026-10-18 Drop the arguments excluded by `cached_render`.
+    """
+
+    params = render_params(func, args, kwargs,
+                           exclude=getattr(func, 'renderExclude', ()),
+                           **context)
+    inputs = [file] + [params[name] for name in
+                       getattr(func, 'renderInputs', ())]
+
+    return params['imgFile'], inputs, params
+
+
+def cached_render(*inputArgs, exclude=()):
+    """
+    decorator to skip the plotting method when the image is up to date.
+
+    The decorated method accepts an extra keyword `cache` (`RenderCache`).
+    The inputs of the image are the data file of the `Visualizer` and the
+    arguments named by `inputArgs`. The arguments named by `exclude` don't
+    change the image, and are left out of the rendering parameters.
+
+    Examples
+    --------
+    >>> @cached_render('HSD_Dir', exclude=('segmentCache',))
+    ... def colorplot_with_band(self, band, HSD_Dir, imgFile, ...):
+
+    History
+    -------
+    2026-10-18 First version.
+    2026-10-18 Add `exclude` keyword.
+    """
+
+    def decorator(func):
+
+        @functools.wraps(func)
+        def wrapper(self, *args, cache=None, **kwargs):
+            if cache is None:
+                return func(self, *args, **kwargs)
+
+            imgFile, inputs, params = render_key(
+                wrapper, self.file, args, kwargs,
+                product=self.product, mTime=self.mTime,
+                latRange=self.latRange, lonRange=self.lonRange)
+
+            if cache.is_fresh(imgFile, inputs, params):
+                logger.info('{0} is up to date.'.format(imgFile))
+                return
+
+            res = func(self, *args, **kwargs)
+            cache.update(imgFile, inputs, params)
+
+            return res
+
+        wrapper.renderInputs = inputArgs
+        wrapper.renderExclude = exclude
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,149 @@
+import os
+import hashlib
+import numpy as np
+from pyresample.kd_tree import get_neighbour_info
+from logger import logger
+
+_LUTS = {}   # lookup tables of each (source, target, radius)
+
+
+def area_signature(area):
+    """
+    signature of the area definition.
+
+    Parameters
+    ----------
+    area: AreaDefinition
+    Returns
+    -------
+    signature: str
+        projection, extent and shape of the area.
+
+    History
+    -------
+    2026-10-18 First version.
+    """
+
+    proj = getattr(area, 'proj_str', None)
+    if proj is None:
+        proj = area.crs.to_string()
+
+    return '{0}|{1}|{2}'.format(
+        proj,
+        ','.join('{0:.6f}'.format(value) for value in area.area_extent),
+        ','.join(str(value) for value in area.shape))
+
+
+def get_resample_lut(srcArea, dstArea, *, radius=None, cacheDir=None):
+    """
+    get the nearest neighbour lookup table between two areas.
+
+    The lookup table is computed with a KD-tree only once for each
+    (source area, target area, radius). It's kept in memory and, if
+    `cacheDir` is given, persisted to disk for the following runs.
+
+    Parameters
+    ----------
+    srcArea: AreaDefinition
+        source area, e.g., AHI full-disk (segments) geostationary area.
+    dstArea: AreaDefinition
+        target area.
+    Keywords
+    --------
+    radius: float
+        radius of influence (default: 3 times of the source pixel size). [m]
+    cacheDir: str
+        directory for the persisted lookup tables (default: None).
+    Returns
+    -------
+    lut: dict
+        'input_index': flattened source index of each valid target pixel,
+        -1 if no neighbour is found;
+        'output_index': flattened index of the valid target pixels.
+
+    History
+    -------
+    2026-10-18 First version.
+    """
+
+    if radius is None:
+        radius = 3 * max(abs(srcArea.pixel_size_x), abs(srcArea.pixel_size_y))
+
+    signature = '{0}|{1}|{2:.1f}'.format(
+        area_signature(srcArea), area_signature(dstArea), radius)
+    key = hashlib.sha1(signature.encode('utf-8')).hexdigest()
+
+    if key in _LUTS:
+        return _LUTS[key]
+
+    lutFile = None
+    if cacheDir is not None:
+        lutFile = os.path.join(cacheDir, 'lut_{0}.npz'.format(key))
+
+    if (lutFile is not None) and os.path.exists(lutFile):
+        with np.load(lutFile) as fh:
+            lut = {'input_index': fh['input_index'],
+                   'output_index': fh['output_index']}
+    else:
+        logger.info('Compute resampling lookup table.')
+        valid_input_index, valid_output_index, index_array, _ = \
+            get_neighbour_info(srcArea, dstArea, radius, neighbours=1)
+
+        inputIndex = np.flatnonzero(valid_input_index)
+        index_array = np.asarray(index_array).ravel()
+        isFound = index_array < len(inputIndex)
+        lut = {
+            'input_index': np.where(
+                isFound, inputIndex[np.minimum(index_array,
+                                               len(inputIndex) - 1)],
+                -1).astype(np.int64),
+            'output_index': np.flatnonzero(
+                valid_output_index).astype(np.int64)}
+
+        if lutFile is not None:
+            if not os.path.exists(cacheDir):
+                os.makedirs(cacheDir, exist_ok=True)
+            tmpFile = '{0}.{1}.npz'.format(lutFile[:-4], os.getpid())
+            np.savez(tmpFile, **lut)
+            os.replace(tmpFile, lutFile)
+
+    _LUTS[key] = lut
+
+    return lut
+
+
+def resample_nearest(data, lut, shape, *, fill_value=np.nan):
+    """
+    resample the data with the lookup table through a vectorized gather.
+
+    Parameters
+    ----------
+    data: ndarray
+        source data with the shape of the source area.
+    lut: dict
+        lookup table from `get_resample_lut`.
+    shape: tuple
+        shape of the target area.
+    Keywords
+    --------
+    fill_value: float
+        value of the target pixels without neighbour (default: NaN).
+    Returns
+    -------
+    res: ndarray
+        resampled data with the shape of the target area.
+
+    History
+    -------
+    2026-10-18 First version.
+    """
+
+    data = np.asarray(data).ravel()
+    dtype = np.result_type(data.dtype, np.min_scalar_type(fill_value))
+
+    res = np.full(int(np.prod(shape)), fill_value, dtype=dtype)
+    isFound = lut['input_index'] >= 0
+    res[lut['output_index'][isFound]] = \
+        data[lut['input_index'][isFound]]
+
+    return res.reshape(shape)
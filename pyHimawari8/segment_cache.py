@@ -0,0 +1,203 @@
+import os
+import bz2
+import shutil
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from logger import logger
+from hsd import CHUNKSIZE
+
+
+class SegmentCache(object):
+    """
+    Local disk cache of the decompressed HSD segments.
+
+    A compressed segment (`.DAT.bz2`) is decompressed once into
+    `cacheDir/<key>/<basename without .bz2>`, where the key is derived from
+    the path, size and mtime of the source file, so that the cached segment
+    keeps the original filename for the readers (e.g., satpy `ahi_hsd`).
+    Each hit refreshes the mtime of the cached segment, and the least
+    recently used segments are evicted when the cache exceeds `maxSize`.
+    Segments are written atomically, so that the cache can be shared by
+    several processes.
+
+    Parameters
+    ----------
+    cacheDir: str
+        cache directory.
+    Keywords
+    --------
+    maxSize: int
+        size cap of the cache (default: 20 GB). [bytes]
+    nWorkers: int
+        number of decompression threads (default: 4). bz2 releases the GIL
+        while decompressing, so the threads run in parallel.
+    Examples
+    --------
+    >>> cache = SegmentCache('/root/data/himawari8/.hsd_cache')
+    >>> files = cache.get_many(bz2Files)
+
+    History
+    -------
+    2026-10-18 First version.
+    """
+
+    def __init__(self, cacheDir, *, maxSize=20 * 2 ** 30, nWorkers=4):
+        self.cacheDir = cacheDir
+        self.maxSize = maxSize
+        self.nWorkers = nWorkers
+
+        if not os.path.exists(cacheDir):
+            os.makedirs(cacheDir, exist_ok=True)
+
+    def path(self, file):
+        """
+        path of the decompressed segment in the cache.
+        """
+
+        stat = os.stat(file)
+        signature = '{0}|{1}|{2}'.format(
+            os.path.abspath(file), stat.st_size, stat.st_mtime)
+        key = hashlib.sha1(signature.encode('utf-8')).hexdigest()[:16]
+        basename = os.path.basename(file)
+
+        return os.path.join(self.cacheDir, key, basename[:-len('.bz2')])
+
+    def _fetch(self, file):
+        """
+        decompressed segment of the file, without eviction.
+        """
+
+        if not file.endswith('.bz2'):
+            return file
+
+        cacheFile = self.path(file)
+        if os.path.exists(cacheFile):
+            try:
+                os.utime(cacheFile)   # most recently used
+                return cacheFile
+            except FileNotFoundError:
+                pass   # evicted by another process
+
+        logger.debug('Decompress {0}'.format(file))
+        os.makedirs(os.path.dirname(cacheFile), exist_ok=True)
+        tmpFile = '{0}.{1}.{2}.tmp'.format(
+            cacheFile, os.getpid(), threading.get_ident())
+        try:
+            with bz2.open(file, 'rb') as src, open(tmpFile, 'wb') as dst:
+                shutil.copyfileobj(src, dst, CHUNKSIZE)
+            os.replace(tmpFile, cacheFile)
+        finally:
+            if os.path.exists(tmpFile):
+                os.remove(tmpFile)
+
+        return cacheFile
+
+    def get(self, file):
+        """
+        resolve the segment file through the cache.
+
+        Parameters
+        ----------
+        file: str
+            segment file. Uncompressed files are returned as they are.
+        Returns
+        -------
+        file: str
+            decompressed segment file.
+        """
+
+        return self.get_many([file])[0]
+
+    def get_many(self, files):
+        """
+        resolve the segment files through the cache, decompressing the missing
+        ones in parallel.
+
+        Parameters
+        ----------
+        files: list
+            segment files.
+        Returns
+        -------
+        files: list
+            decompressed segment files, in the same order.
+        """
+
+        files = list(files)
+        if self.nWorkers > 1 and len(files) > 1:
+            with ThreadPoolExecutor(
+                    max_workers=min(self.nWorkers, len(files))) as executor:
+                cacheFiles = list(executor.map(self._fetch, files))
+        else:
+            cacheFiles = [self._fetch(file) for file in files]
+
+        self.evict(keep=cacheFiles)
+
+        return cacheFiles
+
+    def entries(self):
+        """
+        cached segments with their size and mtime.
+
+        Returns
+        -------
+        entries: list
+            (mtime, size, path) of each cached segment.
+        """
+
+        entries = []
+        for key in os.listdir(self.cacheDir):
+            keyDir = os.path.join(self.cacheDir, key)
+            if not os.path.isdir(keyDir):
+                continue
+            for name in os.listdir(keyDir):
+                if name.endswith('.tmp'):
+                    continue
+                path = os.path.join(keyDir, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        return entries
+
+    def evict(self, *, keep=()):
+        """
+        remove the least recently used segments until the cache fits in
+        `maxSize`.
+
+        Keywords
+        --------
+        keep: list
+            segments not to be removed, e.g., the ones in use.
+        Returns
+        -------
+        removed: list
+            removed segments.
+        """
+
+        entries = sorted(self.entries())
+        total = sum(entry[1] for entry in entries)
+        keep = set(keep)
+
+        removed = []
+        for mtime, size, path in entries:
+            if total <= self.maxSize:
+                break
+            if path in keep:
+                continue
+            try:
+                os.remove(path)
+                os.rmdir(os.path.dirname(path))
+            except OSError:
+                pass   # removed by another process or not empty
+            total -= size
+            removed.append(path)
+
+        if removed:
+            logger.debug('Evict {0} segments from {1}'.format(
+                len(removed), self.cacheDir))
+
+        return removed
@@ -0,0 +1,317 @@
+import os
+import json
+import math
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from PIL import Image
+from logger import logger
+from colormap import chiljet_colormap, colormap_lut, apply_colormap
+from instrument import span
+
+TILESIZE = 256   # pixels of each tile
+MAXLAT = 85.0511287798   # latitude limit of the Web Mercator projection
+BATCHSIZE = 64   # tiles of each worker task
+
+_GRID = {}   # data and style of the pyramid, shared with the workers
+
+
+def tile_bounds(z, x, y):
+    """
+    geographic bounds of the XYZ tile.
+
+    Parameters
+    ----------
+    z: int
+        zoom level.
+    x: int
+        tile column, from the antimeridian eastwards.
+    y: int
+        tile row, from the north.
+    Returns
+    -------
+    bounds: tuple
+        (west, south, east, north). [degree]
+
+    History
+    -------
+    2026-10-18 First version.
+    """
+
+    n = 2 ** z
+
+    def lat(row):
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * row / n))))
+
+    return (x / n * 360 - 180, lat(y + 1), (x + 1) / n * 360 - 180, lat(y))
+
+
+def tile_range(z, latRange, lonRange):
+    """
+    tiles covering the region at the zoom level.
+
+    The columns are not wrapped, so that a region across the antimeridian
+    (e.g., the full disk, 80E to 160W as [80, 200]) is a contiguous range.
+    Use `x % 2 ** z` as the tile address.
+
+    Returns
+    -------
+    xRange: range
+    yRange: range
+
+    History
+    -------
+    2026-10-18 First version.
+    """
+
+    n = 2 ** z
+
+    def row(lat):
+        lat = math.radians(min(max(lat, -MAXLAT), MAXLAT))
+        return (1 - math.asinh(math.tan(lat)) / math.pi) / 2 * n
+
+    xStart = math.floor((lonRange[0] + 180) / 360 * n)
+    xStop = math.ceil((lonRange[1] + 180) / 360 * n)
+    xStop = min(xStop, xStart + n)
+    yStart = max(math.floor(row(latRange[1])), 0)
+    yStop = min(math.ceil(row(latRange[0])), n)
+
+    return range(xStart, xStop), range(yStart, yStop)
+
+
+def _grid_index(coord, start, step, size):
+    """
+    nearest index in the regular grid, -1 out of the grid.
+    """
+
+    index = np.rint((coord - start) / step).astype(np.intp)
+    index[(index < 0) | (index >= size)] = -1
+
+    return index
+
+
+def _tile_index(z, x, y, lat, lon, tileSize):
+    """
+    rows and columns of the L2 grid at the tile pixels.
+
+    The Web Mercator tile is separable in longitude and latitude, so each
+    tile needs one row and one column vector instead of a full lookup table.
+    """
+
+    n = 2 ** z * tileSize
+    pixels = np.arange(tileSize) + 0.5
+
+    # unwrapped longitude, shifted to the longitude range of the grid
+    tileLon = (x * tileSize + pixels) / n * 360 - 180
+    dLon = (lon[-1] - lon[0]) / (len(lon) - 1)
+    tileLon = lon[0] - dLon / 2 + np.mod(tileLon - lon[0] + dLon / 2, 360)
+
+    tileLat = np.degrees(np.arctan(np.sinh(
+        np.pi * (1 - 2 * (y * tileSize + pixels) / n))))
+    dLat = (lat[-1] - lat[0]) / (len(lat) - 1)
+
+    return (_grid_index(tileLat, lat[0], dLat, len(lat)),
+            _grid_index(tileLon, lon[0], dLon, len(lon)))
+
+
+def _init_worker(grid):
+    _GRID.update(grid)
+
+
+def _render_batch(tiles, previous):
+    """
+    render a batch of tiles, skipping the ones with unchanged sources.
+
+    Returns
+    -------
+    entries: dict
+        manifest entry of each tile.
+    counts: dict
+        number of 'written', 'skipped' and 'empty' tiles.
+    """
+
+    data, lat, lon = _GRID['data'], _GRID['lat'], _GRID['lon']
+    tileSize, outDir = _GRID['tileSize'], _GRID['outDir']
+    entries = {}
+    counts = {'written': 0, 'skipped': 0, 'empty': 0}
+
+    for z, x, y in tiles:
+        xTile = x % 2 ** z
+        key = '{0}/{1}/{2}'.format(z, xTile, y)
+        tileFile = os.path.join(outDir, str(z), str(xTile),
+                                '{0}.png'.format(y))
+
+        rows, cols = _tile_index(z, x, y, lat, lon, tileSize)
+        validRows, validCols = rows[rows >= 0], cols[cols >= 0]
+
+        # hash of the source block and the style
+        if len(validRows) and len(validCols):
+            rowSlice = slice(validRows.min(), validRows.max() + 1)
+            colSlice = slice(validCols.min(), validCols.max() + 1)
+            block = np.ascontiguousarray(data[rowSlice, colSlice])
+        else:
+            rowSlice, colSlice = slice(0, 0), slice(0, 0)
+            block = np.empty((0, 0), dtype=np.float32)
+        sha1 = hashlib.sha1(_GRID['style'])
+        sha1.update(rows.tobytes())
+        sha1.update(cols.tobytes())
+        sha1.update(block.tobytes())
+        digest = sha1.hexdigest()
+
+        entry = previous.get(key)
+        if (entry is not None) and (entry['hash'] == digest) and \
+           (entry['empty'] or os.path.exists(tileFile)):
+            entries[key] = entry
+            counts['skipped'] += 1
+            continue
+
+        tile = np.full((tileSize, tileSize), np.nan, dtype=np.float32)
+        inside = np.ix_(rows >= 0, cols >= 0)
+        tile[inside] = block[np.ix_(validRows - rowSlice.start,
+                                    validCols - colSlice.start)]
+
+        empty = bool(np.isnan(tile).all())
+        if empty:
+            if os.path.exists(tileFile):
+                os.remove(tileFile)
+            counts['empty'] += 1
+        else:
+            rgba = apply_colormap(tile, _GRID['lut'], _GRID['vmin'],
+                                  _GRID['vmax'])
+            os.makedirs(os.path.dirname(tileFile), exist_ok=True)
+            tmpFile = '{0}.{1}.tmp'.format(tileFile, os.getpid())
+            Image.fromarray(rgba, 'RGBA').save(tmpFile, format='PNG')
+            os.replace(tmpFile, tileFile)
+            counts['written'] += 1
+
+        entries[key] = {'hash': digest, 'empty': empty}
+
+    return entries, counts
+
+
+def render_tiles(data, lat, lon, outDir, *, vmin, vmax, cmap=None,
+                 zooms=range(0, 7), nWorkers=None, tileSize=TILESIZE):
+    """
+    render the XYZ tile pyramid (Web Mercator, `outDir/{z}/{x}/{y}.png`) of
+    the gridded data.
+
+    The tiles are colorized with the RGBA lookup table of the colormap, by
+    nearest neighbour sampling of the regular latitude/longitude grid, and
+    rendered in parallel worker processes. The hash of the source block of
+    each tile is kept in `outDir/tiles.json`, so that the tiles with
+    unchanged data and style are skipped in the next run.
+
+    Parameters
+    ----------
+    data: ndarray
+        gridded data, masked or with NaN for invalid values. (lat, lon)
+    lat: ndarray
+        latitude of the regular grid, ascending or descending. [degree]
+    lon: ndarray
+        longitude of the regular grid, ascending, may exceed 180. [degree]
+    outDir: str
+        root directory of the pyramid.
+    Keywords
+    --------
+    vmin: float
+    vmax: float
+    cmap: str or Colormap
+        colormap (default: chiljet).
+    zooms: list
+        zoom levels (default: 0 to 6, about 2.4 km/pixel at the equator).
+    nWorkers: int
+        number of worker processes (default: number of CPUs).
+    tileSize: int
+        pixels of each tile (default: 256).
+    Returns
+    -------
+    counts: dict
+        number of 'written', 'skipped' (unchanged) and 'empty' tiles.
+    Examples
+    --------
+    >>> render_tiles(vis.data, vis.lat, vis.lon, 'tiles/CLTH', vmin=0,
+    ...              vmax=15)
+    {'written': 1203, 'skipped': 0, 'empty': 180}
+
+    History
+    -------
+    2026-10-18 First version.
+    """
+
+    if cmap is None:
+        cmap = chiljet_colormap()
+    lut = colormap_lut(cmap)
+    lat = np.asarray(np.ma.filled(lat, np.nan), dtype=np.float64)
+    lon = np.asarray(np.ma.filled(lon, np.nan), dtype=np.float64)
+    data = np.ma.filled(np.ma.asarray(data, dtype=np.float32), np.nan)
+
+    style = json.dumps([float(vmin), float(vmax), tileSize,
+                        float(lat[0]), float(lat[-1]), float(lon[0]),
+                        float(lon[-1])]).encode('utf-8') + lut.tobytes()
+    grid = {'data': data, 'lat': lat, 'lon': lon, 'lut': lut,
+            'vmin': vmin, 'vmax': vmax, 'tileSize': tileSize,
+            'outDir': outDir, 'style': style}
+
+    os.makedirs(outDir, exist_ok=True)
+    manifestFile = os.path.join(outDir, 'tiles.json')
+    previous = {}
+    if os.path.exists(manifestFile):
+        with open(manifestFile, 'r', encoding='utf-8') as fh:
+            previous = json.load(fh)['tiles']
+
+    latRange = [min(lat[0], lat[-1]), max(lat[0], lat[-1])]
+    lonRange = [lon[0], lon[-1]]
+    zooms = list(zooms)
+    tiles = []
+    for z in zooms:
+        xRange, yRange = tile_range(z, latRange, lonRange)
+        tiles.extend((z, x, y) for x in xRange for y in yRange)
+
+    batches = []
+    for iStart in range(0, len(tiles), BATCHSIZE):
+        batch = tiles[iStart:iStart + BATCHSIZE]
+        keys = ['{0}/{1}/{2}'.format(z, x % 2 ** z, y) for z, x, y in batch]
+        batches.append((batch, {key: previous[key] for key in keys
+                                if key in previous}))
+
+    if nWorkers is None:
+        nWorkers = os.cpu_count() or 1
+    nWorkers = max(1, min(nWorkers, len(batches)))
+
+    # keep the entries of the other zoom levels
+    entries = {key: entry for key, entry in previous.items()
+               if int(key.split('/')[0]) not in zooms}
+    counts = {'written': 0, 'skipped': 0, 'empty': 0}
+
+    def merge(result):
+        entries.update(result[0])
+        for key, value in result[1].items():
+            counts[key] += value
+
+    with span('tiles', outDir=outDir, tiles=len(tiles)):
+        if nWorkers <= 1:
+            _init_worker(grid)
+            try:
+                for batch in batches:
+                    merge(_render_batch(*batch))
+            finally:
+                _GRID.clear()
+        else:
+            with ProcessPoolExecutor(max_workers=nWorkers,
+                                     initializer=_init_worker,
+                                     initargs=(grid,)) as executor:
+                futures = [executor.submit(_render_batch, *batch)
+                           for batch in batches]
+                for future in futures:
+                    merge(future.result())
+
+    tmpFile = '{0}.{1}.tmp'.format(manifestFile, os.getpid())
+    with open(tmpFile, 'w', encoding='utf-8') as fh:
+        json.dump({'tiles': entries}, fh)
+    os.replace(tmpFile, manifestFile)
+
+    logger.info('Export tiles to {0}: {1} written, {2} skipped, '
+                '{3} empty.'.format(outDir, counts['written'],
+                                    counts['skipped'], counts['empty']))
+
+    return counts
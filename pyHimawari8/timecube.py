@@ -0,0 +1,358 @@
+import os
+import datetime as dt
+import numpy as np
+import zarr
+import dask.array as da
+from netCDF4 import Dataset
+from logger import logger
+from helper import getROISlice
+from instrument import span
+
+INTERVAL = 600   # seconds between the full-disk observations
+CHUNKS = (6, 512, 512)   # an hour of 10-minute frames in each chunk
+EPOCH = dt.datetime(1970, 1, 1)
+DIMENSIONS = {'time': ['time'], 'latitude': ['latitude'],
+              'longitude': ['longitude']}
+
+
+def cube_path(storeDir, product):
+    """
+    path of the time cube of the product.
+    """
+
+    return os.path.join(storeDir, '{0}.zarr'.format(product))
+
+
+class TimeCube(object):
+    """
+    Append-only Zarr store of the region-of-interest subsets of a L2
+    product, one (time, latitude, longitude) array per variable.
+
+    The frames are put at fixed time slots of `interval` seconds since the
+    day of the first frame, so the time chunks of 6 slots hold whole hours
+    of 10-minute frames and a day is read as 24 whole chunks along time.
+    The chunks are small in time, as each new frame rewrites its chunks.
+    The store only grows at the end; an empty slot has NaN data and time -1.
+    The 'time' array holds the seconds since 1970-01-01 of each slot, and
+    the arrays are tagged with their dimensions (`_ARRAY_DIMENSIONS`), so
+    a Zarr v2 store opens with `xarray.open_zarr`.
+
+    Parameters
+    ----------
+    storeDir: str
+        directory of the time cubes.
+    product: str
+        product name, e.g., 'CLP' or 'ARP'.
+    Keywords
+    --------
+    mode: str
+        'a' (read/write, create if missing) or 'r' (default: 'a').
+    Examples
+    --------
+    >>> cube = TimeCube('/root/data/himawari8/cube', 'CLP')
+    >>> cube.ingest(file, ['CLTYPE', 'CLTH'], mTime,
+    ...             latRange=[15, 58], lonRange=[70, 140])
+    >>> data, times, lat, lon = cube.load(['CLTH'], dt.datetime(2020, 2, 19),
+    ...                                   dt.datetime(2020, 2, 20))
+
+    History
+    -------
+    2026-10-18 First version.
+    """
+
+    def __init__(self, storeDir, product, *, mode='a'):
+        self.path = cube_path(storeDir, product)
+        self.product = product
+
+        if (mode == 'r') and not os.path.exists(self.path):
+            raise FileNotFoundError(self.path)
+
+        self.group = zarr.open_group(self.path, mode=mode)
+
+    def __repr__(self):
+        return '<TimeCube {0} ({1} slots)>'.format(self.path, len(self))
+
+    def __len__(self):
+        return self.group['time'].shape[0] if 'time' in self.group else 0
+
+    @property
+    def variables(self):
+        return [name for name in self.group.array_keys()
+                if name not in DIMENSIONS]
+
+    @property
+    def lat(self):
+        return self.group['latitude'][:]
+
+    @property
+    def lon(self):
+        return self.group['longitude'][:]
+
+    @property
+    def times(self):
+        """
+        times of the ingested frames.
+        """
+
+        seconds = self.group['time'][:] if 'time' in self.group else []
+        return [EPOCH + dt.timedelta(seconds=int(second))
+                for second in seconds if second >= 0]
+
+    def slot(self, mTime, *, ceil=False):
+        """
+        time slot of the measurement time, negative before the first day.
+        The slot starting at or after the time with `ceil`.
+        """
+
+        origin = dt.datetime.strptime(self.group.attrs['origin'],
+                                      '%Y-%m-%dT%H:%M:%S')
+        seconds = (mTime - origin).total_seconds()
+        interval = self.group.attrs['interval']
+
+        if ceil:
+            return int(-(-seconds // interval))
+        return int(seconds // interval)
+
+    def _create(self, lat, lon, mTime, *, latRange, lonRange, interval,
+                chunks):
+        """
+        create the coordinates of an empty cube.
+        """
+
+        origin = dt.datetime(mTime.year, mTime.month, mTime.day)
+        self.group.attrs.update({
+            'product': self.product,
+            'origin': origin.strftime('%Y-%m-%dT%H:%M:%S'),
+            'interval': interval,
+            'latRange': list(latRange),
+            'lonRange': list(lonRange),
+            'chunks': list(chunks)})
+
+        for name, coord in [('latitude', lat), ('longitude', lon)]:
+            array = self.group.create_dataset(
+                name, shape=(len(coord), ), chunks=(len(coord), ),
+                dtype='f4')
+            array[:] = np.asarray(coord, dtype=np.float32)
+            array.attrs['_ARRAY_DIMENSIONS'] = DIMENSIONS[name]
+
+        array = self.group.create_dataset(
+            'time', shape=(0, ), chunks=(chunks[0], ), dtype='i8',
+            fill_value=-1)
+        array.attrs.update({'_ARRAY_DIMENSIONS': DIMENSIONS['time'],
+                            'units': 'seconds since 1970-01-01 00:00:00',
+                            'calendar': 'proleptic_gregorian'})
+
+    def _require(self, variable, var):
+        """
+        array of the variable, created with the current length if missing.
+        """
+
+        if variable in self.group:
+            return self.group[variable]
+
+        chunks = self.group.attrs['chunks']
+        shape = (len(self), len(self.lat), len(self.lon))
+        array = self.group.create_dataset(
+            variable, shape=shape,
+            chunks=(chunks[0], min(chunks[1], shape[1]),
+                    min(chunks[2], shape[2])),
+            dtype='f4', fill_value=np.nan)
+        array.attrs.update({
+            '_ARRAY_DIMENSIONS': ['time', 'latitude', 'longitude'],
+            'units': getattr(var, 'units', ''),
+            'long_name': getattr(var, 'long_name', variable)})
+
+        return array
+
+    def ingest(self, file, variables, mTime, *, latRange, lonRange,
+               interval=INTERVAL, chunks=CHUNKS, overwrite=False):
+        """
+        add the region-of-interest subset of the L2 file to the cube.
+
+        The region is read as a hyperslab and written to its time slot,
+        growing the arrays when the slot is beyond their end. The masked
+        values are NaN.
+
+        Parameters
+        ----------
+        file: str
+            L2 file of the product.
+        variables: list
+            variable names, e.g., ['CLTYPE', 'CLTH'].
+        mTime: datetime
+            measurement time.
+        Keywords
+        --------
+        latRange: list
+            latitude range of the cube. [degree]
+        lonRange: list
+            longitude range of the cube. [degree]
+        interval: int
+            seconds between the time slots, only for a new cube
+            (default: 600).
+        chunks: tuple
+            (time, latitude, longitude) chunks, only for a new cube
+            (default: (6, 512, 512)).
+        overwrite: bool
+            write the frame if its slot is filled, by this or another time
+            of the slot (default: False).
+        Returns
+        -------
+        flag: bool
+            whether the frame is written.
+
+        History
+        -------
+        2026-10-18 First version.
+        2026-10-18 Skip any filled slot without `overwrite`.
+        """
+
+        with span('ingest', file=file, product=self.product), \
+                Dataset(file, 'r') as fd:
+            latSlice, lonSlice, lat, lon = getROISlice(fd, latRange,
+                                                       lonRange)
+
+            if 'time' not in self.group:
+                self._create(lat, lon, mTime, latRange=latRange,
+                             lonRange=lonRange, interval=interval,
+                             chunks=chunks)
+            elif [list(self.group.attrs['latRange']),
+                  list(self.group.attrs['lonRange'])] != \
+                    [list(latRange), list(lonRange)]:
+                raise ValueError('Region {0} {1} != {2} {3} of {4}'.format(
+                    latRange, lonRange, self.group.attrs['latRange'],
+                    self.group.attrs['lonRange'], self.path))
+
+            iSlot = self.slot(mTime)
+            if iSlot < 0:
+                raise ValueError('{0} is before the first day of {1}'.format(
+                    mTime, self.path))
+
+            seconds = int((mTime - EPOCH).total_seconds())
+            if (iSlot < len(self)) and (self.group['time'][iSlot] >= 0) \
+                    and not overwrite:
+                logger.info('Slot {0} of {1} is already filled.'.format(
+                    iSlot, self.path))
+                return False
+
+            for variable in variables:
+                self._require(variable, fd.variables[variable])
+            if iSlot >= len(self):
+                nSlots = iSlot + 1
+                for name in ['time'] + self.variables:
+                    array = self.group[name]
+                    array.resize((nSlots, ) + array.shape[1:])
+
+            for variable in variables:
+                data = fd.variables[variable][latSlice, lonSlice]
+                self.group[variable][iSlot] = np.ma.filled(
+                    np.ma.asarray(data, dtype=np.float32), np.nan)
+            # the time is written last, so a frame is complete once it's set
+            self.group['time'][iSlot] = seconds
+
+        logger.info('Ingest {0} into {1} at slot {2}.'.format(
+            os.path.basename(file), self.path, iSlot))
+
+        return True
+
+    def load(self, variables, tStart, tStop=None, *, lazy=False):
+        """
+        load the frames of [tStart, tStop) of the variables.
+
+        Parameters
+        ----------
+        variables: list
+            variable names.
+        tStart: datetime
+            start time.
+        tStop: datetime
+            stop time, exclusive (default: the slot of `tStart` only).
+        Keywords
+        --------
+        lazy: bool
+            return dask arrays chunked as the store (default: False).
+        Returns
+        -------
+        data: dict
+            float32 (time, latitude, longitude) array of each variable,
+            NaN where missing.
+        times: list
+            time of each slot, None for the empty slots.
+        lat: ndarray
+        lon: ndarray
+
+        History
+        -------
+        2026-10-18 First version.
+        """
+
+        iStart = max(self.slot(tStart), 0)
+        iStop = iStart + 1 if tStop is None else self.slot(tStop, ceil=True)
+        iStop = max(min(iStop, len(self)), iStart)
+
+        with span('cube_load', product=self.product, slots=iStop - iStart):
+            data = {}
+            for variable in variables:
+                array = self.group[variable]
+                if lazy:
+                    data[variable] = da.from_array(
+                        array, chunks=array.chunks)[iStart:iStop]
+                else:
+                    data[variable] = array[iStart:iStop]
+
+            times = [EPOCH + dt.timedelta(seconds=int(second))
+                     if second >= 0 else None
+                     for second in self.group['time'][iStart:iStop]]
+
+        return data, times, self.lat, self.lon
+
+
+def ingest(files, storeDir, variables, *, latRange, lonRange,
+           overwrite=False):
+    """
+    ingest the L2 files into the time cubes of their products.
+
+    A file failing to be read is logged and skipped.
+
+    Parameters
+    ----------
+    files: list
+        (product, mTime, file) of each L2 file, in time order.
+    storeDir: str
+        directory of the time cubes.
+    variables: dict
+        variable names of each product, e.g., {'CLP': ['CLTYPE', 'CLTH']}.
+    Keywords
+    --------
+    latRange: list
+        latitude range. [degree]
+    lonRange: list
+        longitude range. [degree]
+    overwrite: bool
+        write the ingested frames again (default: False).
+    Returns
+    -------
+    nIngested: int
+        number of the written frames.
+
+    History
+    -------
+    2026-10-18 First version.
+    """
+
+    cubes = {}
+    nIngested = 0
+    for product, mTime, file in files:
+        if product not in variables:
+            continue
+        if product not in cubes:
+            cubes[product] = TimeCube(storeDir, product)
+
+        try:
+            nIngested += cubes[product].ingest(
+                file, variables[product], mTime, latRange=latRange,
+                lonRange=lonRange, overwrite=overwrite)
+        except Exception as e:
+            logger.warn('Failed in ingesting {0}: {1}'.format(file, e))
+
+    return nIngested
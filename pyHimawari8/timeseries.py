@@ -0,0 +1,374 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from netCDF4 import Dataset
+from logger import logger
+from helper import getGridSignature, getROISlice
+from discovery import parseName
+from instrument import span
+
+_POINT_INDEX = {}   # grid cells of the points on each grid
+
+
+def find_files(dataDir, product, tStart, tStop, *, version=None,
+               resolution=None):
+    """
+    L2 files of the product in [tStart, tStop] under the directory.
+
+    Parameters
+    ----------
+    dataDir: str
+        directory of the L2 files, searched recursively, e.g., the
+        `pub/himawari/L2/ARP` directory of the mirror.
+    product: str
+        'CLP' or 'ARP'.
+    tStart: datetime
+    tStop: datetime
+    Keywords
+    --------
+    version: str
+        algorithm version, e.g., '021' (default: any).
+    resolution: int
+        grid points of each side in the filename, e.g., 2401 for the
+        0.05-degree grid (default: any).
+    Returns
+    -------
+    files: list
+        files sorted by time.
+
+    History
+    -------
+    2026-10-18 First version.
+    2026-10-18 Filter by `resolution`.
+    """
+
+    matched = []
+    for dirPath, _, names in os.walk(dataDir):
+        for name in names:
+            info = parseName(name)
+            if (info is None) or (info['kind'] != 'L2') or \
+               (info['product'] != product) or \
+               (version is not None and info['version'] != version) or \
+               (resolution is not None and
+                    int(info['pixels']) != int(resolution)):
+                continue
+            if tStart <= info['time'] <= tStop:
+                matched.append((info['time'], os.path.join(dirPath, name)))
+
+    return [file for _, file in sorted(matched)]
+
+
+def point_index(fd, points):
+    """
+    grid cells of the points, cached per grid.
+
+    Parameters
+    ----------
+    fd: netCDF4.Dataset
+        L2 dataset with 'latitude' and 'longitude' vectors.
+    points: list
+        (lat, lon) of each point. [degree]
+    Returns
+    -------
+    rows: ndarray
+        latitude index of each point, -1 if outside the grid.
+    cols: ndarray
+        longitude index of each point, -1 if outside the grid.
+
+    History
+    -------
+    2026-10-18 First version.
+    """
+
+    points = tuple((float(lat), float(lon)) for lat, lon in points)
+    key = (getGridSignature(fd), points)
+
+    if key not in _POINT_INDEX:
+        index = []
+        for coord, values in zip(
+                [fd.variables['latitude'][:], fd.variables['longitude'][:]],
+                np.array(points, dtype=np.float64).reshape(-1, 2).T):
+            coord = np.asarray(coord, dtype=np.float64)
+            iNearest = np.abs(coord[np.newaxis] - values[:, np.newaxis]) \
+                .argmin(axis=1)
+            # within half a cell beyond the end points
+            halfCell = abs(coord[-1] - coord[0]) / (len(coord) - 1) / 2
+            isInside = (values >= coord.min() - halfCell) & \
+                (values <= coord.max() + halfCell)
+            index.append(np.where(isInside, iNearest, -1))
+
+        rows, cols = index
+        cols[rows < 0] = -1
+        rows[cols < 0] = -1
+        _POINT_INDEX[key] = (rows, cols)
+
+    return _POINT_INDEX[key]
+
+
+def _init_worker(pointIndex):
+    _POINT_INDEX.update(pointIndex)
+
+
+def _cell_coords(fd, rows, cols):
+    """
+    lat/lon of the grid cells, NaN if outside the grid.
+    """
+
+    lat = np.where(rows >= 0, fd.variables['latitude'][:][rows], np.nan)
+    lon = np.where(cols >= 0, fd.variables['longitude'][:][cols], np.nan)
+
+    return lat, lon
+
+
+def _read_points(file, variables, points):
+    """
+    values of the variables at the points on the grid of the file, NaN if
+    masked or outside, and the lat/lon of the grid cells.
+    """
+
+    values = {variable: np.full(len(points), np.nan, dtype=np.float32)
+              for variable in variables}
+
+    with Dataset(file, 'r') as fd:
+        rows, cols = point_index(fd, points)
+        values['lat'], values['lon'] = _cell_coords(fd, rows, cols)
+        isInside = rows >= 0
+        if not isInside.any():
+            return values
+
+        # the rectangle of the distinct rows and columns is read at once
+        uRows, iRows = np.unique(rows[isInside], return_inverse=True)
+        uCols, iCols = np.unique(cols[isInside], return_inverse=True)
+        for variable in variables:
+            block = fd.variables[variable][uRows, uCols]
+            block = np.ma.filled(np.ma.asarray(block, dtype=np.float32),
+                                 np.nan)
+            values[variable][isInside] = block[iRows, iCols]
+
+    return values
+
+
+def _read_box(file, variables, latRange, lonRange):
+    """
+    values of the variables in the box, NaN if masked, and the signature
+    of the grid of the file.
+    """
+
+    with Dataset(file, 'r') as fd:
+        latSlice, lonSlice, _, _ = getROISlice(fd, latRange, lonRange)
+        values = {variable: np.ma.filled(np.ma.asarray(
+            fd.variables[variable][latSlice, lonSlice], dtype=np.float32),
+            np.nan) for variable in variables}
+        values['signature'] = getGridSignature(fd)
+
+    return values
+
+
+def _read(args):
+    """
+    read one file in a worker, None if failed.
+    """
+
+    file, variables, points, box = args
+    try:
+        if points is not None:
+            return _read_points(file, variables, points)
+        return _read_box(file, variables, *box)
+    except Exception as e:
+        logger.warn('Failed in reading {0}: {1}'.format(file, e))
+        return None
+
+
+def _extract(files, variables, *, points=None, box=None, nWorkers=None):
+    """
+    read the files in parallel, with the grid index of the first file
+    shared with the workers.
+
+    The points are read on the grid of each file. The box is read on the
+    grid of the first file, and a file on another grid gets NaN.
+    """
+
+    if len(files) == 0:
+        raise ValueError('No files to extract.')
+
+    # grid cells of the first grid, computed once
+    with Dataset(files[0], 'r') as fd:
+        signature = getGridSignature(fd)
+        if points is not None:
+            lat, lon = _cell_coords(fd, *point_index(fd, points))
+        else:
+            _, _, lat, lon = getROISlice(fd, *box)
+            lat, lon = np.asarray(lat), np.asarray(lon)
+
+    tasks = [(file, list(variables), points, box) for file in files]
+    nWorkers = min(nWorkers or os.cpu_count() or 1, len(files))
+    with span('extract', files=len(files), workers=nWorkers):
+        if nWorkers <= 1:
+            results = [_read(task) for task in tasks]
+        else:
+            with ProcessPoolExecutor(
+                    max_workers=nWorkers, initializer=_init_worker,
+                    initargs=(dict(_POINT_INDEX), )) \
+                    as executor:
+                results = list(executor.map(
+                    _read, tasks,
+                    chunksize=max(1, len(tasks) // (nWorkers * 4))))
+
+    for iFile, result in enumerate(results):
+        if (box is not None) and (result is not None) and \
+                (result['signature'] != signature):
+            logger.warn('Grid of {0} differs from {1}.'.format(
+                files[iFile], files[0]))
+            results[iFile] = None
+
+    shape = (len(lat), ) if points is not None else (len(lat), len(lon))
+    infos = [parseName(os.path.basename(file)) for file in files]
+    series = {'time': [info['time'] if info else None for info in infos]}
+    if points is not None:
+        # grid cells of each file
+        keys = ['lat', 'lon'] + list(variables)
+    else:
+        series.update({'lat': lat, 'lon': lon})
+        keys = list(variables)
+
+    for key in keys:
+        data = np.full((len(files), ) + shape, np.nan, dtype=np.float32)
+        for iFile, result in enumerate(results):
+            if result is not None:
+                data[iFile] = result[key]
+        series[key] = data
+
+    return series
+
+
+def extract_points(files, variables, points, *, nWorkers=None):
+    """
+    time series of the variables at the points.
+
+    Only the grid cells of the points are read from each file, and the
+    files are read in parallel. The grid cells of the points are computed
+    once per grid and shared with the workers.
+
+    Parameters
+    ----------
+    files: list
+        L2 files, e.g., from `find_files`.
+    variables: list
+        variable names, e.g., ['AOT'].
+    points: list
+        (lat, lon) of each point. [degree]
+    Keywords
+    --------
+    nWorkers: int
+        number of worker processes (default: number of CPUs).
+    Returns
+    -------
+    series: dict
+        'time' (list of the file times), 'lat' and 'lon' (the grid cells of
+        the points on the grid of each file, NaN if outside the grid) and a
+        float32 array of each variable, NaN if masked or the file fails.
+        (time, point)
+    Examples
+    --------
+    >>> files = find_files('/data/L2/ARP', 'ARP', dt.datetime(2020, 2, 19),
+    ...                    dt.datetime(2020, 2, 20))
+    >>> series = extract_points(files, ['AOT'],
+    ...                         [(30.5, 114.4), (39.9, 116.4)])
+    >>> df = to_dataframe(series)
+
+    History
+    -------
+    2026-10-18 First version.
+    2026-10-18 Grid cells of each file.
+    """
+
+    return _extract(files, variables, points=[tuple(point) for point in
+                                              points], nWorkers=nWorkers)
+
+
+def extract_box(files, variables, latRange, lonRange, *, nWorkers=None):
+    """
+    time series of the variables in the small box.
+
+    The box is read as a hyperslab of each file, with the slices of
+    `getROISlice` cached per grid. A file on another grid than the first
+    one is logged and gets NaN.
+
+    Parameters
+    ----------
+    files: list
+        L2 files, e.g., from `find_files`.
+    variables: list
+        variable names.
+    latRange: list
+        latitude range of the box. [degree]
+    lonRange: list
+        longitude range of the box. [degree]
+    Keywords
+    --------
+    nWorkers: int
+        number of worker processes (default: number of CPUs).
+    Returns
+    -------
+    series: dict
+        'time', 'lat' and 'lon' of the box and a float32 array of each
+        variable, NaN if masked, the file fails or is on another grid.
+        (time, lat, lon)
+    Examples
+    --------
+    >>> series = extract_box(files, ['CLTH'], [30, 31], [114, 115])
+    >>> np.nanmean(series['CLTH'], axis=(1, 2))
+
+    History
+    -------
+    2026-10-18 First version.
+    2026-10-18 NaN for the files on another grid.
+    """
+
+    return _extract(files, variables, box=(list(latRange), list(lonRange)),
+                    nWorkers=nWorkers)
+
+
+def to_dataframe(series):
+    """
+    tidy table of the time series, one row per time and grid cell.
+
+    Parameters
+    ----------
+    series: dict
+        time series from `extract_points` or `extract_box`.
+    Returns
+    -------
+    df: pandas.DataFrame
+        'time', 'point' (only for points), 'lat', 'lon' and a column of
+        each variable.
+
+    History
+    -------
+    2026-10-18 First version.
+    2026-10-18 Grid cells of each file for the points.
+    """
+
+    import pandas as pd
+
+    variables = [key for key in series if key not in ('time', 'lat', 'lon')]
+    nTimes = len(series['time'])
+
+    if series[variables[0]].ndim == 2:
+        # points
+        nCells = series['lat'].shape[1]
+        columns = {'time': np.repeat(series['time'], nCells),
+                   'point': np.tile(np.arange(nCells), nTimes),
+                   'lat': series['lat'].reshape(-1),
+                   'lon': series['lon'].reshape(-1)}
+    else:
+        LON, LAT = np.meshgrid(series['lon'], series['lat'])
+        nCells = LAT.size
+        columns = {'time': np.repeat(series['time'], nCells),
+                   'lat': np.tile(LAT.ravel(), nTimes),
+                   'lon': np.tile(LON.ravel(), nTimes)}
+
+    for variable in variables:
+        columns[variable] = series[variable].reshape(-1)
+
+    return pd.DataFrame(columns)
@@ -0,0 +1,272 @@
+import numpy as np
+from logger import logger
+from hsd import HSDSegment, lonlat2linecol, NOMINAL_GRID
+from calibration import calibration_lut
+from instrument import span
+
+RGB_BANDS = (3, 2, 1)   # red (0.64 um), green (0.51 um), blue (0.47 um)
+GAMMA = 2.2
+MAX_REFLECTANCE = 100   # reflectance of the full brightness [%]
+CHUNKBYTES = 32 * 2 ** 20   # bytes of the calibrated lines of each read
+
+
+def output_grid(latRange, lonRange, pixels):
+    """
+    pixel centers of the equirectangular output image, north up.
+
+    Parameters
+    ----------
+    latRange: list
+        latitude range. [degree]
+    lonRange: list
+        longitude range. [degree]
+    pixels: int
+        pixels of each side.
+    Returns
+    -------
+    lat: ndarray
+        descending latitude. (pixels, )
+    lon: ndarray
+        ascending longitude. (pixels, )
+
+    History
+    -------
+    2026-10-18 First version.
+    """
+
+    dLat = (latRange[1] - latRange[0]) / pixels
+    dLon = (lonRange[1] - lonRange[0]) / pixels
+    lat = latRange[1] - dLat * (np.arange(pixels) + 0.5)
+    lon = lonRange[0] + dLon * (np.arange(pixels) + 0.5)
+
+    return lat, lon
+
+
+def target_resolution(latRange, lonRange, pixels):
+    """
+    coarsest whole-kilometer resolution of the full disk finer than the
+    output pixels at the sub-satellite point. [km]
+    """
+
+    pixelSize = min(latRange[1] - latRange[0],
+                    lonRange[1] - lonRange[0]) / pixels * 111.32
+
+    return max(1, int(pixelSize))
+
+
+def _footprint(lat, lon, resolution, *, chunkLines=256):
+    """
+    block line/column of the full disk at `resolution` of each output pixel,
+    -1 if invisible. The navigation is computed in chunks of output lines.
+    """
+
+    nBlocks = NOMINAL_GRID[1.0][2] // resolution
+    row = np.full((len(lat), len(lon)), -1, dtype=np.int32)
+    column = np.full((len(lat), len(lon)), -1, dtype=np.int32)
+
+    for iStart in range(0, len(lat), chunkLines):
+        chunk = slice(iStart, iStart + chunkLines)
+        LON, LAT = np.meshgrid(lon, lat[chunk])
+        line, col = lonlat2linecol(LON, LAT, resolution=1.0)
+
+        # zero-based continuous coordinates of the 1 km grid
+        with np.errstate(invalid='ignore'):
+            thisRow = np.floor((line - 0.5) / resolution)
+            thisColumn = np.floor((col - 0.5) / resolution)
+            # incomplete blocks at the east and south edges of the disk
+            isVisible = (thisRow < nBlocks) & (thisColumn < nBlocks)
+        row[chunk][isVisible] = thisRow[isVisible]
+        column[chunk][isVisible] = thisColumn[isVisible]
+
+    return row, column
+
+
+def stream_band(files, rows, columns, resolution, *,
+                calibration='reflectance', chunkBytes=CHUNKBYTES):
+    """
+    block-average the band over the full-disk blocks while reading it.
+
+    The segments are read one at a time, in chunks of lines, and only the
+    lines of the requested blocks are read. The block sums are accumulated,
+    so blocks spanning two segments and invalid pixels are handled, and
+    the memory is the blocks plus one chunk.
+
+    Parameters
+    ----------
+    files: list
+        segment files of the band.
+    rows: slice
+        block rows of the full disk at `resolution`.
+    columns: slice
+        block columns of the full disk at `resolution`.
+    resolution: int
+        block size. [km]
+    Keywords
+    --------
+    calibration: str
+        calibration of the band (default: 'reflectance').
+    chunkBytes: int
+        bytes of the calibrated lines of each read (default: 32 MB).
+    Returns
+    -------
+    data: ndarray
+        float32 block means, NaN without valid pixels.
+        (rows, columns)
+
+    History
+    -------
+    2026-10-18 First version.
+    """
+
+    nRows = rows.stop - rows.start
+    nColumns = columns.stop - columns.start
+    total = np.zeros((nRows, nColumns), dtype=np.float32)
+    count = np.zeros((nRows, nColumns), dtype=np.float32)
+
+    for file in files:
+        with HSDSegment(file) as seg:
+            factor = int(round(resolution / seg.resolution))
+            lut = calibration_lut(seg.header, calibration)
+            firstLine = seg.first_line - 1
+
+            # lines of the segment in the blocks
+            start = max(rows.start * factor - firstLine, 0)
+            stop = min(rows.stop * factor - firstLine, seg.shape[0])
+            colSlice = slice(columns.start * factor,
+                             columns.stop * factor)
+            chunkLines = max(factor, chunkBytes // (seg.shape[1] * 4) //
+                             factor * factor)
+
+            for iStart in range(start, stop, chunkLines):
+                iStop = min(iStart + chunkLines, stop)
+                data = lut.take(seg.read_lines(iStart, iStop))[:, colSlice]
+                valid = np.isfinite(data)
+                data[~valid] = 0
+
+                # sum over the columns of each block, then the lines
+                shape = (data.shape[0], nColumns, factor)
+                colTotal = data.reshape(shape).sum(axis=2)
+                colCount = valid.reshape(shape).sum(axis=2,
+                                                    dtype=np.float32)
+                blocks = (firstLine + np.arange(iStart, iStop)) // factor
+                starts = np.flatnonzero(np.diff(blocks, prepend=-1))
+                iRows = blocks[starts] - rows.start
+                total[iRows] += np.add.reduceat(colTotal, starts, axis=0)
+                count[iRows] += np.add.reduceat(colCount, starts, axis=0)
+
+        logger.debug('Stream {0} at {1} km.'.format(file, resolution))
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        np.divide(total, count, out=total)
+
+    return total
+
+
+def enhance(reflectance, *, gamma=GAMMA, maxReflectance=MAX_REFLECTANCE):
+    """
+    scale the reflectance to [0, 1] with the gamma correction, in place.
+
+    Parameters
+    ----------
+    reflectance: ndarray
+        float32 reflectance. [%]
+    Keywords
+    --------
+    gamma: float
+        gamma (default: 2.2).
+    maxReflectance: float
+        reflectance of the full brightness (default: 100). [%]
+    Returns
+    -------
+    reflectance: ndarray
+        the enhanced input, NaN kept.
+
+    History
+    -------
+    2026-10-18 First version.
+    """
+
+    with np.errstate(invalid='ignore'):
+        reflectance *= np.float32(1 / maxReflectance)
+        np.clip(reflectance, 0, 1, out=reflectance)
+        np.power(reflectance, np.float32(1 / gamma), out=reflectance)
+
+    return reflectance
+
+
+def true_color(bandFiles, latRange, lonRange, pixels, *, resolution=None,
+               gamma=GAMMA, maxReflectance=MAX_REFLECTANCE):
+    """
+    true-color image of the region from the HSD segments of band 3, 2 and
+    1, streamed band by band and segment by segment.
+
+    Each band is block-averaged to `resolution` while being read, so the
+    peak memory depends on the output size, not on the full disk: about
+    the blocks covering the region plus one chunk of lines.
+
+    Parameters
+    ----------
+    bandFiles: dict
+        segment files of band 3, 2 and 1 covering the region.
+    latRange: list
+        latitude range. [degree]
+    lonRange: list
+        longitude range. [degree]
+    pixels: int
+        pixels of each side of the image.
+    Keywords
+    --------
+    resolution: int
+        block size of the averaging (default: the output pixel size at the
+        sub-satellite point). [km]
+    gamma: float
+        gamma of the enhancement (default: 2.2).
+    maxReflectance: float
+        reflectance of the full brightness (default: 100). [%]
+    Returns
+    -------
+    rgba: ndarray
+        float32 image in [0, 1], north up, transparent outside the disk
+        and where data are missing. (pixels, pixels, 4)
+    Examples
+    --------
+    >>> files = {band: index.find_hsd(HSD_Dir, mTime, band, segments=[1, 2])
+    ...          for band in RGB_BANDS}
+    >>> rgba = true_color(files, [20, 60], [90, 140], 1000)
+
+    History
+    -------
+    2026-10-18 First version.
+    """
+
+    if resolution is None:
+        resolution = target_resolution(latRange, lonRange, pixels)
+
+    lat, lon = output_grid(latRange, lonRange, pixels)
+    row, column = _footprint(lat, lon, resolution)
+    isVisible = row >= 0
+    rgba = np.zeros((pixels, pixels, 4), dtype=np.float32)
+    if not isVisible.any():
+        return rgba
+
+    rows = slice(row[isVisible].min(), row[isVisible].max() + 1)
+    columns = slice(column[isVisible].min(), column[isVisible].max() + 1)
+    row = np.where(isVisible, row - rows.start, 0)
+    column = np.where(isVisible, column - columns.start, 0)
+
+    valid = isVisible.copy()
+    for iChannel, band in enumerate(RGB_BANDS):
+        with span('stream', band=band, resolution=resolution):
+            blocks = stream_band(bandFiles.get(band, []), rows, columns,
+                                 resolution)
+        channel = np.where(isVisible, blocks[row, column],
+                           np.nan).astype(np.float32)
+        del blocks
+        valid &= np.isfinite(channel)
+        rgba[..., iChannel] = enhance(channel, gamma=gamma,
+                                      maxReflectance=maxReflectance)
+
+    rgba[~valid] = 0
+    rgba[..., 3] = valid
+
+    return rgba
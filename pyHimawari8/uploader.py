@@ -0,0 +1,180 @@
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from logger import logger
+from instrument import span
+
+
+class Uploader(object):
+    """
+    upload the images to Baidu Yun concurrently.
+
+    Uploads are submitted as soon as the images are written and run in a
+    bounded thread pool, so that they overlap with the rendering. Each remote
+    directory is created only once, and failed uploads are retried with
+    exponential backoff.
+
+    Parameters
+    ----------
+    clientFactory: callable
+        create the upload client with the `ByPy` interface, i.e., `mkdir` and
+        `upload` methods. Each thread has its own client.
+    remoteDir: str
+        remote root directory.
+    Keywords
+    --------
+    nThreads: int
+        number of upload threads (default: 4).
+    retries: int
+        number of retries of a failed upload (default: 3).
+    backoff: float
+        delay before the first retry, doubled for each retry (default: 2). [s]
+    cache: RenderCache
+        skip the images uploaded since they were rendered, and record the
+        new uploads (default: None).
+    Examples
+    --------
+    >>> with Uploader(ByPy, 'himawari8/') as uploader:
+    ...     uploader.submit(mTime, imgFile)
+
+    History
+    -------
+    2026-10-18 First version.
+    2026-10-18 Add `cache` keyword.
+    """
+
+    def __init__(self, clientFactory, remoteDir, *, nThreads=4, retries=3,
+                 backoff=2, cache=None):
+        self.clientFactory = clientFactory
+        self.remoteDir = remoteDir
+        self.retries = retries
+        self.backoff = backoff
+        self.cache = cache
+
+        self._executor = ThreadPoolExecutor(max_workers=max(nThreads, 1))
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._dirLocks = {}   # lock of each remote directory
+        self._createdDirs = set()
+        self._futures = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _client(self):
+        """
+        upload client of the current thread.
+        """
+
+        if not hasattr(self._local, 'client'):
+            self._local.client = self.clientFactory()
+
+        return self._local.client
+
+    def _retry(self, func, *args, check=True):
+        """
+        call the client method, retry it with backoff if it fails.
+
+        A non-zero return code (`ByPy` convention) is regarded as failure if
+        `check` is True.
+        """
+
+        for iTry in range(self.retries + 1):
+            try:
+                ret = func(*args)
+                if (not check) or (not ret):
+                    return ret
+                error = 'return code {0}'.format(ret)
+            except Exception as e:
+                error = e
+
+            if iTry < self.retries:
+                delay = self.backoff * 2 ** iTry
+                logger.warn('Failed in {0} {1}: {2}. Retry in {3}s.'.format(
+                    func.__name__, args[0], error, delay))
+                time.sleep(delay)
+
+        raise RuntimeError('{0} {1}: {2}'.format(
+            func.__name__, args[0], error))
+
+    def _ensure_dir(self, remoteDir):
+        """
+        create the remote directory once.
+        """
+
+        with self._lock:
+            if remoteDir in self._createdDirs:
+                return
+            dirLock = self._dirLocks.setdefault(remoteDir, threading.Lock())
+
+        with dirLock:
+            if remoteDir in self._createdDirs:
+                return
+            # existing directory returns an error code
+            self._retry(self._client().mkdir, remoteDir, check=False)
+            with self._lock:
+                self._createdDirs.add(remoteDir)
+
+    def _upload(self, file, remoteDir):
+        if (self.cache is not None) and self.cache.is_uploaded(file):
+            logger.info('{0} is already uploaded.'.format(file))
+            return file
+
+        with span('upload', imgFile=file):
+            self._ensure_dir(self.remoteDir)
+            self._ensure_dir(remoteDir)
+            logger.info('Upload to BDY: {0}'.format(file))
+            self._retry(self._client().upload, file, remoteDir)
+
+        if self.cache is not None:
+            self.cache.mark_uploaded(file)
+
+        return file
+
+    def submit(self, mTime, file):
+        """
+        submit the upload of the image to the daily directory.
+
+        Parameters
+        ----------
+        mTime: datetime
+            measurement time.
+        file: str
+            image file.
+        Returns
+        -------
+        future: Future
+        """
+
+        remoteDir = os.path.join(self.remoteDir, mTime.strftime('%Y%m%d'))
+        future = self._executor.submit(self._upload, file, remoteDir)
+        self._futures.append((file, future))
+
+        return future
+
+    def close(self):
+        """
+        wait for all the uploads to finish.
+
+        Returns
+        -------
+        failed: list
+            images failed to be uploaded.
+        """
+
+        failed = []
+        for file, future in self._futures:
+            try:
+                future.result()
+            except Exception as e:
+                logger.error('Failed in uploading {0}: {1}'.format(file, e))
+                failed.append(file)
+
+        self._futures = []
+        self._executor.shutdown(wait=True)
+
+        return failed
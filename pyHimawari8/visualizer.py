@@ -2,7 +2,9 @@ import os
 import fnmatch
 import datetime as dt
 import numpy as np
+import dask.array as da
 import matplotlib.pyplot as plt
+from matplotlib.colors import Normalize
 from cartopy.mpl.ticker import LongitudeFormatter, LatitudeFormatter
 import cartopy.crs as ccrs
 import cartopy.feature as cfeature
@@ -11,83 +13,414 @@ from satpy import Scene, find_files_and_readers
 from pyresample import create_area_def
 from logger import logger
 from colormap import chiljet_colormap
-from helper import parseTime
+from helper import parseTime, getROISlice, getCBSettings
+from render_cache import cached_render
+from borders import draw_borders
+from resample_cache import get_resample_lut, resample_nearest
+from hsd import roi_segments
+from instrument import span
+from tiles import render_tiles
+from quicklook import render_quicklook
+from truecolor import RGB_BANDS, GAMMA, true_color
+from timecube import TimeCube, cube_path
+from qa import QAFilter, qa_mask, qa_variable
+from lazy import MEMORY_LIMIT, open_l2, open_hsd, downsample, \
+    downsample_coords, compute
 
 plt.switch_backend('Agg')
 PROJECTDIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+UNITS = {'counts': '1', 'radiance': 'W m-2 sr-1 um-1', 'reflectance': '%',
+         'brightness_temperature': 'K'}
 
 
 class Visualizer(object):
 
+    _templates = {}   # figure templates of the batch mode
+
     def __init__(self, file, *,
-                 latRange=[20, 50], lonRange=[110, 130]):
+                 latRange=[20, 50], lonRange=[110, 130], memoryLimit=None):
         self.file = file
         self.latRange = latRange
         self.lonRange = lonRange
+        # load the variables lazily, chunk by chunk under the memory limit
+        self.memoryLimit = memoryLimit
+        self.variables = {}   # loaded variables
+        self.cube = None
         try:
-            self.fd = Dataset(file, 'r')
+            with span('open', file=file):
+                if os.path.isdir(file) and file.rstrip('/').endswith(
+                        '.zarr'):
+                    # time cube of the product
+                    self.fd = None
+                    self.cube = TimeCube(
+                        os.path.dirname(file.rstrip('/')),
+                        os.path.basename(file.rstrip('/'))[:-5], mode='r')
+                else:
+                    self.fd = Dataset(file, 'r')
         except Exception as e:
             raise e
 
+    @classmethod
+    def from_timecube(cls, storeDir, product, **kwargs):
+        """
+        visualizer of the time cube of the product, see `TimeCube`.
+
+        The frames are loaded by `load_data` and `load_variables` as from
+        the L2 file, without opening the L2 files.
+
+        Examples
+        --------
+        >>> vis = Visualizer.from_timecube(storeDir, 'CLP',
+        ...                                latRange=[20, 50])
+        >>> for mTime in tRange(tStart, tStop, timedelta=600):
+        ...     vis.load_data('CLTH', mTime)
+        ...     vis.colorplot('CLTH_{0:%H%M}.png'.format(mTime), vmin=0,
+        ...                   vmax=15)
+
+        History
+        -------
+        2026-10-18 First version.
+        """
+
+        return cls(cube_path(storeDir, product), **kwargs)
+
     def list_product(self):
         """
         list all the products in the file.
         """
 
+        if self.cube is not None:
+            longNames = {variable: self.cube.group[variable].attrs[
+                'long_name'] for variable in self.cube.variables}
+        else:
+            longNames = {variable: getattr(var, 'long_name')
+                         for variable, var in self.fd.variables.items()}
+
         count = 1
-        for variable in self.fd.variables.keys():
+        for variable in longNames.keys():
             logger.info('{0:2d}: {1:15s} {2}'.format(
                 count,
                 variable,
-                getattr(self.fd.variables[variable], 'long_name')))
+                longNames[variable]))
             count = count + 1
 
-    def load_data(self, product, mTime):
+    def load_data(self, product, mTime, *, qa=None):
         """
         load data to the workspace.
+
+        The pixels failing the QA filter `qa` are masked, see
+        `load_variables`.
+        """
+
+        self.load_variables([product], mTime, qa=qa)
+
+    def load_variables(self, products, mTime, *, qa=None):
         """
+        load several variables in one pass.
 
-        lat = self.fd['latitude'][:]
-        lon = self.fd['longitude'][:]
+        The variables share the file handle and the slices of the region of
+        interest. They are kept in `self.variables` by name, and the first one
+        is selected for plotting. With `memoryLimit`, they are lazy arrays,
+        read chunk by chunk when they are downsampled or plotted.
 
-        mask_lat = np.logical_and(lat >= self.latRange[0],
-                                  lat <= self.latRange[1])
-        mask_lon = np.logical_and(lon >= self.lonRange[0],
-                                  lon <= self.lonRange[1])
+        Parameters
+        ----------
+        products: list
+            variable names, e.g., ['CLTYPE', 'CLTH'].
+        mTime: datetime
+            measurement time.
+        Keywords
+        --------
+        qa: str or QAFilter
+            QA filter of the pixels, e.g., 'aot_confidence <= good and not
+            cloud', see `qa.FIELDS` (default: None). The QA flags of the
+            same region are decoded once per file, and the failing pixels
+            are masked (NaN for the lazy variables).
+        Examples
+        --------
+        >>> vis.load_variables(['CLTYPE', 'CLTH'], mTime)
+        >>> vis.variables['CLTH']['unit']
+        'km'
+        >>> vis.select('CLTH')
+        >>> vis.colorplot('CLTH.png', vmin=0, vmax=15)
+        >>> vis.load_variables(['AOT', 'AE'], mTime,
+        ...                    qa='aot_confidence <= good and not cloud')
 
-        self.data = self.fd.variables[product][:, mask_lon][mask_lat]
-        self.unit = getattr(self.fd.variables[product], 'units')
-        self.long_name = getattr(self.fd.variables[product], 'long_name')
+        History
+        -------
+        2026-10-18 First version.
+        2026-10-18 Lazy variables with `memoryLimit`.
+        2026-10-18 Load from the time cube.
+        2026-10-18 QA filter with `qa`.
+        """
 
-        self.lat = lat[mask_lat]
-        self.lon = lon[mask_lon]
+        if self.cube is not None:
+            self._load_cube(products, mTime, qa=qa)
+            return
+
+        if self.memoryLimit is not None:
+            arrays, self.lat, self.lon = open_l2(
+                self.fd, products, latRange=self.latRange,
+                lonRange=self.lonRange, memoryLimit=self.memoryLimit)
+            if qa is not None:
+                latSlice, lonSlice, _, _ = getROISlice(
+                    self.fd, self.latRange, self.lonRange)
+                mask = qa_mask(self.fd, qa, latSlice, lonSlice,
+                               key=self.file)
+            for product in products:
+                var = self.fd.variables[product]
+                if qa is not None:
+                    arrays[product] = da.where(
+                        da.from_array(mask, chunks=arrays[product].chunks),
+                        arrays[product], np.float32(np.nan))
+                self.variables[product] = {
+                    'data': arrays[product],
+                    'unit': getattr(var, 'units'),
+                    'long_name': getattr(var, 'long_name')}
+            self.mTime = mTime
+            self.select(products[0])
+            return
+
+        with span('subset', file=self.file, variables=list(products)):
+            latSlice, lonSlice, self.lat, self.lon = getROISlice(
+                self.fd, self.latRange, self.lonRange)
+            if qa is not None:
+                mask = qa_mask(self.fd, qa, latSlice, lonSlice,
+                               key=self.file)
+
+            for product in products:
+                var = self.fd.variables[product]
+
+                # read the region as a hyperslab
+                data = var[latSlice, lonSlice]
+                if qa is not None:
+                    data = np.ma.masked_array(
+                        data, mask=np.ma.getmaskarray(data) | ~mask)
+                self.variables[product] = {
+                    'data': data,
+                    'unit': getattr(var, 'units'),
+                    'long_name': getattr(var, 'long_name')}
 
         self.mTime = mTime
+        self.select(products[0])
 
-    def colorplot_with_RGB(self, imgFile, *args,
-                           axLatRange=[20, 60], axLonRange=[90, 140],
-                           cmap=None, pixels=100, **kwargs):
+    def _load_cube(self, products, mTime, *, qa=None):
+        """
+        load the frame of the variables at the measurement time from the
+        time cube. The QA filter needs the QA flags ingested in the cube.
+        """
+
+        with span('subset', file=self.file, variables=list(products)):
+            latSlice, lonSlice, self.lat, self.lon = getROISlice(
+                self.cube.group, self.latRange, self.lonRange)
+            data, times, _, _ = self.cube.load(
+                products, mTime, lazy=self.memoryLimit is not None)
+            if times[:1] != [mTime]:
+                raise ValueError('{0} is not in {1}.'.format(
+                    mTime, self.file))
+            if qa is not None:
+                qaVariable = qa_variable(self.cube.variables)
+                if qaVariable is None:
+                    raise ValueError('No QA flags in {0}'.format(self.file))
+                flags, _, _, _ = self.cube.load([qaVariable], mTime)
+                qa = qa if isinstance(qa, QAFilter) else QAFilter(qa)
+                mask = qa.mask(flags[qaVariable][0, latSlice, lonSlice],
+                               qaVariable)
+
+            for product in products:
+                frame = data[product][0, latSlice, lonSlice]
+                if qa is not None:
+                    frame = da.where(mask, frame, np.float32(np.nan)) \
+                        if self.memoryLimit is not None \
+                        else np.where(mask, frame, np.float32(np.nan))
+                attrs = self.cube.group[product].attrs
+                self.variables[product] = {
+                    'data': frame if self.memoryLimit is not None
+                    else np.ma.masked_invalid(frame),
+                    'unit': attrs['units'],
+                    'long_name': attrs['long_name']}
+
+        self.mTime = mTime
+        self.select(products[0])
+
+    def select(self, product):
         """
-        load RGB data.
+        select the loaded variable for plotting.
 
-        TODO:
-        Too time consuming in my local machine. (RAM > 10GB)
-        Wait till I get a better PC!
+        Parameters
+        ----------
+        product: str
+            variable name.
+
+        History
+        -------
+        2026-10-18 First version.
         """
 
-        pass
+        if product not in self.variables:
+            raise ValueError('{0} is not loaded.'.format(product))
 
-    def colorplot_with_band(self, band, HSD_Dir, imgFile, *args,
-                            axLatRange=[20, 60], axLonRange=[90, 140],
-                            cmap=None, pixels=100, **kwargs):
+        self.data = self.variables[product]['data']
+        self.unit = self.variables[product]['unit']
+        self.long_name = self.variables[product]['long_name']
+        self.product = product
+
+    def load_band(self, band, HSD_Dir, mTime, *, calibration=None, factor=1,
+                  segmentCache=None):
         """
-        colorplot the variables together with radiance data.
+        load the full disk of the HSD band lazily, e.g., the 500 m band 3.
+
+        The band is calibrated and downsampled chunk by chunk under
+        `memoryLimit` (default: 2 GB) when it's computed. It stays in the
+        satellite projection (lines, columns), so `self.lat` and `self.lon`
+        are None and it's rendered by `quicklook`.
 
         Parameters
         ----------
         band: int
-            band number [1-16]. See band specification in
-            `../doc/2018_A_Yamashita.md`
+            band number [1-16].
+        HSD_Dir: str
+            HSD directory.
+        mTime: datetime
+            observation start time.
+        Keywords
+        --------
+        calibration: str
+            'counts', 'radiance', 'reflectance' or 'brightness_temperature'
+            (default: reflectance for band 1-6, brightness temperature for
+            band 7-16).
+        factor: int
+            downsampling factor (default: 1).
+        segmentCache: SegmentCache
+            resolve the compressed segments through the cache
+            (default: None).
+        Examples
+        --------
+        >>> vis = Visualizer(file, memoryLimit=2 ** 30)
+        >>> vis.load_band(3, HSD_Dir, mTime, factor=8)
+        >>> vis.quicklook('B03_FLDK.png', vmin=0, vmax=100)
+
+        History
+        -------
+        2026-10-18 First version.
+        """
+
+        pattern = 'HS_H08_{0}_B{1:02d}_FLDK_R??_S??10.DAT*'.format(
+            mTime.strftime('%Y%m%d_%H%M'), band)
+        files = sorted(os.path.join(HSD_Dir, name)
+                       for name in fnmatch.filter(os.listdir(HSD_Dir),
+                                                  pattern))
+        if segmentCache is not None:
+            files = segmentCache.get_many(files)
+
+        if calibration is None:
+            calibration = 'reflectance' if band < 7 \
+                else 'brightness_temperature'
+
+        memoryLimit = self.memoryLimit or MEMORY_LIMIT
+        with span('open', band=band, segments=len(files)):
+            array, self.segments = open_hsd(
+                files, calibration=calibration, factor=factor,
+                memoryLimit=memoryLimit)
+
+        self.variables['B{0:02d}'.format(band)] = {
+            'data': downsample(array, factor),
+            'unit': UNITS[calibration],
+            'long_name': 'band {0}'.format(band)}
+        self.lat = None
+        self.lon = None
+        self.mTime = mTime
+        self.select('B{0:02d}'.format(band))
+
+    def downsample(self, factor, *, method=None):
+        """
+        downsample the loaded variables and their grid by an integer factor.
+
+        Lazy variables stay lazy, so the full resolution is never held in
+        memory.
+
+        Parameters
+        ----------
+        factor: int
+            downsampling factor.
+        Keywords
+        --------
+        method: str
+            'mean' or 'nearest' (default: 'nearest' for CLTYPE, 'mean' for
+            the others).
+        Examples
+        --------
+        >>> vis = Visualizer(file, latRange=[-60, 60], lonRange=[80, 200],
+        ...                  memoryLimit=2 ** 30)
+        >>> vis.load_variables(['CLTYPE', 'CLTH'], mTime)
+        >>> vis.downsample(4)
+        >>> vis.quicklook('CLTYPE.png')
+
+        History
+        -------
+        2026-10-18 First version.
+        2026-10-18 Mask in place.
+        """
+
+        for product, variable in self.variables.items():
+            data = variable['data']
+            thisMethod = method or ('nearest' if product == 'CLTYPE'
+                                    else 'mean')
+            if isinstance(data, da.Array):
+                variable['data'] = downsample(data, factor,
+                                              method=thisMethod)
+            else:
+                data = np.ma.filled(np.ma.asarray(data, dtype=np.float32),
+                                    np.nan)
+                variable['data'] = np.ma.masked_invalid(downsample(
+                    da.from_array(data, chunks=data.shape), factor,
+                    method=thisMethod).compute(scheduler='sync'),
+                    copy=False)
+
+        # centers of the blocks
+        if self.lat is not None:
+            self.lat = downsample_coords(self.lat, factor)
+            self.lon = downsample_coords(self.lon, factor)
+
+        self.select(self.product)
+
+    def compute(self):
+        """
+        compute the lazy variables under the memory limit, e.g., before
+        plotting. The computed arrays are masked in place, not copied.
+
+        History
+        -------
+        2026-10-18 First version.
+        2026-10-18 Mask in place.
+        """
+
+        lazy = [variable for variable in self.variables.values()
+                if isinstance(variable['data'], da.Array)]
+        for variable in lazy:
+            variable['data'] = np.ma.masked_invalid(compute(
+                variable['data'],
+                memoryLimit=self.memoryLimit or MEMORY_LIMIT), copy=False)
+
+        if lazy:
+            self.select(self.product)
+
+    @cached_render('HSD_Dir', exclude=('batch', 'index', 'animation'))
+    def colorplot_with_RGB(self, HSD_Dir, imgFile, *args,
+                           axLatRange=[20, 60], axLonRange=[90, 140],
+                           cmap=None, pixels=100, resolution=None,
+                           gamma=GAMMA, batch=False, index=None,
+                           animation=None, **kwargs):
+        """
+        colorplot the variables over the true-color image.
+
+        The image is composited from band 3, 2 and 1 (red, green and blue),
+        streamed segment by segment and block-averaged to the image pixel
+        size while reading, so the memory depends on `pixels`, not on the
+        full disk.
+
+        Parameters
+        ----------
         HSD_Dir: str
             path for hosting the HSD files.
         imgFile: str
@@ -101,48 +434,125 @@ class Visualizer(object):
         cmap: str
             colormap name.
         pixels: int
-            resampled pixels of the band data (default: 100). Take care of
-            time consumption when pixels > 1000!
+            pixels of each side of the true-color image (default: 100).
+        resolution: int
+            block size of the band averaging (default: the image pixel size
+            at the sub-satellite point). [km]
+        gamma: float
+            gamma of the true-color enhancement (default: 2.2).
+        batch: bool
+            reuse the basemap, axes and colorbar of the previous frames with
+            the same extent, colormap and colorbar range (default: False).
+            Call `Visualizer.close_templates` after the batch.
+        index: ProductIndex
+            find the HSD segments from the directory index instead of
+            scanning `HSD_Dir` (default: None).
+        animation: Animation
+            add the image as a new frame of the animation (default: None).
+        cache: RenderCache
+            skip rendering if the image is up to date with the data file,
+            the HSD directory and the plotting parameters (default: None).
+        Examples
+        --------
+        >>> vis.load_data('CLTH', mTime)
+        >>> vis.colorplot_with_RGB(HSD_Dir, 'CLTH_RGB.png', vmin=0, vmax=15,
+        ...                        pixels=1000)
+
         History
         -------
         2020-02-24 First version.
+        2026-10-18 Stream the true-color image in bounded memory.
+        """
+
+        self.compute()
+
+        # only the segments covering the plot region
+        segments = roi_segments(axLatRange, axLonRange)
+        if len(segments) == 0:
+            raise ValueError('The plot region is outside the full disk.')
+
+        bandFiles = {}
+        for band in RGB_BANDS:
+            if index is not None:
+                bandFiles[band] = index.find_hsd(HSD_Dir, self.mTime, band,
+                                                 segments=segments)
+            else:
+                pattern = 'HS_H08_{0}_B{1:02d}_FLDK_R??_S{{0:02d}}10.DAT*'
+                pattern = pattern.format(
+                    self.mTime.strftime('%Y%m%d_%H%M'), band)
+                bandFiles[band] = sorted(
+                    os.path.join(HSD_Dir, name)
+                    for segment in segments
+                    for name in fnmatch.filter(os.listdir(HSD_Dir),
+                                               pattern.format(segment)))
+
+        with span('true_color', pixels=pixels):
+            rgba = true_color(bandFiles, axLatRange, axLonRange, pixels,
+                              resolution=resolution, gamma=gamma)
+
+        with span('draw', product=self.product):
+            LON, LAT = np.meshgrid(self.lon, self.lat)
+
+            # loading colormap
+            if cmap is None:
+                cmap = chiljet_colormap()
+
+            template = self._template(axLatRange, axLonRange, cmap,
+                                      kwargs['vmin'], kwargs['vmax'],
+                                      batch=batch)
+            ax1 = template['ax']
+
+            pcmesh_rgb = ax1.imshow(rgba, origin='upper',
+                                    extent=[axLonRange[0], axLonRange[1],
+                                            axLatRange[0], axLatRange[1]],
+                                    transform=ccrs.PlateCarree())
+            pcmesh = ax1.pcolormesh(
+                                    LON, LAT, self.data,
+                                    vmin=kwargs['vmin'],
+                                    vmax=kwargs['vmax'],
+                                    cmap=cmap,
+                                    transform=ccrs.PlateCarree())
+
+        self._export(template, [pcmesh_rgb, pcmesh], imgFile,
+                     batch=batch, animation=animation, **kwargs)
+
+    @classmethod
+    def close_templates(cls):
+        """
+        close all the figure templates of the batch mode.
+        """
+
+        for template in cls._templates.values():
+            plt.close(template['fig'])
+
+        cls._templates.clear()
+
+    def _template(self, axLatRange, axLonRange, cmap, vmin, vmax, *,
+                  batch=False):
         """
+        get the figure template with basemap, axes and colorbar.
+
+        In batch mode, the template is created once per (extent, cmap, norm)
+        and reused by the following frames. Otherwise, a new template is
+        created for each plot.
+
+        Returns
+        -------
+        template: dict
+            'fig', 'ax', 'cbar' and 'artists' (data artists of last frame).
+
+        History
+        -------
+        2026-10-18 First version.
+        """
+
+        key = (tuple(axLatRange), tuple(axLonRange),
+               getattr(cmap, 'name', cmap), getattr(cmap, 'N', None),
+               vmin, vmax)
+
+        if batch and (key in self._templates):
+            return self._templates[key]
 
-        files = find_files_and_readers(
-            start_time=(self.mTime - dt.timedelta(seconds=300)),
-            end_time=(self.mTime + dt.timedelta(seconds=300)),
-            base_dir=HSD_Dir,
-            reader='ahi_hsd'
-        )
-
-        matched_files = []
-        for file in files['ahi_hsd']:
-            if fnmatch.fnmatch(os.path.basename(file),
-               'HS_H08_*_B{0:02d}_FLDK_*_S0[1234]*DAT*'.format(band)):
-                matched_files.append(file)
-
-        h8_scene = Scene(filenames=matched_files,
-                         reader='ahi_hsd', sensor='ahi')
-        band_label = 'B{0:02d}'.format(band)
-        h8_scene.load([band_label])
-
-        roi = create_area_def('roi',
-                              {'proj': 'eqc', 'ellps': 'WGS84'},
-                              width=pixels, height=pixels,
-                              area_extent=[axLonRange[0], axLatRange[0],
-                                           axLonRange[1], axLatRange[1]],
-                              units='degrees')
-        roi_scene = h8_scene.resample(roi)
-
-        # read China boundaries
-        with open(os.path.join(PROJECTDIR,
-                  'include', 'CN-border-La.dat'), 'r') as fd:
-            context = fd.read()
-            blocks = [cnt for cnt in context.split('>') if len(cnt) > 0]
-            borders = [
-                np.fromstring(block, dtype=float, sep=' ') for block in blocks]
-
-        LON, LAT = np.meshgrid(self.lon, self.lat)
         fig = plt.figure(figsize=[8, 8])
         plt.tight_layout(False)
 
@@ -156,25 +566,8 @@ class Visualizer(object):
         ax1.add_feature(cfeature.LAKES.with_scale('50m'))
 
         # Plot border lines
-        for line in borders:
-            ax1.plot(line[0::2], line[1::2], '-', lw=1, color='k',
-                     transform=ccrs.Geodetic())
-
-        # loading colormap
-        if cmap is None:
-            cmap = chiljet_colormap()
-
-        # Plot gridlines
-        crs = roi.to_cartopy_crs()
-        pcmesh_band = ax1.imshow(roi_scene[band_label],
-                                 transform=crs, origin='upper',
-                                 extent=crs.bounds, cmap='Greys')
-        pcmesh = ax1.pcolormesh(
-                                LON, LAT, self.data,
-                                vmin=kwargs['vmin'],
-                                vmax=kwargs['vmax'],
-                                cmap=cmap,
-                                transform=ccrs.PlateCarree())
+        draw_borders(ax1, axLonRange, axLatRange, lw=1, color='k',
+                     transform=ccrs.PlateCarree())
 
         ax1.set_xticks(
             np.linspace(axLonRange[0], axLonRange[1], 5, endpoint=True))
@@ -190,6 +583,44 @@ class Visualizer(object):
         ax1.set_ylim(axLatRange)
         ax1.set_xlim(axLonRange)
 
+        # colorbar is independent of the data artists
+        mappable = plt.cm.ScalarMappable(
+            norm=Normalize(vmin=vmin, vmax=vmax), cmap=cmap)
+        mappable.set_array([])
+        cbar = fig.colorbar(
+            mappable,
+            ax=ax1,
+            fraction=0.03,
+            orientation='vertical'
+            )
+        cbar.ax.tick_params(direction='out', labelsize=15, pad=5)
+
+        template = {'fig': fig, 'ax': ax1, 'cbar': cbar, 'artists': [],
+                    'axLatRange': axLatRange, 'axLonRange': axLonRange}
+
+        if batch:
+            self._templates[key] = template
+
+        return template
+
+    def _export(self, template, artists, imgFile, *, batch=False,
+                animation=None, **kwargs):
+        """
+        update the title and colorbar labels of the frame and save it, and
+        add it to the animation if given.
+        """
+
+        fig, ax1, cbar = template['fig'], template['ax'], template['cbar']
+
+        # remove the data of the previous frame
+        for artist in template['artists']:
+            artist.remove()
+        template['artists'] = artists
+
+        # drawing data may reset the extent
+        ax1.set_ylim(template['axLatRange'])
+        ax1.set_xlim(template['axLonRange'])
+
         ax1.set_title('{0} {1}'.format(
             self.mTime.strftime('%Y-%m-%d %H:%M (Himawari-8)'),
             self.long_name))
@@ -198,13 +629,7 @@ class Visualizer(object):
             kwargs['cb_ticks'] = np.linspace(
                 kwargs['vmin'], kwargs['vmax'], 5, endpoint=True)
 
-        cbar = fig.colorbar(
-            pcmesh,
-            fraction=0.03,
-            ticks=kwargs['cb_ticks'],
-            orientation='vertical'
-            )
-        cbar.ax.tick_params(direction='out', labelsize=15, pad=5)
+        cbar.set_ticks(kwargs['cb_ticks'])
         cbar.ax.set_title(self.unit, fontsize=10)
 
         if 'cb_ticklabels' in kwargs.keys():
@@ -212,12 +637,160 @@ class Visualizer(object):
 
         # Show figure
         # plt.show()
-        plt.savefig(imgFile)
-        plt.close()
+        # the artists are rasterized by savefig
+        with span('encode', imgFile=imgFile):
+            fig.savefig(imgFile)
+
+        if not batch:
+            plt.close(fig)
+
+        if animation is not None:
+            animation.add_frame(self.mTime, imgFile)
+
+    @cached_render('HSD_Dir', exclude=('batch', 'lutDir', 'segmentCache',
+                                       'index', 'animation'))
+    def colorplot_with_band(self, band, HSD_Dir, imgFile, *args,
+                            axLatRange=[20, 60], axLonRange=[90, 140],
+                            cmap=None, pixels=100, batch=False,
+                            radius=None, lutDir=None, segmentCache=None,
+                            index=None, animation=None, **kwargs):
+        """
+        colorplot the variables together with radiance data.
 
+        Parameters
+        ----------
+        band: int
+            band number [1-16]. See band specification in
+            `../doc/2018_A_Yamashita.md`
+        HSD_Dir: str
+            path for hosting the HSD files.
+        imgFile: str
+            filename of the exported image
+        Keywords
+        --------
+        axLatRange: list
+            latitude range of the plot (default: [20, 60]). [degree]
+        axLonRange: list
+            longitude range of the plot (default: [90, 140]). [degree]
+        cmap: str
+            colormap name.
+        pixels: int
+            resampled pixels of the band data (default: 100). Take care of
+            time consumption when pixels > 1000!
+        batch: bool
+            reuse the basemap, axes and colorbar of the previous frames with
+            the same extent, colormap and colorbar range (default: False).
+            Call `Visualizer.close_templates` after the batch.
+        radius: float
+            radius of influence for the nearest neighbour resampling
+            (default: 3 times of the band pixel size). [m]
+        lutDir: str
+            directory for persisting the resampling lookup tables, which are
+            reused as long as the band area and the plot area are unchanged
+            (default: None, kept in memory only).
+        segmentCache: SegmentCache
+            decompress the '.DAT.bz2' segments once into the local cache
+            and read them from there (default: None).
+        index: ProductIndex
+            find the HSD segments from the directory index instead of
+            scanning `HSD_Dir` (default: None).
+        animation: Animation
+            add the image as a new frame of the animation (default: None).
+        cache: RenderCache
+            skip rendering if the image is up to date with the data file,
+            the HSD directory and the plotting parameters (default: None).
+        History
+        -------
+        2020-02-24 First version.
+        2026-10-18 Add `cache` and `batch` keywords.
+        2026-10-18 Resample with cached lookup tables.
+        2026-10-18 Select HSD segments by the plot region.
+        2026-10-18 Add `segmentCache` keyword.
+        2026-10-18 Add `index` keyword.
+        2026-10-18 Add `animation` keyword.
+        """
+
+        self.compute()
+
+        with span('scene_load', band=band):
+            # only the segments covering the plot region
+            segments = roi_segments(axLatRange, axLonRange)
+            if len(segments) == 0:
+                raise ValueError('The plot region is outside the full disk.')
+            logger.info('Select HSD segments {0} for B{1:02d}.'.format(
+                segments, band))
+
+            if index is not None:
+                matched_files = index.find_hsd(HSD_Dir, self.mTime, band,
+                                               segments=segments)
+            else:
+                files = find_files_and_readers(
+                    start_time=(self.mTime - dt.timedelta(seconds=300)),
+                    end_time=(self.mTime + dt.timedelta(seconds=300)),
+                    base_dir=HSD_Dir,
+                    reader='ahi_hsd'
+                )
+
+                matched_files = []
+                for file in files['ahi_hsd']:
+                    for segment in segments:
+                        pattern = 'HS_H08_*_B{0:02d}_FLDK_*_S{1:02d}*DAT*'
+                        if fnmatch.fnmatch(os.path.basename(file),
+                                           pattern.format(band, segment)):
+                            matched_files.append(file)
+
+            if segmentCache is not None:
+                matched_files = segmentCache.get_many(matched_files)
+
+            h8_scene = Scene(filenames=matched_files,
+                             reader='ahi_hsd', sensor='ahi')
+            band_label = 'B{0:02d}'.format(band)
+            h8_scene.load([band_label])
+
+        # the band data are read from the segments by the resampling
+        with span('resample', band=band, pixels=pixels):
+            roi = create_area_def('roi',
+                                  {'proj': 'eqc', 'ellps': 'WGS84'},
+                                  width=pixels, height=pixels,
+                                  area_extent=[axLonRange[0], axLatRange[0],
+                                               axLonRange[1], axLatRange[1]],
+                                  units='degrees')
+            band_data = h8_scene[band_label]
+            lut = get_resample_lut(band_data.attrs['area'], roi,
+                                   radius=radius, cacheDir=lutDir)
+            roi_band = resample_nearest(band_data.values, lut, roi.shape)
+
+        with span('draw', product=self.product):
+            LON, LAT = np.meshgrid(self.lon, self.lat)
+
+            # loading colormap
+            if cmap is None:
+                cmap = chiljet_colormap()
+
+            template = self._template(axLatRange, axLonRange, cmap,
+                                      kwargs['vmin'], kwargs['vmax'],
+                                      batch=batch)
+            ax1 = template['ax']
+
+            # Plot gridlines
+            crs = roi.to_cartopy_crs()
+            pcmesh_band = ax1.imshow(roi_band,
+                                     transform=crs, origin='upper',
+                                     extent=crs.bounds, cmap='Greys')
+            pcmesh = ax1.pcolormesh(
+                                    LON, LAT, self.data,
+                                    vmin=kwargs['vmin'],
+                                    vmax=kwargs['vmax'],
+                                    cmap=cmap,
+                                    transform=ccrs.PlateCarree())
+
+        self._export(template, [pcmesh_band, pcmesh], imgFile,
+                     batch=batch, animation=animation, **kwargs)
+
+    @cached_render(exclude=('batch', 'animation'))
     def colorplot(self, imgFile, *args,
                   axLatRange=[20, 60], axLonRange=[90, 140], cmap=None,
-                  **kwargs):
+                  batch=False, animation=None, **kwargs):
         """
         colorplot the variables.
 
@@ -233,84 +806,138 @@ class Visualizer(object):
             longitude range of the plot (default: [90, 140]). [degree]
         cmap: str
             colormap name.
+        batch: bool
+            reuse the basemap, axes and colorbar of the previous frames with
+            the same extent, colormap and colorbar range (default: False).
+            Call `Visualizer.close_templates` after the batch.
+        animation: Animation
+            add the image as a new frame of the animation (default: None).
+        cache: RenderCache
+            skip rendering if the image is up to date with the data file and
+            the plotting parameters (default: None).
+        Examples
+        --------
+        >>> anim = Animation('animation/CLTH')
+        >>> for mTime in timeList:
+        ...     vis = Visualizer(getH8ProdFile(mTime, 'CLP'))
+        ...     vis.load_data('CLTH', mTime)
+        ...     vis.colorplot(imgFile, vmin=0, vmax=15, batch=True,
+        ...                   animation=anim)
+        >>> anim.write_gif('CLTH_24h.gif')
         History
         -------
         2020-02-24 First version.
+        2026-10-18 Add `cache` and `batch` keywords.
+        2026-10-18 Add `animation` keyword.
         """
 
-        # read China boundaries
-        with open(os.path.join(PROJECTDIR,
-                  'include', 'CN-border-La.dat'), 'r') as fd:
-            context = fd.read()
-            blocks = [cnt for cnt in context.split('>') if len(cnt) > 0]
-            borders = [
-                np.fromstring(block, dtype=float, sep=' ') for block in blocks]
+        self.compute()
 
-        LON, LAT = np.meshgrid(self.lon, self.lat)
-        fig = plt.figure(figsize=[8, 8])
-        plt.tight_layout(False)
+        with span('draw', product=self.product):
+            LON, LAT = np.meshgrid(self.lon, self.lat)
 
-        # Set projection and plot the main figure
-        ax1 = plt.axes([0.1, 0.1, 0.8, 0.8], projection=ccrs.PlateCarree())
+            # loading colormap
+            if cmap is None:
+                cmap = chiljet_colormap()
 
-        # Add ocean, land, rivers and lakes
-        ax1.add_feature(cfeature.OCEAN.with_scale('50m'))
-        ax1.add_feature(cfeature.LAND.with_scale('50m'))
-        ax1.add_feature(cfeature.RIVERS.with_scale('50m'))
-        ax1.add_feature(cfeature.LAKES.with_scale('50m'))
+            template = self._template(axLatRange, axLonRange, cmap,
+                                      kwargs['vmin'], kwargs['vmax'],
+                                      batch=batch)
+            ax1 = template['ax']
 
-        # Plot border lines
-        for line in borders:
-            ax1.plot(line[0::2], line[1::2], '-', lw=1, color='k',
-                     transform=ccrs.Geodetic())
-
-        # loading colormap
-        if cmap is None:
-            cmap = chiljet_colormap()
-
-        # Plot gridlines
-        pcmesh = ax1.pcolormesh(
-            LON, LAT, self.data,
-            vmin=kwargs['vmin'],
-            vmax=kwargs['vmax'],
-            transform=ccrs.PlateCarree(),
-            cmap=cmap)
+            # Plot gridlines
+            pcmesh = ax1.pcolormesh(
+                LON, LAT, self.data,
+                vmin=kwargs['vmin'],
+                vmax=kwargs['vmax'],
+                transform=ccrs.PlateCarree(),
+                cmap=cmap)
 
-        ax1.set_xticks(
-            np.linspace(axLonRange[0], axLonRange[1], 5, endpoint=True))
-        ax1.set_yticks(
-            np.linspace(axLatRange[0], axLatRange[1], 5, endpoint=True))
-        lon_formatter = LongitudeFormatter(number_format='.1f',
-                                           degree_symbol='',
-                                           dateline_direction_label=True)
-        lat_formatter = LatitudeFormatter(number_format='.1f',
-                                          degree_symbol='')
-        ax1.xaxis.set_major_formatter(lon_formatter)
-        ax1.yaxis.set_major_formatter(lat_formatter)
-        ax1.set_ylim(axLatRange)
-        ax1.set_xlim(axLonRange)
+        self._export(template, [pcmesh], imgFile, batch=batch,
+                     animation=animation, **kwargs)
 
-        ax1.set_title('{0} {1}'.format(
-            self.mTime.strftime('%Y-%m-%d %H:%M (Himawari-8)'),
-            self.long_name))
+    def export_tiles(self, outDir, *, vmin, vmax, cmap=None,
+                     zooms=range(0, 7), nWorkers=None):
+        """
+        export the selected variable as an XYZ tile pyramid for web maps.
 
-        if 'cb_ticks' not in kwargs.keys():
-            kwargs['cb_ticks'] = np.linspace(
-                kwargs['vmin'], kwargs['vmax'], 5, endpoint=True)
+        Parameters
+        ----------
+        outDir: str
+            root directory of the pyramid, `outDir/{z}/{x}/{y}.png`.
+        Keywords
+        --------
+        vmin: float
+        vmax: float
+        cmap: str or Colormap
+            colormap (default: chiljet).
+        zooms: list
+            zoom levels (default: 0 to 6).
+        nWorkers: int
+            number of worker processes (default: number of CPUs).
+        Returns
+        -------
+        counts: dict
+            number of 'written', 'skipped' (unchanged) and 'empty' tiles.
+        Examples
+        --------
+        >>> vis = Visualizer(file, latRange=[-90, 90], lonRange=[0, 360])
+        >>> vis.load_data('CLTH', mTime)
+        >>> vis.export_tiles('tiles/CLTH', vmin=0, vmax=15)
 
-        cbar = fig.colorbar(
-            pcmesh,
-            fraction=0.03,
-            ticks=kwargs['cb_ticks'],
-            orientation='vertical'
-            )
-        cbar.ax.tick_params(direction='out', labelsize=15, pad=5)
-        cbar.ax.set_title(self.unit, fontsize=10)
+        History
+        -------
+        2026-10-18 First version.
+        """
 
-        if 'cb_ticklabels' in kwargs.keys():
-            cbar.ax.set_yticklabels(kwargs['cb_ticklabels'])
+        self.compute()
 
-        # Show figure
-        # plt.show()
-        plt.savefig(imgFile)
-        plt.close()
+        return render_tiles(self.data, self.lat, self.lon, outDir,
+                            vmin=vmin, vmax=vmax, cmap=cmap, zooms=zooms,
+                            nWorkers=nWorkers)
+
+    def quicklook(self, imgFile, *, vmin=None, vmax=None, cmap=None,
+                  borders=True):
+        """
+        render the selected variable to a quick-look PNG without matplotlib,
+        one pixel per grid cell.
+
+        CLTYPE is colorized by class index, with the colors of its colorbar.
+
+        Parameters
+        ----------
+        imgFile: str
+            filename of the exported image.
+        Keywords
+        --------
+        vmin: float
+        vmax: float
+        cmap: str
+            colormap name (default: 'chiljet', or 'target_classification'
+            for CLTYPE).
+        borders: bool
+            burn in the borders (default: True).
+        Examples
+        --------
+        >>> vis.load_data('CLTH', mTime)
+        >>> vis.quicklook('CLTH.png', vmin=0, vmax=15)
+
+        History
+        -------
+        2026-10-18 First version.
+        """
+
+        self.compute()
+
+        nClasses = None
+        if self.product == 'CLTYPE':
+            cbRange, cbTicks, _ = getCBSettings('CLTYPE')
+            nClasses = len(cbTicks)
+            vmin = cbRange[0] if vmin is None else vmin
+            vmax = cbRange[1] if vmax is None else vmax
+            cmap = 'target_classification' if cmap is None else cmap
+
+        return render_quicklook(self.data, self.lat, self.lon, imgFile,
+                                vmin=vmin, vmax=vmax,
+                                cmap='chiljet' if cmap is None else cmap,
+                                nClasses=nClasses, borders=borders)
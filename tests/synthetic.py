@@ -0,0 +1,87 @@
+import contextlib
+from unittest import mock
+import numpy as np
+from netCDF4 import Dataset
+
+# 1-degree grid of the synthetic L2 files
+LAT = np.linspace(60, -60, 121)
+LON = np.linspace(80, 200, 121)
+
+# (dtype, fill value, units, long_name) of the L2 variables, the default
+# fill value of netCDF if None
+VARIABLES = {
+    'CLTH': ('f4', -999, 'km', 'Cloud Top Height'),
+    'CLTYPE': ('i1', -1, 'none', 'Cloud Type'),
+    'QA': ('i2', None, 'none', 'QA'),
+    'AOT': ('f4', -999, 'none', 'Aerosol Optical Thickness'),
+    'AE': ('f4', -999, 'none', 'Angstrom Exponent'),
+    'QA_flag': ('i2', None, 'none', 'QA flag')}
+
+
+def write_l2(file, variables, *, masks=None, lat=LAT, lon=LON):
+    """
+    write a synthetic L2 file on the lat/lon grid.
+
+    Parameters
+    ----------
+    file: str
+        output filename.
+    variables: dict
+        data of each variable, e.g., {'CLTH': data}. (lat, lon)
+    Keywords
+    --------
+    masks: dict
+        masked pixels of the variables (default: None).
+    lat: ndarray
+        latitude of the grid (default: 60N to 60S by 1 degree).
+    lon: ndarray
+        longitude of the grid (default: 80E to 200E by 1 degree).
+    Returns
+    -------
+    file: str
+    """
+
+    masks = {} if masks is None else masks
+
+    with Dataset(file, 'w') as fd:
+        fd.createDimension('latitude', len(lat))
+        fd.createDimension('longitude', len(lon))
+        fd.createVariable('latitude', 'f4', ('latitude',))[:] = lat
+        fd.createVariable('longitude', 'f4', ('longitude',))[:] = lon
+
+        for name, data in variables.items():
+            dtype, fillValue, units, longName = VARIABLES.get(
+                name, ('f4', -999, 'none', name))
+            var = fd.createVariable(name, dtype, ('latitude', 'longitude'),
+                                    fill_value=fillValue)
+            var.units = units
+            var.long_name = longName
+
+            data = np.ma.asarray(data)
+            if name in masks:
+                data = np.ma.masked_array(
+                    data, mask=np.ma.getmaskarray(data) | masks[name])
+            var[:] = data
+
+    return file
+
+
+@contextlib.contextmanager
+def offline_basemap():
+    """
+    plot without the Natural Earth features, which would be downloaded, and
+    the figure layout, which isn't under test.
+    """
+
+    import matplotlib.pyplot as plt
+    import cartopy.crs as ccrs
+    import cartopy.feature as cfeature
+
+    features = mock.Mock()
+    features.with_scale.return_value = cfeature.ShapelyFeature(
+        [], ccrs.PlateCarree())
+
+    with mock.patch.multiple(cfeature, OCEAN=features, LAND=features,
+                             RIVERS=features, LAKES=features), \
+            mock.patch.object(plt, 'tight_layout'):
+        yield
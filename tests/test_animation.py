@@ -0,0 +1,147 @@
+import sys
+import os
+import shutil
+import tempfile
+import datetime as dt
+import unittest
+import numpy as np
+from PIL import Image
+
+projectDir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(projectDir, 'pyHimawari8'))
+
+from animation import Animation
+
+
+class Test(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(self):
+        print('Start to test animation.py...')
+
+    @classmethod
+    def tearDownClass(self):
+        print('Finish testing animation.py!')
+
+    def setUp(self):
+        self.tmpDir = tempfile.mkdtemp()
+        self.frameDir = os.path.join(self.tmpDir, 'frames')
+        self.mTime = dt.datetime(2020, 2, 19, 0, 0)
+        self.colors = [(255, 0, 0), (0, 255, 0), (0, 0, 255), (255, 255, 0)]
+
+        self.imgFiles = []
+        for iFrame, color in enumerate(self.colors):
+            data = np.zeros((40, 60, 3), dtype=np.uint8)
+            data[:] = color
+            data[10:20, 10:20] = 255 - np.array(color)
+            imgFile = os.path.join(self.tmpDir, 'img_{0}.png'.format(iFrame))
+            Image.fromarray(data).save(imgFile)
+            self.imgFiles.append(imgFile)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpDir)
+
+    def test_gif(self):
+        print('---> Test on incremental GIF')
+
+        anim = Animation(self.frameDir, window=dt.timedelta(hours=1),
+                         delay=200)
+        for iFrame in range(3):
+            self.assertTrue(anim.add_frame(
+                self.mTime + dt.timedelta(minutes=30 * iFrame),
+                self.imgFiles[iFrame]))
+
+        # all the frames are in the 1 hour window
+        self.assertEqual(len(anim.frames), 3)
+        gifFile = anim.write_gif(os.path.join(self.tmpDir, 'anim.gif'))
+
+        with Image.open(gifFile) as image:
+            self.assertEqual(image.n_frames, 3)
+            self.assertEqual(image.size, (60, 40))
+            for iFrame in range(3):
+                image.seek(iFrame)
+                self.assertEqual(image.info['duration'], 200)
+                rgb = image.convert('RGB')
+                self.assertEqual(rgb.getpixel((50, 30)), self.colors[iFrame])
+                self.assertEqual(rgb.getpixel((15, 15)), tuple(
+                    255 - value for value in self.colors[iFrame]))
+
+        # unchanged frames are not encoded again
+        frameFile = os.path.join(self.frameDir, anim.frames[0]['gif'])
+        os.utime(frameFile, (0, 0))
+        anim = Animation(self.frameDir, window=dt.timedelta(hours=1))
+        self.assertFalse(anim.add_frame(self.mTime, self.imgFiles[0]))
+        self.assertEqual(os.path.getmtime(frameFile), 0)
+
+        # rolling window
+        self.assertTrue(anim.add_frame(
+            self.mTime + dt.timedelta(minutes=90), self.imgFiles[3]))
+        self.assertEqual(len(anim.frames), 3)
+        self.assertFalse(os.path.exists(frameFile))
+        self.assertEqual(
+            len([name for name in os.listdir(self.frameDir)
+                 if name.endswith('.gif')]), 3)
+
+        with Image.open(anim.write_gif(gifFile)) as image:
+            self.assertEqual(image.n_frames, 3)
+            image.seek(2)
+            self.assertEqual(image.convert('RGB').getpixel((50, 30)),
+                             self.colors[3])
+
+    def test_missing_gif(self):
+        print('---> Test on GIF of the frames added without GIF')
+
+        anim = Animation(self.frameDir, formats=())
+        for iFrame in range(2):
+            anim.add_frame(self.mTime + dt.timedelta(minutes=10 * iFrame),
+                           self.imgFiles[iFrame])
+        self.assertEqual([frame['gif'] for frame in anim.frames],
+                         [None, None])
+
+        # encoded from the images
+        gifFile = anim.write_gif(os.path.join(self.tmpDir, 'anim.gif'))
+        with Image.open(gifFile) as image:
+            self.assertEqual(image.n_frames, 2)
+            image.seek(1)
+            self.assertEqual(image.convert('RGB').getpixel((50, 30)),
+                             self.colors[1])
+        anim = Animation(self.frameDir, formats=())
+        self.assertTrue(all(frame['gif'] for frame in anim.frames))
+
+        # the image of the frame has changed
+        anim.add_frame(self.mTime + dt.timedelta(minutes=20),
+                       self.imgFiles[2])
+        os.remove(self.imgFiles[2])
+        with self.assertRaises(ValueError):
+            anim.write_gif(gifFile)
+
+    @unittest.skipIf(shutil.which('ffmpeg') is None, 'ffmpeg is not found')
+    def test_mp4(self):
+        print('---> Test on MP4 by concatenating segments')
+
+        anim = Animation(self.frameDir, formats=('gif', 'mp4'))
+        for iFrame in range(2):
+            anim.add_frame(self.mTime + dt.timedelta(minutes=10 * iFrame),
+                           self.imgFiles[iFrame])
+
+        mp4File = anim.write_mp4(os.path.join(self.tmpDir, 'anim.mp4'))
+        self.assertGreater(os.path.getsize(mp4File), 0)
+
+
+def main():
+
+    suite = unittest.TestSuite()
+
+    tests = [
+        Test('test_gif'),
+        Test('test_missing_gif'),
+        Test('test_mp4')
+        ]   # setup the test list
+    suite.addTests(tests)
+
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+import sys
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+
+projectDir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(projectDir, 'pyHimawari8'))
+
+from borders import parse_borders, load_borders, clip_borders
+
+
+class Test(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(self):
+        print('Start to test borders.py...')
+
+    @classmethod
+    def tearDownClass(self):
+        print('Finish testing borders.py!')
+
+    def setUp(self):
+        self.tmpDir = tempfile.mkdtemp()
+        self.file = os.path.join(self.tmpDir, 'border.dat')
+        with open(self.file, 'w') as fh:
+            fh.write('>\n100 30\n101 30\n102 30\n103 30\n'
+                     '>\n110 40\n110.01 40.01\n110.02 40.02\n111 41\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpDir)
+
+    def test_parse_borders(self):
+        print('---> Test on parse_borders')
+
+        coords, offsets = parse_borders(self.file)
+
+        self.assertEqual(coords.shape, (8, 2))
+        self.assertTrue(np.array_equal(offsets, [0, 4, 8]))
+        self.assertTrue(np.allclose(coords[4], [110, 40]))
+
+    def test_load_borders(self):
+        print('---> Test on binary cache of borders')
+
+        cacheFile = os.path.join(self.tmpDir, 'border.npz')
+        coords, offsets = load_borders(self.file, cacheFile=cacheFile)
+
+        self.assertTrue(os.path.exists(cacheFile))
+        with np.load(cacheFile) as cache:
+            self.assertTrue(np.array_equal(cache['coords'], coords))
+            self.assertTrue(np.array_equal(cache['offsets'], offsets))
+
+    def test_clip_borders(self):
+        print('---> Test on clip_borders')
+
+        coords, offsets = parse_borders(self.file)
+
+        # the neighbouring vertex outside the extent is kept
+        newCoords, newOffsets = clip_borders(
+            coords, offsets, [100.5, 101.5], [29, 31])
+        self.assertTrue(np.array_equal(newOffsets, [0, 3]))
+        self.assertTrue(np.allclose(newCoords[:, 0], [100, 101, 102]))
+
+        # close vertices are merged, the end points are kept
+        newCoords, newOffsets = clip_borders(
+            coords, offsets, [105, 115], [35, 45], tolerance=0.1)
+        self.assertTrue(np.array_equal(newOffsets, [0, 2]))
+        self.assertTrue(np.allclose(newCoords[-1], [111, 41]))
+
+
+def main():
+
+    suite = unittest.TestSuite()
+
+    tests = [
+        Test('test_parse_borders'),
+        Test('test_load_borders'),
+        Test('test_clip_borders')
+        ]   # setup the test list
+    suite.addTests(tests)
+
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,173 @@
+import sys
+import os
+import shutil
+import tempfile
+import datetime as dt
+import unittest
+import numpy as np
+
+projectDir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(projectDir, 'pyHimawari8'))
+
+from hsd import HSDSegment, write_segment
+from calibration import calibrate, calibration_lut
+
+
+class Test(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(self):
+        print('Start to test calibration.py...')
+
+    @classmethod
+    def tearDownClass(self):
+        print('Finish testing calibration.py!')
+
+    def setUp(self):
+        self.tmpDir = tempfile.mkdtemp()
+        rng = np.random.RandomState(0)
+
+        self.files = {}
+        for band, resolution, bits in [(1, 10, 11), (13, 20, 12)]:
+            counts = rng.randint(0, 2 ** bits, (50, 110)).astype('u2')
+            counts[0, 0] = 65535   # error pixel
+            counts[0, 1] = 65534   # outside scan pixel
+            counts[0, 2] = 2 ** bits   # beyond the valid bits
+            file = os.path.join(
+                self.tmpDir, 'HS_H08_20200219_0400_B{0:02d}_FLDK_R{1:02d}_'
+                'S0110.DAT'.format(band, resolution))
+            write_segment(file, counts, band=band,
+                          calibration={'cali_gain_count2rad_conversion': 0.4,
+                                       'cali_offset_count2rad_conversion': -8}
+                          if band < 7 else None)
+            self.files[band] = (file, counts)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpDir)
+
+    def test_vis(self):
+        print('---> Test on visible calibration')
+
+        file, counts = self.files[1]
+        with HSDSegment(file) as seg:
+            rad = calibrate(seg, 'radiance', chunkLines=7)
+            radNominal = calibrate(seg, 'radiance', mode='nominal')
+            ref = calibrate(seg)
+
+        self.assertEqual(ref.dtype, np.float32)
+        self.assertTrue(np.isnan(ref[0, :3]).all())
+        self.assertEqual(np.isnan(ref).sum(), 3)
+
+        valid = np.ones(counts.shape, dtype=bool)
+        valid[0, :3] = False
+        np.testing.assert_allclose(rad[valid], 0.4 * counts[valid] - 8,
+                                   rtol=1e-6, atol=1e-4)
+        np.testing.assert_allclose(radNominal[valid],
+                                   0.38 * counts[valid] - 7.6,
+                                   rtol=1e-6, atol=1e-4)
+        np.testing.assert_allclose(
+            ref[valid], np.clip((0.4 * counts[valid] - 8) * 0.15, 0, None),
+            rtol=1e-6, atol=1e-4)
+
+    def test_ir(self):
+        print('---> Test on infrared calibration')
+
+        file, counts = self.files[13]
+        tb = calibrate(file)
+        rad = calibrate(file, 'radiance')
+
+        with HSDSegment(file) as seg:
+            block5 = seg.header['block5']
+
+        # inverse Planck function in double precision
+        cwl = block5['central_wave_length'] * 1e-6
+        h, c, k = 6.62606957e-34, 2.99792458e8, 1.3806488e-23
+        valid = np.isfinite(tb)
+        radiance = rad[valid].astype(np.float64)
+        Te = h * c / (k * cwl) / np.log(
+            2 * h * c ** 2 / (radiance * 1e6 * cwl ** 5) + 1)
+        expected = np.clip(-0.1 + Te - 1.5e-6 * Te ** 2, 0, None)
+
+        np.testing.assert_allclose(tb[valid], expected, rtol=1e-5)
+        self.assertTrue(np.isnan(tb[0, :3]).all())
+
+        # lines
+        with HSDSegment(file) as seg:
+            out = np.empty((10, 110), dtype=np.float32)
+            part = calibrate(seg, lines=slice(20, 30), out=out)
+        self.assertIs(part, out)
+        np.testing.assert_array_equal(part, tb[20:30])
+
+        with self.assertRaises(ValueError):
+            calibrate(file, 'reflectance')
+
+    def test_gsics(self):
+        print('---> Test on GSICS correction')
+
+        file, counts = self.files[13]
+        with HSDSegment(file) as seg:
+            header = seg.header
+
+        lut = calibration_lut(header, 'radiance')
+        # invalid coefficients of block 6 are ignored
+        np.testing.assert_array_equal(
+            calibration_lut(header, 'radiance', gsics=True), lut)
+
+        header['block6'].update({'gsics_calibration_intercept': 0.1,
+                                 'gsics_calibration_slope': 0.98,
+                                 'gsics_calibration_coeff_quadratic_term':
+                                 0.001})
+        corrected = calibration_lut(header, 'radiance', gsics=True)
+        np.testing.assert_allclose(
+            corrected[:4096], 0.1 + 0.98 * lut[:4096] + 0.001 *
+            lut[:4096].astype(np.float64) ** 2, rtol=1e-5, atol=1e-5)
+
+    def test_satpy(self):
+        print('---> Test on consistency with satpy')
+
+        try:
+            from satpy.readers.ahi_hsd import AHIHSDFileHandler
+        except ImportError:
+            self.skipTest('satpy is not available.')
+
+        for band, calibration, resolution in [
+                (1, 'reflectance', 1000), (1, 'radiance', 1000),
+                (13, 'brightness_temperature', 2000), (13, 'radiance', 2000)]:
+            file, counts = self.files[band]
+            handler = AHIHSDFileHandler(
+                file, {'segment': 1, 'total_segments': 10,
+                       'start_time': dt.datetime(2020, 2, 19, 4, 0)},
+                {'file_type': 'hsd_b{0:02d}'.format(band)}, mask_space=False)
+            key = {'name': 'B{0:02d}'.format(band),
+                   'calibration': calibration, 'resolution': resolution}
+            info = {'units': '', 'standard_name': '', 'wavelength': None,
+                    'resolution': resolution}
+            expected = np.asarray(handler.read_band(key, info))
+
+            data = calibrate(file, calibration)
+            valid = np.isfinite(expected)
+            # counts beyond the valid bits are masked in addition
+            valid[0, 2] = False
+            np.testing.assert_array_equal(np.isfinite(data), valid)
+            np.testing.assert_allclose(data[valid], expected[valid],
+                                       rtol=1e-4, atol=1e-3)
+
+
+def main():
+
+    suite = unittest.TestSuite()
+
+    tests = [
+        Test('test_vis'),
+        Test('test_ir'),
+        Test('test_gsics'),
+        Test('test_satpy')
+        ]   # setup the test list
+    suite.addTests(tests)
+
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
+
+
+if __name__ == '__main__':
+    main()
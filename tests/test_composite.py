@@ -0,0 +1,157 @@
+import sys
+import os
+import shutil
+import tempfile
+import datetime as dt
+import unittest
+import numpy as np
+
+projectDir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(projectDir, 'pyHimawari8'))
+
+from composite import Composite, group_files, composite
+from synthetic import write_l2
+
+
+class Test(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(self):
+        print('Start to test composite.py...')
+
+    @classmethod
+    def tearDownClass(self):
+        print('Finish testing composite.py!')
+
+    def setUp(self):
+        self.tmpDir = tempfile.mkdtemp()
+        self.tStart = dt.datetime(2020, 2, 19, 4, 0)
+        self.rng = np.random.RandomState(0)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpDir)
+
+    def write_file(self, mTime):
+        """
+        L2 file on a 1-degree grid with random CLTH and CLTYPE, some of
+        them masked.
+        """
+
+        file = os.path.join(
+            self.tmpDir, 'NC_H08_{0}_L2CLP010_FLDK.02401_02401.nc'.format(
+                mTime.strftime('%Y%m%d_%H%M')))
+        clth = np.ma.masked_array(self.rng.rand(121, 121).astype('f4') * 15,
+                                  mask=self.rng.rand(121, 121) < 0.3)
+        cltype = np.ma.masked_array(self.rng.randint(0, 11, (121, 121)),
+                                    mask=self.rng.rand(121, 121) < 0.3)
+        write_l2(file, {'CLTH': clth, 'CLTYPE': cltype})
+
+        return file, clth[10:41, 30:51], cltype[10:41, 30:51]
+
+    def test_accumulators(self):
+        print('---> Test on the running accumulators')
+
+        frames = [self.write_file(self.tStart + dt.timedelta(minutes=10 * i))
+                  for i in range(5)]
+        lat, lon = np.linspace(50, 20, 31), np.linspace(110, 130, 21)
+        CLTH = np.ma.stack([clth for _, clth, _ in frames])
+        CLTYPE = np.ma.stack([cltype for _, _, cltype in frames])
+
+        # two partial composites merged
+        comps = [Composite(['CLTYPE', 'CLTH'], lat, lon) for _ in range(2)]
+        for iFrame, (file, clth, cltype) in enumerate(frames):
+            comps[iFrame % 2].update({'CLTYPE': cltype, 'CLTH': clth},
+                                     file=file)
+        comp = comps[0]
+        comp.merge(comps[1])
+        self.assertEqual(len(comp), 5)
+
+        np.testing.assert_allclose(comp.mean('CLTH'),
+                                   CLTH.mean(axis=0).filled(np.nan),
+                                   rtol=1e-5)
+        np.testing.assert_array_equal(comp.minimum('CLTH'),
+                                      CLTH.min(axis=0).filled(np.nan))
+        np.testing.assert_array_equal(comp.maximum('CLTH'),
+                                      CLTH.max(axis=0).filled(np.nan))
+        np.testing.assert_array_equal(comp.count('CLTH'),
+                                      CLTH.count(axis=0))
+        # all masked
+        self.assertTrue(np.isnan(comp.mean('CLTH')[CLTH.count(axis=0) == 0])
+                        .all())
+
+        frequency = comp.frequency('CLTYPE')
+        self.assertEqual(frequency.shape, (11, 31, 21))
+        np.testing.assert_allclose(frequency[3], (CLTYPE == 3).sum(axis=0) /
+                                   CLTYPE.count(axis=0), rtol=1e-6)
+        np.testing.assert_array_equal(comp.count('CLTYPE'),
+                                      CLTYPE.count(axis=0))
+
+        # checkpoint
+        checkpoint = os.path.join(self.tmpDir, 'comp.npz')
+        comp.save(checkpoint)
+        restored = Composite.load(checkpoint)
+        self.assertEqual(restored.files, comp.files)
+        self.assertEqual(restored.classes, {'CLTYPE': 11})
+        np.testing.assert_array_equal(restored.mean('CLTH'),
+                                      comp.mean('CLTH'))
+        np.testing.assert_array_equal(restored.frequency('CLTYPE'),
+                                      frequency)
+
+        with self.assertRaises(ValueError):
+            comp.update({'CLTYPE': CLTYPE[0], 'CLTH': CLTH[0, 1:]})
+
+    def test_composite(self):
+        print('---> Test on compositing files with resuming')
+
+        files = [self.write_file(self.tStart + dt.timedelta(hours=3 * i))[0]
+                 for i in range(10)]
+        open(os.path.join(self.tmpDir, 'bad.nc'), 'w').close()
+        badFile = os.path.join(
+            self.tmpDir, 'NC_H08_20200219_0350_L2CLP010_FLDK.02401_02401.nc')
+        shutil.copy(os.path.join(self.tmpDir, 'bad.nc'), badFile)
+
+        groups = group_files([badFile] + files, 'day')
+        self.assertEqual(list(groups), ['20200219', '20200220'])
+        self.assertEqual(groups['20200219'], [badFile] + files[:7])
+        self.assertEqual(list(group_files(files, 'month')), ['202002'])
+
+        kwargs = dict(latRange=[20, 50], lonRange=[110, 130])
+        expected = composite(files, ['CLTH', 'CLTYPE'], nWorkers=1,
+                             **kwargs)
+        self.assertEqual(len(expected), 10)
+
+        # interrupted after the first batch, then resumed in parallel
+        checkpoint = os.path.join(self.tmpDir, 'CLP.npz')
+        comp = composite([badFile] + files[:4], ['CLTH', 'CLTYPE'],
+                         nWorkers=1, checkpoint=checkpoint, batch=3,
+                         **kwargs)
+        self.assertEqual(comp.files, files[:4])
+        comp = composite([badFile] + files, ['CLTH', 'CLTYPE'], nWorkers=2,
+                         checkpoint=checkpoint, batch=3, **kwargs)
+        self.assertEqual(sorted(comp.files), sorted(files))
+        np.testing.assert_allclose(comp.mean('CLTH'),
+                                   expected.mean('CLTH'), rtol=1e-6)
+        np.testing.assert_array_equal(comp.frequency('CLTYPE'),
+                                      expected.frequency('CLTYPE'))
+        self.assertEqual(len(Composite.load(checkpoint)), 10)
+
+        with self.assertRaises(ValueError):
+            composite(files, ['CLTH'], checkpoint=checkpoint, **kwargs)
+
+
+def main():
+
+    suite = unittest.TestSuite()
+
+    tests = [
+        Test('test_accumulators'),
+        Test('test_composite')
+        ]   # setup the test list
+    suite.addTests(tests)
+
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,144 @@
+import sys
+import os
+import shutil
+import tempfile
+import datetime as dt
+import unittest
+from unittest import mock
+import numpy as np
+
+projectDir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(projectDir, 'pyHimawari8'))
+
+from synthetic import write_l2, offline_basemap
+
+try:
+    import cron_task
+except ImportError:   # bypy of the upload
+    cron_task = None
+
+
+class Test(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(self):
+        print('Start to test cron_task.py...')
+
+    @classmethod
+    def tearDownClass(self):
+        print('Finish testing cron_task.py!')
+
+    def setUp(self):
+        if cron_task is None:
+            self.skipTest('bypy is not available.')
+
+        self.tmpDir = tempfile.mkdtemp()
+        self.mTime = dt.datetime(2020, 2, 19, 4, 0)
+        self.config = mock.patch.dict(cron_task.CONFIG, {
+            'RENDER_CACHE_DIR': '', 'LAT_RANGE': [20, 50],
+            'LON_RANGE': [110, 130]})
+        self.config.start()
+        self.offline = offline_basemap()
+        self.offline.__enter__()
+
+    def tearDown(self):
+        self.offline.__exit__(None, None, None)
+        self.config.stop()
+        shutil.rmtree(self.tmpDir)
+
+    def job(self, mTime, *, fail=False):
+        """
+        colorplot job of CLTYPE and CLTH, with a failing plot if `fail`.
+        """
+
+        file = os.path.join(
+            self.tmpDir, 'NC_H08_{0:%Y%m%d_%H%M}_L2CLP010_FLDK.02401_'
+            '02401.nc'.format(mTime))
+        write_l2(file, {'CLTYPE': np.full((121, 121), 3),
+                        'CLTH': np.full((121, 121), 5.0)})
+
+        plots = []
+        for variable, vmax in [('CLTYPE', 10), ('CLTH', 15)]:
+            imgFile = os.path.join(self.tmpDir, '{0}_{1:%H%M}.png'.format(
+                variable, mTime))
+            plots.append({'variable': variable, 'method': 'colorplot',
+                          'imgFile': imgFile, 'args': [imgFile],
+                          'kwargs': {'axLatRange': [20, 50],
+                                     'axLonRange': [110, 130], 'vmin': 0,
+                                     'vmax': vmax}})
+        if fail:
+            plots[0]['kwargs']['cmap'] = 'no_such_cmap'
+
+        return {'mTime': mTime, 'file': file, 'plots': plots}
+
+    def test_render(self):
+        print('---> Test on rendering the plots of a job')
+
+        job = self.job(self.mTime)
+        items = cron_task.render(job)
+        self.assertEqual(items, [[self.mTime, plot['imgFile']]
+                                 for plot in job['plots']])
+        for plot in job['plots']:
+            self.assertGreater(os.path.getsize(plot['imgFile']), 0)
+
+        # a failed plot doesn't abort the others
+        job = self.job(self.mTime + dt.timedelta(minutes=10), fail=True)
+        items = cron_task.render(job)
+        self.assertIsNone(items[0])
+        self.assertFalse(os.path.exists(job['plots'][0]['imgFile']))
+        self.assertEqual(items[1], [job['mTime'], job['plots'][1]['imgFile']])
+
+        # the up-to-date images are kept for the upload
+        cron_task.CONFIG['RENDER_CACHE_DIR'] = os.path.join(self.tmpDir,
+                                                            'cache')
+        job = self.job(self.mTime + dt.timedelta(minutes=20))
+        expected = [[job['mTime'], plot['imgFile']] for plot in job['plots']]
+        self.assertEqual(cron_task.render(job), expected)
+        mtimes = [os.path.getmtime(plot['imgFile']) for plot in job['plots']]
+        self.assertEqual(cron_task.render(job), expected)
+        self.assertEqual([os.path.getmtime(plot['imgFile'])
+                          for plot in job['plots']], mtimes)
+
+    def test_runJobs(self):
+        print('---> Test on running the jobs in the worker processes')
+
+        jobs = [self.job(self.mTime + dt.timedelta(minutes=10 * iJob))
+                for iJob in range(3)]
+        # the data file of the second job is gone before rendering
+        os.remove(jobs[1]['file'])
+
+        onDone = mock.Mock()
+        items = cron_task.runJobs(jobs, nWorkers=2, onDone=onDone)
+
+        self.assertEqual(items[1], [None, None])
+        for iJob in [0, 2]:
+            self.assertEqual(items[iJob], [[jobs[iJob]['mTime'],
+                                            plot['imgFile']]
+                                           for plot in jobs[iJob]['plots']])
+            for plot in jobs[iJob]['plots']:
+                self.assertGreater(os.path.getsize(plot['imgFile']), 0)
+        self.assertFalse(any(os.path.exists(plot['imgFile'])
+                             for plot in jobs[1]['plots']))
+
+        # once per job, in the order of completion
+        self.assertEqual(onDone.call_count, len(jobs))
+        self.assertCountEqual([call.args[0] for call in onDone.call_args_list],
+                              items)
+
+
+def main():
+
+    suite = unittest.TestSuite()
+
+    tests = [
+        Test('test_render'),
+        Test('test_runJobs')
+        ]   # setup the test list
+    suite.addTests(tests)
+
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
+
+
+if __name__ == '__main__':
+    main()
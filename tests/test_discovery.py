@@ -0,0 +1,121 @@
+import sys
+import os
+import time
+import shutil
+import tempfile
+import datetime as dt
+import unittest
+from unittest import mock
+
+projectDir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(projectDir, 'pyHimawari8'))
+
+import discovery
+from discovery import ProductIndex, parseName
+
+
+class Test(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(self):
+        print('Start to test discovery.py...')
+
+    @classmethod
+    def tearDownClass(self):
+        print('Finish testing discovery.py!')
+
+    def setUp(self):
+        self.tmpDir = tempfile.mkdtemp()
+        self.HSD_Dir = os.path.join('jma', 'hsd', '202002', '19', '04')
+        os.makedirs(os.path.join(self.tmpDir, self.HSD_Dir))
+
+        names = ['HS_H08_20200219_{0}_B{1:02d}_FLDK_R{2}_S{3:02d}10.DAT.bz2'
+                 .format(HHMM, band, resolution, segment)
+                 for HHMM in ['0400', '0410']
+                 for band, resolution in [(1, 10), (13, 20)]
+                 for segment in range(1, 11)]
+        names.append('PI_H08_20200219_0400_TRC_JP01_R10_PLLJP.png')
+        for name in names:
+            open(os.path.join(self.tmpDir, self.HSD_Dir, name), 'w').close()
+
+        self.listdir = mock.patch.object(
+            discovery.os, 'listdir', side_effect=os.listdir)
+        self.mockListdir = self.listdir.start()
+
+    def tearDown(self):
+        self.listdir.stop()
+        shutil.rmtree(self.tmpDir)
+
+    def test_parseName(self):
+        print('---> Test on parseName')
+
+        info = parseName('NC_H08_20200219_0400_L2ARP021_FLDK.02401_02401.nc')
+        self.assertEqual(info['kind'], 'L2')
+        self.assertEqual(info['product'], 'ARP')
+        self.assertEqual(info['version'], '021')
+        self.assertEqual(info['time'], dt.datetime(2020, 2, 19, 4, 0))
+
+        info = parseName('HS_H08_20200219_0400_B03_FLDK_R05_S0710.DAT')
+        self.assertEqual((info['band'], info['segment'], info['bz2']),
+                         (3, 7, False))
+
+        self.assertEqual(
+            parseName('PI_H08_20200219_0400_TRC_JP01_R10_PLLJP.png')['area'],
+            'JP01')
+        self.assertIsNone(parseName('README.txt'))
+
+    def test_index(self):
+        print('---> Test on directory index')
+
+        index = ProductIndex(self.tmpDir, ttl=0.2)
+        mTime = dt.datetime(2020, 2, 19, 4, 0)
+
+        files = index.find_hsd(self.HSD_Dir, mTime, 1, segments=[1, 2, 3, 4])
+        self.assertEqual([os.path.basename(file)[-13:] for file in files],
+                         ['S0110.DAT.bz2', 'S0210.DAT.bz2', 'S0310.DAT.bz2',
+                          'S0410.DAT.bz2'])
+        self.assertTrue(all('_0400_' in file for file in files))
+
+        TRCFile = os.path.join(self.tmpDir, self.HSD_Dir,
+                               'PI_H08_20200219_0400_TRC_JP01_R10_PLLJP.png')
+        self.assertTrue(index.exists(TRCFile))
+        self.assertEqual(len(index.find(self.HSD_Dir, kind='HSD', band=13)),
+                         20)
+        self.assertEqual(self.mockListdir.call_count, 1)
+
+        # negative lookups are cached for ttl
+        newFile = os.path.join(self.tmpDir, self.HSD_Dir, 'new.png')
+        self.assertFalse(index.exists(newFile))
+        open(newFile, 'w').close()
+        self.assertFalse(index.exists(newFile))
+        self.assertEqual(self.mockListdir.call_count, 1)
+
+        time.sleep(0.3)
+        self.assertTrue(index.exists(newFile))
+        self.assertEqual(self.mockListdir.call_count, 2)
+
+        # missing directory
+        L2File = os.path.join(
+            self.tmpDir, 'pub', 'himawari', 'L2', 'CLP',
+            'NC_H08_20200219_0400_L2CLP010_FLDK.02401_02401.nc')
+        self.assertFalse(index.exists(L2File))
+        self.assertFalse(index.exists(L2File))
+        self.assertEqual(self.mockListdir.call_count, 3)
+
+
+def main():
+
+    suite = unittest.TestSuite()
+
+    tests = [
+        Test('test_parseName'),
+        Test('test_index')
+        ]   # setup the test list
+    suite.addTests(tests)
+
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
+
+
+if __name__ == '__main__':
+    main()
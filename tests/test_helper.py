@@ -1,12 +1,18 @@
 import sys
 import os
+import shutil
+import tempfile
 import datetime as dt
 import unittest
+import numpy as np
+from netCDF4 import Dataset
 
 projectDir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.append(os.path.join(projectDir, 'pyHimawari8'))
 
-from helper import parseTime, tRange, getH8ProdFile
+from helper import parseTime, tRange, getH8ProdFile, getH8HSDFile, \
+    getROISlice
+from synthetic import write_l2
 
 
 class Test(unittest.TestCase):
@@ -58,6 +64,43 @@ class Test(unittest.TestCase):
         self.assertEqual(file_CLP,
                          'NC_H08_20200219_0400_L2CLP010_FLDK.02401_02401.nc')
 
+    def test_getH8HSDFile(self):
+        print('---> Test on getH8HSDFile')
+
+        mTime = dt.datetime(2020, 2, 19, 4, 0, 0)
+
+        self.assertEqual(getH8HSDFile(mTime, 1, 3),
+                         'HS_H08_20200219_0400_B01_FLDK_R10_S0310.DAT.bz2')
+        self.assertEqual(getH8HSDFile(mTime, 3, 10, compressed=False),
+                         'HS_H08_20200219_0400_B03_FLDK_R05_S1010.DAT')
+        self.assertEqual(getH8HSDFile(mTime, 13, 1),
+                         'HS_H08_20200219_0400_B13_FLDK_R20_S0110.DAT.bz2')
+
+    def test_getROISlice(self):
+        print('---> Test on getROISlice')
+
+        tmpDir = tempfile.mkdtemp()
+        file = os.path.join(tmpDir, 'grid.nc')
+        write_l2(file, {'CLTH': np.arange(121 * 121).reshape(121, 121)})
+
+        with Dataset(file, 'r') as fd:
+            latSlice, lonSlice, lat, lon = getROISlice(
+                fd, [20, 50], [110, 130])
+            data = fd.variables['CLTH'][latSlice, lonSlice]
+
+            mask_lat = (fd['latitude'][:] >= 20) & (fd['latitude'][:] <= 50)
+            mask_lon = (fd['longitude'][:] >= 110) & \
+                (fd['longitude'][:] <= 130)
+            expected = fd.variables['CLTH'][:, mask_lon][mask_lat]
+
+        self.assertEqual(latSlice, slice(10, 41))
+        self.assertEqual(lonSlice, slice(30, 51))
+        self.assertTrue(np.array_equal(data, expected))
+        self.assertEqual(lat[0], 50)
+        self.assertEqual(lon[-1], 130)
+
+        shutil.rmtree(tmpDir)
+
 
 def main():
 
@@ -0,0 +1,130 @@
+import sys
+import os
+import shutil
+import tempfile
+import datetime as dt
+import unittest
+import numpy as np
+
+projectDir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(projectDir, 'pyHimawari8'))
+
+from hsd import HSDSegment, write_segment, lonlat2linecol, roi_segments
+from helper import read_Himawari8
+
+
+class Test(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(self):
+        print('Start to test hsd.py...')
+
+    @classmethod
+    def tearDownClass(self):
+        print('Finish testing hsd.py!')
+
+    def setUp(self):
+        self.tmpDir = tempfile.mkdtemp()
+        self.counts = np.arange(20 * 110, dtype='u2').reshape(20, 110)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpDir)
+
+    def test_header(self):
+        print('---> Test on header parsing')
+
+        file = os.path.join(
+            self.tmpDir, 'HS_H08_20200219_0400_B01_FLDK_R10_S0310.DAT')
+        write_segment(file, self.counts, band=1, segment=3)
+
+        with HSDSegment(file) as seg:
+            self.assertEqual(seg.band, 1)
+            self.assertEqual(seg.segment, 3)
+            self.assertEqual(seg.first_line, 41)
+            self.assertEqual(seg.shape, (20, 110))
+            self.assertEqual(seg.start_time, dt.datetime(2020, 2, 19, 4, 0))
+            self.assertEqual(seg.header['block1']['satellite_name'],
+                             'Himawari-8')
+            self.assertAlmostEqual(
+                seg.header['block5']['coeff_rad2albedo_conversion'], 0.0015)
+            self.assertEqual(len(seg.header['block9']['records']), 1)
+            self.assertEqual(
+                seg.offset, os.path.getsize(file) - self.counts.nbytes)
+
+    def test_counts(self):
+        print('---> Test on memory-mapped counts')
+
+        file = os.path.join(
+            self.tmpDir, 'HS_H08_20200219_0400_B13_FLDK_R20_S0110.DAT')
+        write_segment(file, self.counts, band=13)
+
+        seg = read_Himawari8(file)
+        self.assertIsInstance(seg.counts, np.memmap)
+        self.assertTrue(np.array_equal(seg.counts[5:8], self.counts[5:8]))
+        self.assertIn('planck_constant', seg.header['block5'])
+        seg.close()
+
+    def test_bz2(self):
+        print('---> Test on compressed segment')
+
+        file = os.path.join(
+            self.tmpDir, 'HS_H08_20200219_0400_B03_FLDK_R05_S0110.DAT.bz2')
+        write_segment(file, self.counts, band=3)
+
+        seg = HSDSegment(file, tmpDir=self.tmpDir)
+        self.assertEqual(seg.band, 3)
+        self.assertTrue(np.array_equal(seg.counts, self.counts))
+        tmpFile = seg._tmpFile
+        self.assertTrue(os.path.exists(tmpFile))
+        seg.close()
+        self.assertFalse(os.path.exists(tmpFile))
+
+        # the lines and the counts share the decompressed file
+        with HSDSegment(file, tmpDir=self.tmpDir) as seg:
+            np.testing.assert_array_equal(seg.read_lines(1, 3),
+                                          self.counts[1:3])
+            tmpFile = seg._tmpFile
+            self.assertTrue(np.array_equal(seg.counts, self.counts))
+            self.assertEqual(seg._tmpFile, tmpFile)
+        self.assertEqual(os.listdir(self.tmpDir), [os.path.basename(file)])
+
+    def test_lonlat2linecol(self):
+        print('---> Test on lonlat2linecol')
+
+        line, col = lonlat2linecol([140.7, 140.7, 0], [0, 50, 0])
+
+        self.assertTrue(np.allclose(line[:2], [5500.5, 952.45], atol=0.01))
+        self.assertAlmostEqual(col[0], 5500.5)
+        self.assertTrue(np.isnan(line[2]))
+
+        line, col = lonlat2linecol(140.7, 0, resolution=0.5)
+        self.assertAlmostEqual(float(line), 11000.5)
+
+    def test_roi_segments(self):
+        print('---> Test on roi_segments')
+
+        self.assertEqual(roi_segments([15, 58], [70, 140]), [1, 2, 3, 4])
+        self.assertEqual(roi_segments([-40, -10], [110, 150]), [6, 7, 8, 9])
+        self.assertEqual(roi_segments([-5, 5], [130, 150]), [5, 6])
+        self.assertEqual(roi_segments([30, 40], [-60, -50]), [])
+
+
+def main():
+
+    suite = unittest.TestSuite()
+
+    tests = [
+        Test('test_header'),
+        Test('test_counts'),
+        Test('test_bz2'),
+        Test('test_lonlat2linecol'),
+        Test('test_roi_segments')
+        ]   # setup the test list
+    suite.addTests(tests)
+
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
+
+
+if __name__ == '__main__':
+    main()
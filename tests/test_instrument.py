@@ -0,0 +1,143 @@
+import sys
+import os
+import json
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+projectDir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(projectDir, 'pyHimawari8'))
+
+import instrument
+from instrument import span, collect_spans, summarize, summary_table, \
+    write_jsonl, write_prometheus
+
+
+class Test(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(self):
+        print('Start to test instrument.py...')
+
+    @classmethod
+    def tearDownClass(self):
+        print('Finish testing instrument.py!')
+
+    def setUp(self):
+        self.tmpDir = tempfile.mkdtemp()
+        collect_spans()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpDir)
+        collect_spans()
+
+    def test_span(self):
+        print('---> Test on nested and failed spans')
+
+        file = os.path.join(self.tmpDir, 'data.bin')
+        with open(file, 'wb') as fh:
+            fh.write(b'\0' * 100000)
+
+        with span('render', imgFile='a.png'):
+            with span('subset'):
+                with open(file, 'rb') as fh:
+                    fh.read()
+        with self.assertRaises(ValueError):
+            with span('encode'):
+                raise ValueError('failed')
+
+        spans = collect_spans()
+        self.assertEqual([record['name'] for record in spans],
+                         ['subset', 'render', 'encode'])
+        self.assertEqual(spans[0]['parent'], 'render')
+        self.assertEqual(spans[1]['imgFile'], 'a.png')
+        self.assertEqual(spans[2]['status'], 'error')
+        if spans[0]['bytes_read'] is not None:
+            self.assertGreaterEqual(spans[0]['bytes_read'], 100000)
+        self.assertEqual(collect_spans(), [])
+
+        stats = summarize(spans)
+        self.assertEqual(stats['encode']['errors'], 1)
+        self.assertAlmostEqual(stats['render']['wall'], spans[1]['wall'])
+
+    def test_peak_rss(self):
+        print('---> Test on the peak RSS of the stages')
+
+        # a temporary array freed inside the stage
+        with span('draw'):
+            with span('resample'):
+                data = b'\1' * 2 ** 26
+                del data
+            with span('encode'):
+                pass
+
+        spans = collect_spans()
+        if spans[0]['peak_rss_scope'] != 'stage':
+            self.skipTest('/proc/self/clear_refs is not available.')
+        resample, encode, draw = spans
+        self.assertGreater(resample['peak_rss'], resample['rss'] + 2 ** 25)
+        self.assertLess(encode['peak_rss'], resample['peak_rss'] - 2 ** 25)
+        self.assertGreaterEqual(draw['peak_rss'], resample['peak_rss'])
+        self.assertEqual(summarize(spans)['resample']['peak_rss'],
+                         resample['peak_rss'])
+        self.assertNotIn('*', summary_table(spans))
+
+        # the peak over the process lifetime
+        with mock.patch.object(instrument, '_reset_hwm', return_value=False):
+            with span('resample'):
+                pass
+        record = collect_spans()[0]
+        self.assertEqual(record['peak_rss_scope'], 'process')
+        self.assertGreater(record['peak_rss'], 0)
+        stats = summarize([resample, record])
+        self.assertEqual(stats['resample']['peak_rss_scope'], 'process')
+        self.assertIn('* peak RSS over the process lifetime',
+                      summary_table([resample, record]))
+
+    def test_output(self):
+        print('---> Test on JSON lines and prometheus outputs')
+
+        with span('upload'):
+            pass
+        with span('upload'):
+            pass
+        spans = collect_spans()
+
+        jsonlFile = os.path.join(self.tmpDir, 'spans.jsonl')
+        write_jsonl(jsonlFile, spans)
+        with open(jsonlFile, 'r') as fh:
+            records = [json.loads(line) for line in fh]
+        self.assertEqual(len(records), 2)
+        self.assertEqual(records[0]['name'], 'upload')
+
+        promFile = os.path.join(self.tmpDir, 'himawari8.prom')
+        write_prometheus(promFile, spans)
+        with open(promFile, 'r') as fh:
+            context = fh.read()
+        self.assertIn('himawari8_stage_count{stage="upload"} 2', context)
+        self.assertIn('# TYPE himawari8_stage_wall_seconds gauge', context)
+        self.assertIn('himawari8_stage_peak_rss_bytes{{stage="upload",'
+                      'scope="{0}"}}'.format(spans[0]['peak_rss_scope']),
+                      context)
+        self.assertEqual(os.listdir(self.tmpDir).count('himawari8.prom'), 1)
+        self.assertEqual(len(os.listdir(self.tmpDir)), 2)
+
+
+def main():
+
+    suite = unittest.TestSuite()
+
+    tests = [
+        Test('test_span'),
+        Test('test_peak_rss'),
+        Test('test_output')
+        ]   # setup the test list
+    suite.addTests(tests)
+
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,143 @@
+import sys
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+import dask.array as da
+from netCDF4 import Dataset
+
+projectDir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(projectDir, 'pyHimawari8'))
+
+from hsd import write_segment
+from calibration import calibrate
+from lazy import chunk_lines, open_l2, open_hsd, downsample, \
+    downsample_coords, compute
+from synthetic import write_l2
+
+
+class Test(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(self):
+        print('Start to test lazy.py...')
+
+    @classmethod
+    def tearDownClass(self):
+        print('Finish testing lazy.py!')
+
+    def setUp(self):
+        self.tmpDir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpDir)
+
+    def test_chunk_lines(self):
+        print('---> Test on chunk size')
+
+        # 4 workers x 4 copies of 1 MB chunks
+        lines = chunk_lines(1000, memoryLimit=16 * 2 ** 20, nWorkers=4)
+        self.assertEqual(lines, 2 ** 20 // 4000)
+        self.assertEqual(chunk_lines(1000, factor=8, memoryLimit=16 * 2 ** 20,
+                                     nWorkers=4) % 8, 0)
+        # at least one block of the factor
+        self.assertEqual(chunk_lines(10 ** 6, factor=4, memoryLimit=1024), 4)
+
+    def test_open_l2(self):
+        print('---> Test on lazy L2 variables')
+
+        file = os.path.join(self.tmpDir, 'grid.nc')
+        data = np.ma.masked_array(
+            np.arange(121 * 121, dtype='f4').reshape(121, 121),
+            mask=np.zeros((121, 121), dtype=bool))
+        data.mask[15, 35:40] = True
+        write_l2(file, {'CLTH': data})
+
+        with Dataset(file, 'r') as fd:
+            arrays, lat, lon = open_l2(fd, ['CLTH'], latRange=[20, 50],
+                                       lonRange=[110, 130],
+                                       memoryLimit=4 * 121 * 4 * 8,
+                                       nWorkers=1)
+            array = arrays['CLTH']
+            self.assertIsInstance(array, da.Array)
+            self.assertEqual(array.shape, (31, 21))
+            self.assertGreater(len(array.chunks[0]), 1)
+
+            result = compute(array, nWorkers=2)
+
+        expected = np.ma.filled(data[10:41, 30:51], np.nan)
+        np.testing.assert_array_equal(result, expected)
+        self.assertEqual(lat[0], 50)
+
+    def test_open_hsd(self):
+        print('---> Test on lazy HSD full disk')
+
+        rng = np.random.RandomState(0)
+        files, counts = [], {}
+        for segment in [1, 2, 4]:
+            counts[segment] = rng.randint(0, 2048, (20, 80)).astype('u2')
+            file = os.path.join(
+                self.tmpDir, 'HS_H08_20200219_0400_B03_FLDK_R05_'
+                'S{0:02d}04.DAT'.format(segment))
+            if segment == 4:
+                file += '.bz2'
+            write_segment(file, counts[segment], band=3, segment=segment,
+                          nSegments=4)
+            files.append(file)
+
+        array, segments = open_hsd(files, nSegments=4, factor=4,
+                                   memoryLimit=4 * 80 * 4 * 8, nWorkers=1)
+        self.assertEqual(array.shape, (80, 80))
+        self.assertEqual(array.chunks[0][:2], (8, 8))
+
+        result = compute(array)
+        for iSegment, file in zip([1, 2, 4], files):
+            np.testing.assert_array_equal(
+                result[(iSegment - 1) * 20:iSegment * 20],
+                calibrate(file, 'reflectance'))
+        # missing segment
+        self.assertTrue(np.isnan(result[40:60]).all())
+
+        # block mean, ignoring NaN
+        small = compute(downsample(array, 4))
+        self.assertEqual(small.shape, (20, 20))
+        expected = result.reshape(20, 4, 20, 4).transpose(0, 2, 1, 3)
+        expected = expected.reshape(20, 20, 16)
+        np.testing.assert_allclose(small[:10], expected[:10].mean(axis=2),
+                                   rtol=1e-5)
+        self.assertTrue(np.isnan(small[10:15]).all())
+
+        nearest = compute(downsample(array, 4, method='nearest'))
+        np.testing.assert_array_equal(nearest, result[2::4, 2::4])
+
+        for seg in segments:
+            seg.close()
+
+    def test_downsample_coords(self):
+        print('---> Test on downsampled coordinates')
+
+        coord = np.linspace(60, -60, 11)
+        np.testing.assert_allclose(downsample_coords(coord, 2),
+                                   [54, 30, 6, -18, -42])
+        self.assertIs(downsample_coords(coord, 1), coord)
+
+
+def main():
+
+    suite = unittest.TestSuite()
+
+    tests = [
+        Test('test_chunk_lines'),
+        Test('test_open_l2'),
+        Test('test_open_hsd'),
+        Test('test_downsample_coords')
+        ]   # setup the test list
+    suite.addTests(tests)
+
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+import sys
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from netCDF4 import Dataset
+
+projectDir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(projectDir, 'pyHimawari8'))
+
+import qa
+from qa import QAFilter, qa_mask, qa_variable
+from synthetic import write_l2
+
+
+class Test(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(self):
+        print('Start to test qa.py...')
+
+    @classmethod
+    def tearDownClass(self):
+        print('Finish testing qa.py!')
+
+    def setUp(self):
+        self.tmpDir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpDir)
+
+    def test_filter(self):
+        print('---> Test on decoding the QA bits')
+
+        # ARP: AOT confidence in bits 5-4, cloud in bit 2
+        flags = np.ma.masked_array(
+            [0b000000, 0b010000, 0b100000, 0b010100, 0b110000, 0],
+            mask=[0, 0, 0, 0, 0, 1], dtype=np.int16)
+        mask = QAFilter('AOT_confidence <= good  and not cloud').mask(
+            flags, 'QA_flag')
+        np.testing.assert_array_equal(mask, [1, 1, 0, 0, 0, 0])
+        np.testing.assert_array_equal(
+            QAFilter('cloud and aot_confidence = 1').mask(flags, 'QA_flag'),
+            [0, 0, 0, 1, 0, 0])
+
+        # CLP: retrieval in bits 2-0, sunglint in bit 8 (0 for yes), and the
+        # bit 15 of the signed integers
+        flags = np.array([0b101, 0b100, 0b011, 0b101 | 1 << 8,
+                          -32768 | 1 << 8 | 0b100], dtype=np.int16)
+        qaFilter = QAFilter('retrieval >= low_confidence and not sunglint')
+        np.testing.assert_array_equal(qaFilter.mask(flags, 'QA'),
+                                      [0, 0, 0, 1, 1])
+        np.testing.assert_array_equal(
+            QAFilter('inversion == no').mask(flags, 'QA'), [0, 0, 0, 0, 1])
+        # NaN of the float flags
+        np.testing.assert_array_equal(
+            qaFilter.mask(np.array([261, np.nan], dtype=np.float32), 'QA'),
+            [1, 0])
+
+        for expression, qaVariable in [('cloud', 'QA'),
+                                       ('retrieval <= best', 'QA'),
+                                       ('retrieval ~ 1', 'QA')]:
+            with self.assertRaises(ValueError):
+                QAFilter(expression).conditions(qaVariable)
+
+    def test_qa_mask(self):
+        print('---> Test on the masks of the L2 files')
+
+        file = os.path.join(self.tmpDir, 'ARP.nc')
+        flags = np.random.RandomState(0).randint(0, 2 ** 14, (121, 121))
+        write_l2(file, {'QA_flag': flags})
+
+        sl = (slice(10, 30), slice(5, 45))
+        with Dataset(file, 'r') as fd:
+            self.assertEqual(qa_variable(fd.variables), 'QA_flag')
+            mask = qa_mask(fd, 'not cloud', *sl)
+            np.testing.assert_array_equal(mask, (flags[sl] & 4) == 0)
+            self.assertFalse(mask.flags.writeable)
+
+            # cached for the other variables of the file
+            self.assertIs(qa_mask(fd, QAFilter('NOT  cloud'), *sl), mask)
+            self.assertIsNot(qa_mask(fd, 'not cloud', slice(0, 20), sl[1]),
+                             mask)
+            for iFile in range(qa.MASK_CACHE):
+                qa_mask(fd, 'not cloud', *sl, key=str(iFile))
+            self.assertIsNot(qa_mask(fd, 'not cloud', *sl), mask)
+
+        self.assertIsNone(qa_variable({'CLTH': None}))
+
+
+def main():
+
+    suite = unittest.TestSuite()
+
+    tests = [
+        Test('test_filter'),
+        Test('test_qa_mask')
+        ]   # setup the test list
+    suite.addTests(tests)
+
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
+
+
+if __name__ == '__main__':
+    main()
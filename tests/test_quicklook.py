@@ -0,0 +1,122 @@
+import sys
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from PIL import Image
+from matplotlib.colors import Normalize
+
+projectDir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(projectDir, 'pyHimawari8'))
+
+from colormap import chiljet_colormap, target_classification_colormap
+from quicklook import get_lut, get_class_lut, colorize_classes, \
+    border_mask, render_quicklook
+
+
+class Test(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(self):
+        print('Start to test quicklook.py...')
+
+    @classmethod
+    def tearDownClass(self):
+        print('Finish testing quicklook.py!')
+
+    def setUp(self):
+        self.tmpDir = tempfile.mkdtemp()
+        self.borderFile = os.path.join(self.tmpDir, 'border.dat')
+        with open(self.borderFile, 'w') as fh:
+            fh.write('>\n112 30\n118 30\n118 36\n')
+
+        self.lat = np.arange(40, 19.99, -0.1)
+        self.lon = np.arange(110, 120.01, 0.1)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpDir)
+
+    def test_lut(self):
+        print('---> Test on cached lookup tables')
+
+        lut = get_lut('chiljet')
+        self.assertIs(get_lut('chiljet'), lut)
+        self.assertFalse(lut.flags.writeable)
+
+        # same colors as matplotlib
+        cmap = chiljet_colormap()
+        values = np.linspace(-1, 16, 200)
+        expected = np.round(cmap(Normalize(0, 15)(values)) * 255)
+        np.testing.assert_array_equal(get_lut('chiljet')[np.clip(
+            np.floor(values / 15 * cmap.N), 0, cmap.N - 1).astype(int)],
+            expected)
+
+        table = get_class_lut('target_classification', 11, -0.5, 10.5)
+        self.assertEqual(table.shape, (12, 4))
+        cmap = target_classification_colormap()
+        expected = np.round(cmap(Normalize(-0.5, 10.5)(np.arange(11))) * 255)
+        np.testing.assert_array_equal(table[:11], expected)
+
+        data = np.ma.masked_array([[0, 3, 10, 11, -1, 5]],
+                                  mask=[[0, 0, 0, 0, 0, 1]])
+        rgba = colorize_classes(data, table)
+        np.testing.assert_array_equal(rgba[0, :3], table[[0, 3, 10]])
+        self.assertTrue((rgba[0, 3:, 3] == 0).all())
+
+    def test_border_mask(self):
+        print('---> Test on border mask')
+
+        mask = border_mask(self.lat, self.lon, file=self.borderFile)
+        self.assertIs(border_mask(self.lat, self.lon, file=self.borderFile),
+                      mask)
+
+        # horizontal line at 30N from 112E to 118E
+        self.assertTrue(mask[100, 20:81].all())
+        self.assertFalse(mask[100, 82:].any())
+        # vertical line at 118E from 30N to 36N
+        self.assertTrue(mask[40:101, 80].all())
+        self.assertEqual(mask.sum(), 61 + 60)
+
+    def test_render(self):
+        print('---> Test on quick-look rendering')
+
+        LON, LAT = np.meshgrid(self.lon, self.lat)
+        data = np.ma.masked_array(LAT - 20, mask=LON > 119)
+        imgFile = os.path.join(self.tmpDir, 'quicklook.png')
+
+        render_quicklook(data, self.lat, self.lon, imgFile, vmin=0,
+                         vmax=20, borderFile=self.borderFile)
+        # ascending latitude is flipped north up
+        render_quicklook(data[::-1], self.lat[::-1], self.lon,
+                         imgFile + '.flip.png', vmin=0, vmax=20,
+                         borderFile=self.borderFile)
+
+        with Image.open(imgFile) as image:
+            self.assertEqual(image.size, (len(self.lon), len(self.lat)))
+            rgba = np.asarray(image)
+        with Image.open(imgFile + '.flip.png') as image:
+            np.testing.assert_array_equal(np.asarray(image), rgba)
+
+        np.testing.assert_array_equal(rgba[100, 50], [0, 0, 0, 255])
+        self.assertTrue((rgba[:, -5:, 3] == 0).all())
+        np.testing.assert_array_equal(rgba[0, 0], get_lut('chiljet')[-1])
+
+
+def main():
+
+    suite = unittest.TestSuite()
+
+    tests = [
+        Test('test_lut'),
+        Test('test_border_mask'),
+        Test('test_render')
+        ]   # setup the test list
+    suite.addTests(tests)
+
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
+
+
+if __name__ == '__main__':
+    main()
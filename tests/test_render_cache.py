@@ -0,0 +1,133 @@
+import sys
+import os
+import shutil
+import tempfile
+import datetime as dt
+import unittest
+
+projectDir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(projectDir, 'pyHimawari8'))
+
+from render_cache import RenderCache, cached_render, render_key
+
+
+class FakeVisualizer(object):
+
+    def __init__(self, file):
+        self.file = file
+        self.product = 'CLTH'
+        self.mTime = dt.datetime(2020, 2, 19, 4, 0)
+        self.latRange = [15, 58]
+        self.lonRange = [70, 140]
+        self.nRender = 0
+
+    @cached_render(exclude=('segmentCache',))
+    def colorplot(self, imgFile, *args, axLatRange=[20, 60], cmap=None,
+                  segmentCache=None, **kwargs):
+        self.nRender = self.nRender + 1
+        with open(imgFile, 'w') as fh:
+            fh.write('image')
+
+
+class Test(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(self):
+        print('Start to test render_cache.py...')
+
+    @classmethod
+    def tearDownClass(self):
+        print('Finish testing render_cache.py!')
+
+    def setUp(self):
+        self.tmpDir = tempfile.mkdtemp()
+        self.dataFile = os.path.join(self.tmpDir, 'data.nc')
+        self.imgFile = os.path.join(self.tmpDir, 'img.png')
+        with open(self.dataFile, 'w') as fh:
+            fh.write('data')
+        self.cache = RenderCache(os.path.join(self.tmpDir, 'cache'))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpDir)
+
+    def test_skip(self):
+        print('---> Test on skipping unchanged image')
+
+        vis = FakeVisualizer(self.dataFile)
+        vis.colorplot(self.imgFile, vmin=0, vmax=15, cache=self.cache)
+        vis.colorplot(self.imgFile, vmin=0, vmax=15, cache=self.cache)
+        self.assertEqual(vis.nRender, 1)
+
+        # keywords in different forms give the same parameters
+        vis.colorplot(imgFile=self.imgFile, axLatRange=[20, 60],
+                      vmax=15, vmin=0, cache=self.cache)
+        self.assertEqual(vis.nRender, 1)
+
+        # changed parameters
+        vis.colorplot(self.imgFile, vmin=0, vmax=10, cache=self.cache)
+        self.assertEqual(vis.nRender, 2)
+
+        # changed input
+        with open(self.dataFile, 'a') as fh:
+            fh.write('more data')
+        vis.colorplot(self.imgFile, vmin=0, vmax=10, cache=self.cache)
+        self.assertEqual(vis.nRender, 3)
+
+        # removed image
+        os.remove(self.imgFile)
+        vis.colorplot(self.imgFile, vmin=0, vmax=10, cache=self.cache)
+        self.assertEqual(vis.nRender, 4)
+
+    def test_exclude(self):
+        print('---> Test on the arguments left out of the cache key')
+
+        vis = FakeVisualizer(self.dataFile)
+        vis.colorplot(self.imgFile, vmin=0, segmentCache=object(),
+                      cache=self.cache)
+        vis.colorplot(self.imgFile, vmin=0, segmentCache=object(),
+                      cache=self.cache)
+        self.assertEqual(vis.nRender, 1)
+
+        imgFile, inputs, params = render_key(
+            FakeVisualizer.colorplot, self.dataFile, (self.imgFile,),
+            {'vmin': 0, 'segmentCache': object()}, product=vis.product)
+        self.assertNotIn('segmentCache', params)
+
+        # no stable key of the other objects
+        with self.assertRaises(TypeError):
+            vis.colorplot(self.imgFile, vmin=0, norm=object(),
+                          cache=self.cache)
+        self.assertEqual(vis.nRender, 1)
+
+    def test_render_key(self):
+        print('---> Test on render key without Visualizer instance')
+
+        vis = FakeVisualizer(self.dataFile)
+        vis.colorplot(self.imgFile, vmin=0, vmax=15, cache=self.cache)
+
+        imgFile, inputs, params = render_key(
+            FakeVisualizer.colorplot, self.dataFile, (self.imgFile,),
+            {'vmin': 0, 'vmax': 15},
+            product=vis.product, mTime=vis.mTime,
+            latRange=vis.latRange, lonRange=vis.lonRange)
+        self.assertEqual(imgFile, self.imgFile)
+        self.assertTrue(self.cache.is_fresh(imgFile, inputs, params))
+
+
+def main():
+
+    suite = unittest.TestSuite()
+
+    tests = [
+        Test('test_skip'),
+        Test('test_exclude'),
+        Test('test_render_key')
+        ]   # setup the test list
+    suite.addTests(tests)
+
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+import sys
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from pyresample import create_area_def
+from pyresample.kd_tree import resample_nearest as kd_resample_nearest
+
+projectDir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(projectDir, 'pyHimawari8'))
+
+import resample_cache
+from resample_cache import get_resample_lut, resample_nearest
+
+
+class Test(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(self):
+        print('Start to test resample_cache.py...')
+
+    @classmethod
+    def tearDownClass(self):
+        print('Finish testing resample_cache.py!')
+
+    def setUp(self):
+        self.tmpDir = tempfile.mkdtemp()
+        self.srcArea = create_area_def(
+            'src', {'proj': 'geos', 'lon_0': 140.7, 'h': 35785863,
+                    'a': 6378137, 'rf': 298.257024882273},
+            width=200, height=200,
+            area_extent=[-5500000, -5500000, 5500000, 5500000])
+        self.dstArea = create_area_def(
+            'roi', {'proj': 'eqc', 'ellps': 'WGS84'},
+            width=50, height=40, area_extent=[70, 15, 140, 58],
+            units='degrees')
+        self.data = np.random.rand(200, 200).astype(np.float32)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpDir)
+        resample_cache._LUTS.clear()
+
+    def test_resample_nearest(self):
+        print('---> Test on resampling with lookup table')
+
+        radius = 150000
+        lut = get_resample_lut(self.srcArea, self.dstArea, radius=radius)
+        res = resample_nearest(self.data, lut, self.dstArea.shape)
+        expected = kd_resample_nearest(
+            self.srcArea, self.data, self.dstArea, radius, fill_value=None)
+
+        self.assertEqual(res.shape, (40, 50))
+        self.assertTrue(np.array_equal(np.isnan(res), expected.mask))
+        self.assertTrue(np.allclose(res[~expected.mask],
+                                    expected[~expected.mask]))
+
+    def test_persistence(self):
+        print('---> Test on persisted lookup table')
+
+        lut = get_resample_lut(self.srcArea, self.dstArea, radius=150000,
+                               cacheDir=self.tmpDir)
+        self.assertEqual(len(os.listdir(self.tmpDir)), 1)
+
+        resample_cache._LUTS.clear()
+        lutLoaded = get_resample_lut(self.srcArea, self.dstArea,
+                                     radius=150000, cacheDir=self.tmpDir)
+        self.assertTrue(np.array_equal(lut['input_index'],
+                                       lutLoaded['input_index']))
+        self.assertTrue(np.array_equal(lut['output_index'],
+                                       lutLoaded['output_index']))
+
+        # a different radius creates another lookup table
+        get_resample_lut(self.srcArea, self.dstArea, radius=100000,
+                         cacheDir=self.tmpDir)
+        self.assertEqual(len(os.listdir(self.tmpDir)), 2)
+
+
+def main():
+
+    suite = unittest.TestSuite()
+
+    tests = [
+        Test('test_resample_nearest'),
+        Test('test_persistence')
+        ]   # setup the test list
+    suite.addTests(tests)
+
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+import sys
+import os
+import time
+import shutil
+import tempfile
+import unittest
+import numpy as np
+
+projectDir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(projectDir, 'pyHimawari8'))
+
+from hsd import HSDSegment, write_segment
+from segment_cache import SegmentCache
+
+
+class Test(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(self):
+        print('Start to test segment_cache.py...')
+
+    @classmethod
+    def tearDownClass(self):
+        print('Finish testing segment_cache.py!')
+
+    def setUp(self):
+        self.tmpDir = tempfile.mkdtemp()
+        self.cacheDir = os.path.join(self.tmpDir, 'cache')
+        self.counts = np.arange(20 * 110, dtype='u2').reshape(20, 110)
+
+        self.files = []
+        for segment in range(1, 4):
+            file = os.path.join(
+                self.tmpDir,
+                'HS_H08_20200219_0400_B01_FLDK_R10_S{0:02d}10.DAT.bz2'.format(
+                    segment))
+            write_segment(file, self.counts, band=1, segment=segment)
+            self.files.append(file)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpDir)
+
+    def test_get_many(self):
+        print('---> Test on decompressed segments')
+
+        cache = SegmentCache(self.cacheDir, nWorkers=3)
+        cacheFiles = cache.get_many(self.files)
+
+        self.assertEqual(
+            [os.path.basename(file) for file in cacheFiles],
+            [os.path.basename(file)[:-4] for file in self.files])
+
+        with HSDSegment(cacheFiles[1]) as seg:
+            self.assertEqual(seg.segment, 2)
+            self.assertTrue(np.array_equal(seg.counts, self.counts))
+
+        # cache hit refreshes the mtime
+        os.utime(cacheFiles[0], (0, 0))
+        self.assertEqual(cache.get(self.files[0]), cacheFiles[0])
+        self.assertGreater(os.path.getmtime(cacheFiles[0]), 0)
+
+        # uncompressed segment is not cached
+        self.assertEqual(cache.get(cacheFiles[2]), cacheFiles[2])
+
+        # HSD reader resolves the segment through the cache
+        seg = HSDSegment(self.files[2], cache=cache)
+        self.assertEqual(seg.file, cacheFiles[2])
+        self.assertFalse(seg.compressed)
+        seg.close()
+
+    def test_evict(self):
+        print('---> Test on LRU eviction')
+
+        size = os.path.getsize(
+            SegmentCache(self.cacheDir).get(self.files[0]))
+
+        cache = SegmentCache(self.cacheDir, maxSize=2 * size, nWorkers=1)
+        cacheFiles = cache.get_many(self.files[:2])
+        time.sleep(0.01)
+        cache.get(self.files[0])   # most recently used
+        time.sleep(0.01)
+        cache.get(self.files[2])
+
+        self.assertTrue(os.path.exists(cacheFiles[0]))
+        self.assertFalse(os.path.exists(cacheFiles[1]))
+        self.assertEqual(len(cache.entries()), 2)
+
+
+def main():
+
+    suite = unittest.TestSuite()
+
+    tests = [
+        Test('test_get_many'),
+        Test('test_evict')
+        ]   # setup the test list
+    suite.addTests(tests)
+
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
+
+
+if __name__ == '__main__':
+    main()
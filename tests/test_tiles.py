@@ -0,0 +1,169 @@
+import sys
+import os
+import json
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from PIL import Image
+
+projectDir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(projectDir, 'pyHimawari8'))
+
+from colormap import colormap_lut, apply_colormap
+from tiles import render_tiles, tile_bounds, tile_range
+
+
+class Test(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(self):
+        print('Start to test tiles.py...')
+
+    @classmethod
+    def tearDownClass(self):
+        print('Finish testing tiles.py!')
+
+    def setUp(self):
+        self.tmpDir = tempfile.mkdtemp()
+
+        # regular grid like the L2 products, descending latitude
+        self.lat = np.arange(50, 19.9, -0.25)
+        self.lon = np.arange(110, 130.01, 0.25)
+        LON, LAT = np.meshgrid(self.lon, self.lat)
+        self.data = np.ma.masked_array(LAT - 20, mask=(LON > 128))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpDir)
+
+    def test_apply_colormap(self):
+        print('---> Test on colormap lookup table')
+
+        lut = colormap_lut('viridis', N=10)
+        self.assertEqual(lut.shape, (10, 4))
+        self.assertEqual(lut.dtype, np.uint8)
+
+        data = np.ma.masked_array([-1, 0, 0.55, 1, 2, np.nan],
+                                  mask=[0, 0, 0, 0, 1, 0])
+        rgba = apply_colormap(data, lut, 0, 1)
+        np.testing.assert_array_equal(rgba[0], lut[0])
+        np.testing.assert_array_equal(rgba[1], lut[0])
+        np.testing.assert_array_equal(rgba[2], lut[5])
+        np.testing.assert_array_equal(rgba[3], lut[9])
+        self.assertTrue((rgba[4:, 3] == 0).all())
+
+    def test_tile_range(self):
+        print('---> Test on tile range')
+
+        xRange, yRange = tile_range(3, [20, 50], [110, 130])
+        for x in xRange:
+            for y in yRange:
+                west, south, east, north = tile_bounds(3, x, y)
+                self.assertTrue(east > 110 and west < 130)
+                self.assertTrue(north > 20 and south < 50)
+
+        # full disk across the antimeridian
+        xRange, yRange = tile_range(2, [-60, 60], [80, 200])
+        self.assertEqual(list(xRange), [2, 3, 4])
+
+    def test_incremental(self):
+        print('---> Test on skipping unchanged tiles')
+
+        outDir = os.path.join(self.tmpDir, 'tiles')
+        counts = render_tiles(self.data, self.lat, self.lon, outDir,
+                              vmin=0, vmax=30, cmap='viridis',
+                              zooms=[0, 4, 5], nWorkers=1)
+        self.assertGreater(counts['written'], 0)
+        self.assertTrue(os.path.exists(os.path.join(outDir, '0/0/0.png')))
+
+        with Image.open(os.path.join(outDir, '0/0/0.png')) as image:
+            self.assertEqual(image.size, (256, 256))
+            self.assertEqual(image.mode, 'RGBA')
+
+        with open(os.path.join(outDir, 'tiles.json'), 'r') as fh:
+            manifest = json.load(fh)['tiles']
+        self.assertEqual(len(manifest), sum(counts.values()))
+
+        counts2 = render_tiles(self.data, self.lat, self.lon, outDir,
+                               vmin=0, vmax=30, cmap='viridis',
+                               zooms=[0, 4, 5], nWorkers=1)
+        self.assertEqual(counts2['skipped'], sum(counts.values()))
+
+        # only the tiles over the changed corner are rendered again
+        data = self.data.copy()
+        data[0:4, 0:4] = 5
+        counts3 = render_tiles(data, self.lat, self.lon, outDir,
+                               vmin=0, vmax=30, cmap='viridis',
+                               zooms=[0, 4, 5], nWorkers=1)
+        self.assertGreater(counts3['written'], 0)
+        self.assertLess(counts3['written'], counts['written'])
+
+        # style change renders all the tiles
+        counts4 = render_tiles(data, self.lat, self.lon, outDir,
+                               vmin=0, vmax=20, cmap='viridis',
+                               zooms=[0, 4, 5], nWorkers=1)
+        self.assertEqual(counts4['skipped'], 0)
+
+    def test_parallel(self):
+        print('---> Test on parallel rendering')
+
+        serialDir = os.path.join(self.tmpDir, 'serial')
+        parallelDir = os.path.join(self.tmpDir, 'parallel')
+        render_tiles(self.data, self.lat, self.lon, serialDir, vmin=0,
+                     vmax=30, zooms=[3, 5], nWorkers=1)
+        render_tiles(self.data, self.lat, self.lon, parallelDir, vmin=0,
+                     vmax=30, zooms=[3, 5], nWorkers=2)
+
+        with open(os.path.join(serialDir, 'tiles.json'), 'r') as fh:
+            manifest = json.load(fh)['tiles']
+        with open(os.path.join(parallelDir, 'tiles.json'), 'r') as fh:
+            self.assertEqual(json.load(fh)['tiles'], manifest)
+
+        for key, entry in manifest.items():
+            if entry['empty']:
+                continue
+            with Image.open(os.path.join(serialDir, key + '.png')) as im1, \
+                    Image.open(os.path.join(parallelDir, key + '.png')) as \
+                    im2:
+                np.testing.assert_array_equal(np.asarray(im1),
+                                              np.asarray(im2))
+
+    def test_antimeridian(self):
+        print('---> Test on grid across the antimeridian')
+
+        lat = np.arange(10, -10.01, -0.5)
+        lon = np.arange(170, 190.01, 0.5)
+        data = np.ones((len(lat), len(lon)))
+
+        outDir = os.path.join(self.tmpDir, 'tiles')
+        render_tiles(data, lat, lon, outDir, vmin=0, vmax=2, zooms=[1],
+                     nWorkers=1)
+        self.assertTrue(os.path.exists(os.path.join(outDir, '1/0/0.png')))
+        self.assertTrue(os.path.exists(os.path.join(outDir, '1/1/0.png')))
+
+        with Image.open(os.path.join(outDir, '1/0/0.png')) as image:
+            alpha = np.asarray(image)[:, :, 3]
+        # west tile is covered from 180 to 190, about 14 pixels
+        self.assertTrue((alpha[-1, 0:13] == 255).all())
+        self.assertTrue((alpha[-1, 16:] == 0).all())
+
+
+def main():
+
+    suite = unittest.TestSuite()
+
+    tests = [
+        Test('test_apply_colormap'),
+        Test('test_tile_range'),
+        Test('test_incremental'),
+        Test('test_parallel'),
+        Test('test_antimeridian')
+        ]   # setup the test list
+    suite.addTests(tests)
+
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+import sys
+import os
+import shutil
+import tempfile
+import datetime as dt
+import unittest
+import numpy as np
+import dask.array as da
+
+projectDir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(projectDir, 'pyHimawari8'))
+
+from timecube import TimeCube, ingest
+from synthetic import write_l2
+
+
+class Test(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(self):
+        print('Start to test timecube.py...')
+
+    @classmethod
+    def tearDownClass(self):
+        print('Finish testing timecube.py!')
+
+    def setUp(self):
+        self.tmpDir = tempfile.mkdtemp()
+        self.storeDir = os.path.join(self.tmpDir, 'cube')
+        self.tStart = dt.datetime(2020, 2, 19, 4, 0)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpDir)
+
+    def write_file(self, mTime, value):
+        """
+        L2 file on a 1-degree grid with a constant CLTH and masked pixels.
+        """
+
+        file = os.path.join(self.tmpDir, 'NC_H08_{0}_L2CLP010_FLDK.nc'.format(
+            mTime.strftime('%Y%m%d_%H%M')))
+        mask = np.zeros((121, 121), dtype=bool)
+        mask[20, 40] = True
+
+        return write_l2(file, {'CLTH': np.full((121, 121), value),
+                               'CLTYPE': np.full((121, 121), 3)},
+                        masks={'CLTH': mask})
+
+    def test_ingest(self):
+        print('---> Test on ingesting L2 files')
+
+        cube = TimeCube(self.storeDir, 'CLP')
+        files = [(self.tStart + dt.timedelta(minutes=10 * i), i)
+                 for i in [0, 1, 3]]
+        for mTime, value in files:
+            self.assertTrue(cube.ingest(
+                self.write_file(mTime, value), ['CLTH'], mTime,
+                latRange=[20, 50], lonRange=[110, 130], chunks=(6, 16, 16)))
+
+        # slots since 2020-02-19 00:00
+        self.assertEqual(len(cube), 24 + 4)
+        self.assertEqual(cube.times, [mTime for mTime, _ in files])
+        self.assertEqual(cube.group['CLTH'].shape, (28, 31, 21))
+        self.assertEqual(cube.group['CLTH'].chunks, (6, 16, 16))
+        np.testing.assert_array_equal(cube.lat, np.linspace(50, 20, 31))
+
+        # already ingested
+        mTime = self.tStart + dt.timedelta(minutes=10)
+        file = self.write_file(mTime, 9)
+        self.assertFalse(cube.ingest(file, ['CLTH'], mTime,
+                                     latRange=[20, 50], lonRange=[110, 130]))
+        self.assertTrue(cube.ingest(file, ['CLTH'], mTime, latRange=[20, 50],
+                                    lonRange=[110, 130], overwrite=True))
+        # another time of the filled slot
+        self.assertFalse(cube.ingest(
+            self.write_file(mTime + dt.timedelta(minutes=5), 7), ['CLTH'],
+            mTime + dt.timedelta(minutes=5), latRange=[20, 50],
+            lonRange=[110, 130]))
+        self.assertEqual(cube.times[1], mTime)
+        self.assertEqual(cube.group['CLTH'][25, 5, 5], 9)
+
+        # new variable
+        cube.ingest(file, ['CLTH', 'CLTYPE'], mTime, latRange=[20, 50],
+                    lonRange=[110, 130], overwrite=True)
+        self.assertEqual(sorted(cube.variables), ['CLTH', 'CLTYPE'])
+        self.assertEqual(cube.group['CLTYPE'].shape, (28, 31, 21))
+
+        with self.assertRaises(ValueError):
+            cube.ingest(file, ['CLTH'], mTime, latRange=[20, 40],
+                        lonRange=[110, 130])
+        with self.assertRaises(ValueError):
+            cube.ingest(file, ['CLTH'], dt.datetime(2020, 2, 18, 23, 50),
+                        latRange=[20, 50], lonRange=[110, 130])
+
+    def test_load(self):
+        print('---> Test on loading frames')
+
+        files = [('CLP', self.tStart + dt.timedelta(minutes=10 * i),
+                  self.write_file(self.tStart + dt.timedelta(minutes=10 * i),
+                                  i))
+                 for i in [0, 1, 3]]
+        files.append(('ARP', self.tStart, files[0][2]))
+        self.assertEqual(ingest(files, self.storeDir, {'CLP': ['CLTH']},
+                                latRange=[20, 50], lonRange=[110, 130]), 3)
+
+        cube = TimeCube(self.storeDir, 'CLP', mode='r')
+        data, times, lat, lon = cube.load(
+            ['CLTH'], self.tStart, self.tStart + dt.timedelta(minutes=40))
+        self.assertEqual(times, [self.tStart, files[1][1], None, files[2][1]])
+        self.assertEqual(data['CLTH'].shape, (4, 31, 21))
+        self.assertEqual(data['CLTH'].dtype, np.float32)
+        np.testing.assert_array_equal(data['CLTH'][:, 5, 5], [0, 1, np.nan,
+                                                              3])
+        # masked pixel at 40N 120E
+        self.assertTrue(np.isnan(data['CLTH'][[0, 1, 3], 10, 10]).all())
+
+        # single frame, lazily
+        data, times, _, _ = cube.load(['CLTH'], files[2][1], lazy=True)
+        self.assertIsInstance(data['CLTH'], da.Array)
+        self.assertEqual(times, [files[2][1]])
+        self.assertEqual(float(data['CLTH'][0, 5, 5].compute()), 3)
+
+        # beyond the end
+        data, times, _, _ = cube.load(['CLTH'], dt.datetime(2020, 2, 20))
+        self.assertEqual(data['CLTH'].shape[0], 0)
+
+        with self.assertRaises(FileNotFoundError):
+            TimeCube(self.storeDir, 'ARP', mode='r')
+
+
+def main():
+
+    suite = unittest.TestSuite()
+
+    tests = [
+        Test('test_ingest'),
+        Test('test_load')
+        ]   # setup the test list
+    suite.addTests(tests)
+
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
+
+
+if __name__ == '__main__':
+    main()
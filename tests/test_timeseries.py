@@ -0,0 +1,175 @@
+import sys
+import os
+import shutil
+import tempfile
+import datetime as dt
+import unittest
+import numpy as np
+from netCDF4 import Dataset
+
+projectDir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(projectDir, 'pyHimawari8'))
+
+from timeseries import find_files, point_index, extract_points, \
+    extract_box, to_dataframe
+from synthetic import write_l2
+
+
+class Test(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(self):
+        print('Start to test timeseries.py...')
+
+    @classmethod
+    def tearDownClass(self):
+        print('Finish testing timeseries.py!')
+
+    def setUp(self):
+        self.tmpDir = tempfile.mkdtemp()
+        self.tStart = dt.datetime(2020, 2, 19, 4, 0)
+
+        # AOT = hour + 0.01 * (lat index) + 0.0001 * (lon index)
+        self.files = []
+        for iTime in range(4):
+            mTime = self.tStart + dt.timedelta(minutes=10 * iTime)
+            fileDir = os.path.join(self.tmpDir, 'ARP', '021',
+                                   mTime.strftime('%Y%m/%d/%H'))
+            os.makedirs(fileDir, exist_ok=True)
+            file = os.path.join(
+                fileDir, 'NC_H08_{0}_L2ARP021_FLDK.02401_02401.nc'.format(
+                    mTime.strftime('%Y%m%d_%H%M')))
+            ROWS, COLS = np.meshgrid(np.arange(121), np.arange(121),
+                                     indexing='ij')
+            mask = np.zeros((121, 121), dtype=bool)
+            mask[30, 50] = iTime == 1
+            write_l2(file, {'AOT': iTime + 0.01 * ROWS + 0.0001 * COLS},
+                     masks={'AOT': mask})
+            self.files.append(file)
+
+        # other products and times are skipped
+        with open(os.path.join(fileDir, 'NC_H08_20200219_0440_L2ARP021_'
+                               'FLDK.02401_02401.nc'), 'w') as fh:
+            fh.write('corrupted')
+        open(os.path.join(fileDir, 'NC_H08_20200219_0410_L2CLP010_'
+                          'FLDK.02401_02401.nc'), 'w').close()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpDir)
+
+    def test_find_files(self):
+        print('---> Test on finding files')
+
+        files = find_files(self.tmpDir, 'ARP', self.tStart,
+                           self.tStart + dt.timedelta(minutes=40))
+        self.assertEqual(files[:4], self.files)
+        self.assertEqual(len(files), 5)
+        self.assertEqual(find_files(self.tmpDir, 'ARP', self.tStart,
+                                    self.tStart, version='020'), [])
+
+    def test_points(self):
+        print('---> Test on point time series')
+
+        points = [(30.2, 100.4), (30, 130), (70, 120), (-60.4, 199.6)]
+        with Dataset(self.files[0], 'r') as fd:
+            rows, cols = point_index(fd, points)
+            self.assertIs(point_index(fd, points)[0], rows)
+        np.testing.assert_array_equal(rows, [30, 30, -1, 120])
+        np.testing.assert_array_equal(cols, [20, 50, -1, 120])
+
+        series = extract_points(self.files, ['AOT'], points, nWorkers=1)
+        self.assertEqual(series['time'][-1],
+                         self.tStart + dt.timedelta(minutes=30))
+        self.assertEqual(series['AOT'].shape, (4, 4))
+        self.assertEqual(series['lat'].shape, (4, 4))
+        np.testing.assert_allclose(series['lat'][:, [0, 1, 3]],
+                                   [[30, 30, -60]] * 4)
+        self.assertTrue(np.isnan(series['lon'][:, 2]).all())
+
+        expected = np.arange(4)[:, np.newaxis] + \
+            np.array([0.302, 0.305, np.nan, 1.212])
+        expected[1, 1] = np.nan   # masked
+        np.testing.assert_allclose(series['AOT'], expected, rtol=1e-5)
+
+        # in parallel, with a corrupted file
+        parallel = extract_points(
+            self.files + [self.files[0].replace('0400', '0440')], ['AOT'],
+            points, nWorkers=2)
+        np.testing.assert_array_equal(parallel['AOT'][:4], series['AOT'])
+        self.assertTrue(np.isnan(parallel['AOT'][4]).all())
+
+        df = to_dataframe(series)
+        self.assertEqual(list(df.columns),
+                         ['time', 'point', 'lat', 'lon', 'AOT'])
+        self.assertEqual(len(df), 16)
+        self.assertAlmostEqual(df['AOT'][4], 1.302, places=5)
+        self.assertEqual(df['time'][5], self.tStart +
+                         dt.timedelta(minutes=10))
+
+    def test_box(self):
+        print('---> Test on box time series')
+
+        series = extract_box(self.files, ['AOT'], [29, 31], [129, 131],
+                             nWorkers=2)
+        self.assertEqual(series['AOT'].shape, (4, 3, 3))
+        np.testing.assert_array_equal(series['lat'], [31, 30, 29])
+        self.assertAlmostEqual(series['AOT'][2, 1, 1], 2.305, places=5)
+        self.assertTrue(np.isnan(series['AOT'][1, 1, 1]))
+
+        df = to_dataframe(series)
+        self.assertEqual(list(df.columns), ['time', 'lat', 'lon', 'AOT'])
+        self.assertEqual(len(df), 36)
+        self.assertEqual(df['lon'][1], 130)
+
+    def test_grids(self):
+        print('---> Test on files of another grid')
+
+        # 2-degree grid of the same product and time
+        coarseFile = os.path.join(
+            os.path.dirname(self.files[0]),
+            'NC_H08_20200219_0400_L2ARP021_FLDK.00061_00061.nc')
+        ROWS, COLS = np.meshgrid(np.arange(61), np.arange(61), indexing='ij')
+        write_l2(coarseFile, {'AOT': 10 + 0.01 * ROWS + 0.0001 * COLS},
+                 lat=np.linspace(60, -60, 61), lon=np.linspace(80, 200, 61))
+
+        tStop = self.tStart + dt.timedelta(minutes=40)
+        self.assertEqual(find_files(self.tmpDir, 'ARP', self.tStart, tStop,
+                                    resolution=61), [coarseFile])
+        self.assertNotIn(coarseFile, find_files(
+            self.tmpDir, 'ARP', self.tStart, tStop, resolution='02401'))
+
+        # the box of the first grid only
+        files = [self.files[0], coarseFile, self.files[2]]
+        series = extract_box(files, ['AOT'], [29, 31], [129, 131],
+                             nWorkers=1)
+        self.assertEqual(series['AOT'].shape, (3, 3, 3))
+        self.assertTrue(np.isnan(series['AOT'][1]).all())
+        self.assertAlmostEqual(series['AOT'][2, 1, 1], 2.305, places=5)
+
+        # the points on the grid of each file
+        series = extract_points(files, ['AOT'], [(31.2, 130.9)],
+                                nWorkers=2)
+        np.testing.assert_allclose(series['lat'][:, 0], [31, 32, 31])
+        np.testing.assert_allclose(series['lon'][:, 0], [131, 130, 131])
+        np.testing.assert_allclose(series['AOT'][:, 0],
+                                   [0.2951, 10.1425, 2.2951], rtol=1e-5)
+
+
+def main():
+
+    suite = unittest.TestSuite()
+
+    tests = [
+        Test('test_find_files'),
+        Test('test_points'),
+        Test('test_box'),
+        Test('test_grids')
+        ]   # setup the test list
+    suite.addTests(tests)
+
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
+
+
+if __name__ == '__main__':
+    main()
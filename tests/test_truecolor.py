@@ -0,0 +1,138 @@
+import sys
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+
+projectDir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(projectDir, 'pyHimawari8'))
+
+from hsd import write_segment
+from calibration import calibrate
+from truecolor import output_grid, stream_band, enhance, true_color
+
+
+class Test(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(self):
+        print('Start to test truecolor.py...')
+
+    @classmethod
+    def tearDownClass(self):
+        print('Finish testing truecolor.py!')
+
+    def setUp(self):
+        self.tmpDir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpDir)
+
+    def write_band(self, band, nColumns, *, counts=None,
+                   segments=(1, 2, 3, 4), seed=0):
+        """
+        segments of a coarse full disk, 4 segments of 11000 / nColumns km.
+        """
+
+        rng = np.random.RandomState(seed)
+        files = []
+        for segment in segments:
+            if counts is None:
+                data = rng.randint(0, 2048, (nColumns // 4, nColumns))
+                data[rng.rand(*data.shape) < 0.05] = 65535
+            else:
+                data = np.full((nColumns // 4, nColumns), counts)
+            file = os.path.join(
+                self.tmpDir, 'HS_H08_20200219_0400_B{0:02d}_FLDK_R10_'
+                'S{1:02d}04.DAT'.format(band, segment))
+            write_segment(file, data, band=band, segment=segment,
+                          nSegments=4)
+            files.append(file)
+
+        return files
+
+    def test_stream_band(self):
+        print('---> Test on block averaging while reading')
+
+        # 50 km disk, blocks of 6 pixels straddle the 55-line segments
+        files = self.write_band(3, 220)
+        full = np.concatenate([calibrate(file) for file in files])
+
+        rows, columns = slice(5, 30), slice(3, 20)
+        data = stream_band(files, rows, columns, 300,
+                           chunkBytes=220 * 4 * 7)
+        self.assertEqual(data.shape, (25, 17))
+
+        blocks = full[30:180, 18:120].reshape(25, 6, 17, 6)
+        with np.errstate(invalid='ignore'):
+            expected = np.nanmean(blocks, axis=(1, 3))
+        np.testing.assert_allclose(data, expected, rtol=1e-5)
+
+        # missing segments, partial block at line 108-113
+        data = stream_band(files[:2], rows, columns, 300)
+        self.assertTrue(np.isfinite(data[:14]).all())
+        self.assertTrue(np.isnan(data[14:]).all())
+        partial = np.nanmean(full[108:110, 18:120].reshape(2, 17, 6),
+                             axis=(0, 2))
+        np.testing.assert_allclose(data[13], partial, rtol=1e-5)
+
+    def test_enhance(self):
+        print('---> Test on gamma enhancement')
+
+        reflectance = np.array([-5, 0, 25, 100, 150, np.nan],
+                               dtype=np.float32)
+        result = enhance(reflectance, gamma=2)
+        self.assertIs(result, reflectance)
+        self.assertEqual(result.dtype, np.float32)
+        np.testing.assert_allclose(result[:5], [0, 0, 0.5, 1, 1], rtol=1e-6)
+        self.assertTrue(np.isnan(result[5]))
+
+    def test_true_color(self):
+        print('---> Test on true-color image')
+
+        bandFiles = {3: self.write_band(3, 220, counts=1000),
+                     2: self.write_band(2, 110, counts=500),
+                     1: self.write_band(1, 110, counts=200,
+                                        segments=(1, 2, 3))}
+
+        latRange, lonRange = [-70, 70], [50, 230]
+        rgba = true_color(bandFiles, latRange, lonRange, 50, resolution=100)
+        self.assertEqual(rgba.shape, (50, 50, 4))
+        self.assertEqual(rgba.dtype, np.float32)
+
+        lat, lon = output_grid(latRange, lonRange, 50)
+        self.assertAlmostEqual(lat[0], 68.6)
+        self.assertAlmostEqual(lon[0], 51.8)
+
+        # sub-satellite point
+        iLat = np.argmin(np.abs(lat - 5))
+        iLon = np.argmin(np.abs(lon - 140.7))
+        reflectance = (0.38 * np.array([1000, 500, 200]) - 7.6) * 0.15
+        np.testing.assert_allclose(rgba[iLat, iLon],
+                                   list((reflectance / 100) ** (1 / 2.2)) +
+                                   [1], rtol=1e-5)
+
+        # outside the disk
+        self.assertTrue((rgba[:, 0] == 0).all())
+        # missing segment of the blue band
+        self.assertTrue((rgba[-10:, iLon] == 0).all())
+
+
+def main():
+
+    suite = unittest.TestSuite()
+
+    tests = [
+        Test('test_stream_band'),
+        Test('test_enhance'),
+        Test('test_true_color')
+        ]   # setup the test list
+    suite.addTests(tests)
+
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
+
+
+if __name__ == '__main__':
+    main()
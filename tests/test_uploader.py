@@ -0,0 +1,145 @@
+import sys
+import os
+import time
+import shutil
+import tempfile
+import threading
+import datetime as dt
+import unittest
+
+projectDir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(projectDir, 'pyHimawari8'))
+
+from uploader import Uploader
+from render_cache import RenderCache
+
+
+class FakeByPy(object):
+    """
+    local stand-in of `ByPy`, which records the calls.
+    """
+
+    lock = threading.Lock()
+    calls = []
+    failures = {}   # number of failures of each file
+    delay = 0.05
+
+    def mkdir(self, remotepath):
+        with self.lock:
+            self.calls.append(('mkdir', remotepath))
+        return 0
+
+    def upload(self, localpath, remotepath):
+        time.sleep(self.delay)
+        with self.lock:
+            self.calls.append(('upload', localpath, remotepath))
+            if self.failures.get(localpath, 0) > 0:
+                self.failures[localpath] -= 1
+                return 31064   # error code of ByPy
+        return 0
+
+
+class Test(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(self):
+        print('Start to test uploader.py...')
+
+    @classmethod
+    def tearDownClass(self):
+        print('Finish testing uploader.py!')
+
+    def setUp(self):
+        FakeByPy.calls = []
+        FakeByPy.failures = {}
+        self.mTime = dt.datetime(2020, 2, 19, 4, 0)
+
+    def test_concurrent(self):
+        print('---> Test on concurrent uploads')
+
+        files = ['img_{0}.png'.format(i) for i in range(8)]
+
+        t0 = time.time()
+        with Uploader(FakeByPy, 'himawari8', nThreads=4) as uploader:
+            for file in files:
+                uploader.submit(self.mTime, file)
+            uploader.submit(self.mTime + dt.timedelta(days=1), 'next.png')
+            failed = uploader.close()
+        duration = time.time() - t0
+
+        self.assertEqual(failed, [])
+        self.assertLess(duration, 9 * FakeByPy.delay)
+
+        mkdirs = [call[1] for call in FakeByPy.calls if call[0] == 'mkdir']
+        self.assertEqual(sorted(mkdirs), ['himawari8', 'himawari8/20200219',
+                                          'himawari8/20200220'])
+
+        uploads = [call[1:] for call in FakeByPy.calls if call[0] == 'upload']
+        self.assertEqual(len(uploads), 9)
+        self.assertIn(('img_0.png', 'himawari8/20200219'), uploads)
+        self.assertIn(('next.png', 'himawari8/20200220'), uploads)
+
+    def test_retry(self):
+        print('---> Test on retries of failed uploads')
+
+        FakeByPy.failures = {'flaky.png': 2, 'broken.png': 10}
+
+        uploader = Uploader(FakeByPy, 'himawari8', nThreads=2, retries=2,
+                            backoff=0)
+        uploader.submit(self.mTime, 'flaky.png')
+        uploader.submit(self.mTime, 'broken.png')
+        failed = uploader.close()
+
+        self.assertEqual(failed, ['broken.png'])
+        uploads = [call[1] for call in FakeByPy.calls if call[0] == 'upload']
+        self.assertEqual(uploads.count('flaky.png'), 3)
+        self.assertEqual(uploads.count('broken.png'), 3)
+
+    def test_cache(self):
+        print('---> Test on skipping the uploaded images')
+
+        tmpDir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpDir)
+        cache = RenderCache(os.path.join(tmpDir, 'cache'))
+        files = [os.path.join(tmpDir, name)
+                 for name in ['ok.png', 'broken.png', 'TRC.jpg']]
+        for file in files:
+            with open(file, 'w') as fh:
+                fh.write('image')
+        for file in files[:2]:
+            cache.update(file, [], {})
+        FakeByPy.failures = {files[1]: 1}
+
+        # the failed and the uncached images are uploaded again
+        for iRun in range(2):
+            with Uploader(FakeByPy, 'himawari8', retries=0,
+                          cache=cache) as uploader:
+                for file in files:
+                    uploader.submit(self.mTime, file)
+        uploads = [call[1] for call in FakeByPy.calls if call[0] == 'upload']
+        self.assertEqual([uploads.count(file) for file in files], [1, 2, 2])
+        self.assertTrue(cache.is_uploaded(files[1]))
+        self.assertTrue(cache.is_fresh(files[1], [], {}))
+
+        # re-rendered
+        cache.update(files[0], [], {'vmax': 10})
+        self.assertFalse(cache.is_uploaded(files[0]))
+
+
+def main():
+
+    suite = unittest.TestSuite()
+
+    tests = [
+        Test('test_concurrent'),
+        Test('test_retry'),
+        Test('test_cache')
+        ]   # setup the test list
+    suite.addTests(tests)
+
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,258 @@
+import sys
+import os
+import shutil
+import tempfile
+import datetime as dt
+import unittest
+from unittest import mock
+import numpy as np
+import matplotlib.pyplot as plt
+
+projectDir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(projectDir, 'pyHimawari8'))
+
+import visualizer
+from visualizer import Visualizer
+from hsd import write_segment
+from calibration import calibrate
+from timecube import TimeCube
+from synthetic import write_l2, offline_basemap
+
+
+class Test(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(self):
+        print('Start to test visualizer.py...')
+
+    @classmethod
+    def tearDownClass(self):
+        print('Finish testing visualizer.py!')
+
+    def setUp(self):
+        self.tmpDir = tempfile.mkdtemp()
+        self.mTime = dt.datetime(2020, 2, 19, 4, 0)
+        self.file = os.path.join(
+            self.tmpDir, 'NC_H08_20200219_0400_L2CLP010_FLDK.02401_02401.nc')
+        write_l2(self.file, {'CLTH': np.zeros((121, 121))})
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpDir)
+
+    def test_load_variables(self):
+        print('---> Test on loading several variables in one pass')
+
+        ROWS, COLS = np.meshgrid(np.arange(121), np.arange(121),
+                                 indexing='ij')
+        mask = np.zeros((121, 121), dtype=bool)
+        mask[20, 40] = True
+        write_l2(self.file, {'CLTYPE': (ROWS + COLS) % 11,
+                             'CLTH': 0.01 * ROWS + 0.0001 * COLS},
+                 masks={'CLTH': mask})
+
+        vis = Visualizer(self.file)
+        vis.load_variables(['CLTYPE', 'CLTH'], self.mTime)
+
+        self.assertEqual(sorted(vis.variables), ['CLTH', 'CLTYPE'])
+        roi = (slice(10, 41), slice(30, 51))
+        np.testing.assert_array_equal(vis.variables['CLTYPE']['data'],
+                                      ((ROWS + COLS) % 11)[roi])
+        np.testing.assert_allclose(vis.variables['CLTH']['data'],
+                                   (0.01 * ROWS + 0.0001 * COLS)[roi],
+                                   rtol=1e-6)
+        # masked pixel at 40N 120E
+        self.assertTrue(vis.variables['CLTH']['data'].mask[10, 10])
+        self.assertEqual(vis.variables['CLTH']['data'].count(), 31 * 21 - 1)
+        self.assertEqual(vis.variables['CLTH']['unit'], 'km')
+        self.assertEqual(vis.variables['CLTH']['long_name'],
+                         'Cloud Top Height')
+        self.assertEqual(vis.variables['CLTYPE']['unit'], 'none')
+        self.assertEqual(vis.variables['CLTYPE']['long_name'], 'Cloud Type')
+        np.testing.assert_array_equal(vis.lat, np.linspace(50, 20, 31))
+
+        # the first one is selected
+        self.assertEqual(vis.product, 'CLTYPE')
+        self.assertIs(vis.data, vis.variables['CLTYPE']['data'])
+        vis.select('CLTH')
+        self.assertEqual(
+            [vis.product, vis.unit, vis.long_name],
+            ['CLTH', 'km', 'Cloud Top Height'])
+        self.assertIs(vis.data, vis.variables['CLTH']['data'])
+
+        with self.assertRaises(ValueError):
+            vis.select('CLOT')
+        self.assertEqual(vis.product, 'CLTH')
+
+    def test_load_band(self):
+        print('---> Test on lazy band, downsampled and computed')
+
+        # 10 segments of a 80-pixel full disk, segment 6 missing
+        rng = np.random.RandomState(0)
+        full = np.full((80, 80), np.nan, dtype=np.float32)
+        for segment in [1, 2, 3, 4, 5, 7, 8, 9, 10]:
+            file = os.path.join(
+                self.tmpDir, 'HS_H08_20200219_0400_B03_FLDK_R05_'
+                'S{0:02d}10.DAT'.format(segment))
+            write_segment(file, rng.randint(0, 2048, (8, 80)), band=3,
+                          segment=segment)
+            full[(segment - 1) * 8:segment * 8] = calibrate(file,
+                                                            'reflectance')
+
+        vis = Visualizer(self.file, memoryLimit=4 * 80 * 4 * 8)
+        vis.load_band(3, self.tmpDir, self.mTime, factor=2)
+        self.assertEqual(vis.data.shape, (40, 40))
+        vis.downsample(2)
+        self.assertEqual(vis.data.shape, (20, 20))
+        vis.compute()
+
+        self.assertIsInstance(vis.data, np.ma.MaskedArray)
+        self.assertEqual(vis.unit, '%')
+        expected = full.reshape(20, 4, 20, 4).mean(axis=(1, 3))
+        np.testing.assert_allclose(vis.data.filled(np.nan), expected,
+                                   rtol=1e-5)
+        self.assertTrue(vis.data.mask[10:12].all())
+        self.assertFalse(vis.data.mask[:10].any())
+
+        # the computed band is masked without a copy
+        vis.load_band(3, self.tmpDir, self.mTime, factor=2)
+        result = np.zeros((40, 40), dtype=np.float32)
+        with mock.patch.object(visualizer, 'compute', return_value=result):
+            vis.compute()
+        self.assertTrue(np.shares_memory(vis.data.data, result))
+
+    def test_qa(self):
+        print('---> Test on the QA filter of the eager, lazy and cube data')
+
+        rng = np.random.RandomState(0)
+        file = os.path.join(
+            self.tmpDir, 'NC_H08_20200219_0400_L2ARP021_FLDK.02401_02401.nc')
+        flags = rng.randint(0, 2 ** 14, (121, 121))
+        aotMask = rng.rand(121, 121) < 0.2
+        write_l2(file, {'AOT': rng.rand(121, 121), 'AE': rng.rand(121, 121),
+                        'QA_flag': flags}, masks={'AOT': aotMask})
+        qa = 'aot_confidence <= good and not cloud'
+
+        # pixels of the region kept by the filter
+        roi = (slice(10, 41), slice(30, 51))
+        keep = (((flags[roi] >> 4) & 3) <= 1) & ((flags[roi] & 4) == 0)
+        expected = (keep & ~aotMask[roi]).sum()
+        self.assertGreater(expected, 0)
+
+        vis = Visualizer(file)
+        vis.load_variables(['AOT', 'AE'], self.mTime, qa=qa)
+        self.assertEqual(vis.variables['AOT']['data'].count(), expected)
+        self.assertEqual(vis.variables['AE']['data'].count(), keep.sum())
+        vis.load_data('AOT', self.mTime)
+        self.assertEqual(vis.data.count(), (~aotMask[roi]).sum())
+
+        lazy = Visualizer(file, memoryLimit=2 ** 20)
+        lazy.load_data('AOT', self.mTime, qa=qa)
+        lazy.compute()
+        self.assertEqual(lazy.data.count(), expected)
+
+        storeDir = os.path.join(self.tmpDir, 'cube')
+        TimeCube(storeDir, 'ARP').ingest(
+            file, ['AOT', 'QA_flag'], self.mTime, latRange=[20, 50],
+            lonRange=[110, 130])
+        cube = Visualizer.from_timecube(storeDir, 'ARP')
+        cube.load_data('AOT', self.mTime, qa=qa)
+        self.assertEqual(cube.data.count(), expected)
+        np.testing.assert_array_equal(cube.data.mask, lazy.data.mask)
+
+    def test_timecube(self):
+        print('---> Test on loading frames of the time cube')
+
+        storeDir = os.path.join(self.tmpDir, 'cube')
+        cube = TimeCube(storeDir, 'CLP')
+        ROWS, COLS = np.meshgrid(np.arange(121), np.arange(121),
+                                 indexing='ij')
+        for iTime in range(2):
+            mTime = self.mTime + dt.timedelta(minutes=10 * iTime)
+            file = os.path.join(self.tmpDir, '{0:%H%M}.nc'.format(mTime))
+            write_l2(file, {'CLTH': iTime + 0.01 * ROWS + 0.0001 * COLS,
+                            'CLTYPE': np.full((121, 121), iTime)})
+            cube.ingest(file, ['CLTH', 'CLTYPE'], mTime, latRange=[20, 50],
+                        lonRange=[110, 130])
+
+        vis = Visualizer.from_timecube(storeDir, 'CLP', latRange=[30, 40],
+                                       lonRange=[115, 125])
+        self.assertIsNone(vis.fd)
+        mTime = self.mTime + dt.timedelta(minutes=10)
+        vis.load_variables(['CLTH', 'CLTYPE'], mTime)
+
+        self.assertEqual(vis.product, 'CLTH')
+        self.assertEqual(vis.mTime, mTime)
+        self.assertEqual(vis.unit, 'km')
+        self.assertEqual(vis.long_name, 'Cloud Top Height')
+        self.assertEqual(vis.variables['CLTYPE']['long_name'], 'Cloud Type')
+        np.testing.assert_array_equal(vis.lat, np.linspace(40, 30, 11))
+        np.testing.assert_array_equal(vis.lon, np.linspace(115, 125, 11))
+        # 40N 115E is the grid cell (20, 35)
+        self.assertEqual(vis.data.shape, (11, 11))
+        self.assertAlmostEqual(vis.data[0, 0], 1.2035, places=5)
+        self.assertTrue((vis.variables['CLTYPE']['data'] == 1).all())
+
+        with self.assertRaises(ValueError):
+            vis.load_data('CLTH', mTime + dt.timedelta(minutes=10))
+
+    def test_batch(self):
+        print('---> Test on reusing the figure template in batch mode')
+
+        Visualizer.close_templates()
+        figures, artists, titles, imgFiles = [], [], [], []
+        with offline_basemap():
+            for iTime in range(2):
+                mTime = self.mTime + dt.timedelta(minutes=10 * iTime)
+                file = os.path.join(self.tmpDir, '{0:%H%M}.nc'.format(mTime))
+                write_l2(file, {'CLTH': np.full((121, 121), 5 + iTime)})
+                imgFiles.append(os.path.join(self.tmpDir,
+                                             '{0:%H%M}.png'.format(mTime)))
+
+                vis = Visualizer(file)
+                vis.load_data('CLTH', mTime)
+                vis.colorplot(imgFiles[-1], axLatRange=[20, 50],
+                              axLonRange=[110, 130], vmin=0, vmax=15,
+                              batch=True)
+
+                self.assertEqual(len(Visualizer._templates), 1)
+                template = list(Visualizer._templates.values())[0]
+                figures.append(template['fig'])
+                artists.append(template['artists'][0])
+                titles.append(template['ax'].get_title())
+
+        # one figure, with the artists of the last frame only
+        fig = figures[0]
+        self.assertIs(figures[1], fig)
+        self.assertIsNone(artists[0].axes)
+        self.assertIn(artists[1], template['ax'].collections)
+        self.assertEqual(titles, [
+            '2020-02-19 04:00 (Himawari-8) Cloud Top Height',
+            '2020-02-19 04:10 (Himawari-8) Cloud Top Height'])
+        self.assertTrue(all(os.path.getsize(imgFile) > 0
+                            for imgFile in imgFiles))
+        self.assertTrue(plt.fignum_exists(fig.number))
+
+        Visualizer.close_templates()
+        self.assertEqual(Visualizer._templates, {})
+        self.assertFalse(plt.fignum_exists(fig.number))
+
+
+def main():
+
+    suite = unittest.TestSuite()
+
+    tests = [
+        Test('test_load_variables'),
+        Test('test_load_band'),
+        Test('test_qa'),
+        Test('test_timecube'),
+        Test('test_batch')
+        ]   # setup the test list
+    suite.addTests(tests)
+
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
+
+
+if __name__ == '__main__':
+    main()